@@ -0,0 +1,44 @@
+"""
+Batch parser benchmark: suggest_listing_fields_many throughput by worker count.
+
+Run from the repository root:
+
+    python -m benchmarks.batch_bench [--posts N] [--workers 1,2,4]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.posts import sample_posts
+from utils.parse import suggest_listing_fields_many
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(w) for w in args.workers.split(",")]
+    else:
+        counts = sorted({1, 2, cpus // 2 or 1, cpus})
+
+    posts = sample_posts(args.posts)
+
+    print(f"{args.posts} posts, {cpus} CPU(s)")
+    print(f"{'workers':>7} {'posts/sec':>10} {'speedup':>8}")
+    base = None
+    for workers in counts:
+        start = time.perf_counter()
+        for _ in suggest_listing_fields_many(posts, workers=workers, chunk_size=args.chunk_size):
+            pass
+        rate = args.posts / (time.perf_counter() - start)
+        base = base or rate
+        print(f"{workers:>7} {rate:>10.0f} {rate / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+utils/parse.py suggesters as they were before ParsedDocument, kept as the
+"before" case of parse_bench.py. Every function below is copied unchanged
+from that version; the pattern tables, compiled regexes and token helpers
+it used have not changed since and are imported from utils.parse.
+
+Do not import this outside the benchmarks.
+"""
+import re
+from datetime import datetime
+from typing import Any, Dict
+
+from utils.normalize import match_sector_key, normalize_revenue, normalize_sector
+from utils.parse import (
+    _ALIAS_SYMBOL_RANKS,
+    _ALIAS_WORD_RANKS,
+    _COUNTRY_RANK_CODES,
+    _COUNTRY_SYMBOL_RE,
+    _COUNTRY_WORD_RE,
+    _ISO_TOKEN_RE,
+    _KEYWORD_PREFIX_RANKS,
+    _access_from_hits,
+    _is_revenueish,
+    _privilege_from_hits,
+    ISO_COUNTRY_CODES,
+    KEYWORD_COUNTRY_MAP,
+    PRICE_NUMBER_RE,
+    scan_tokens,
+)
+
+
+def _scan_country(raw: str, low: str) -> str:
+    # 1) + 2): the first [XX]/(XX)/{XX} tag wins if it is an ISO code,
+    # otherwise the first standalone ISO token. Every tag is also a token,
+    # so one pass over the tokens covers both.
+    first_iso = ""
+    tag_seen = False
+    for m in _ISO_TOKEN_RE.finditer(raw):
+        tok = m.group(1)
+        start, end = m.span()
+        if (
+            not tag_seen
+            and start > 0
+            and raw[start - 1] in "[({"
+            and raw[end:end + 1] in ("]", ")", "}")
+        ):
+            tag_seen = True
+            if tok in ISO_COUNTRY_CODES:
+                return tok
+        if not first_iso and tok in ISO_COUNTRY_CODES:
+            first_iso = tok
+    if first_iso:
+        return first_iso
+
+    # 3) + 4): keywords (substring match) and aliases (whole word) in one
+    # scan of the lowered text. Keywords may overlap, so the scan resumes
+    # one character after each hit rather than after the whole match.
+    best = len(_COUNTRY_RANK_CODES)
+    search = _COUNTRY_WORD_RE.search
+    pos = 0
+    while best:
+        m = search(low, pos)
+        if m is None:
+            break
+        kw = m.group("kw")
+        rank = _KEYWORD_PREFIX_RANKS[kw] if kw is not None else _ALIAS_WORD_RANKS[m.group("alias")]
+        if rank < best:
+            best = rank
+        pos = m.start() + 1
+
+    if best >= len(KEYWORD_COUNTRY_MAP):
+        for m in _COUNTRY_SYMBOL_RE.finditer(raw):
+            best = min(best, _ALIAS_SYMBOL_RANKS[m.group()])
+
+    return _COUNTRY_RANK_CODES[best] if best < len(_COUNTRY_RANK_CODES) else ""
+
+
+def suggest_country(text: str, title: str = "") -> str:
+    """
+    Detect country as ISO alpha-2.
+    Prefers title, then full text.
+    Uses:
+      - [US]/(GB)/{RU} style tags
+      - standalone ISO tokens (US, DE, FR)
+      - KEYWORD_COUNTRY_MAP (full names, demonyms, slang)
+      - COUNTRY_ALIAS (slang, emojis, abbreviations)
+    """
+    if title:
+        hit = _scan_country(title, title.lower())
+        if hit:
+            return hit
+
+    return _scan_country(text, text.lower())
+
+
+def suggest_price(text: str) -> str:
+    lines = text.splitlines()
+    tiers = []
+    loose_prices = []
+
+    TIER_KEYWORDS = ("start", "step", "blitz", "flash")
+
+    for line in lines:
+        low = line.lower().strip()
+        if not low:
+            continue
+
+        # 1) START / STEP / BLITZ / FLASH
+        if any(k in low for k in TIER_KEYWORDS):
+            def _grab(label: str) -> None:
+                m = re.search(
+                    rf"{label}[:=\s]+\$?\s*([\d,]+)",
+                    low,
+                    flags=re.IGNORECASE,
+                )
+                if m:
+                    amount = m.group(1).replace(",", "")
+                    tiers.append(f"{label.upper()} {amount}")
+
+            _grab("start")
+            _grab("step")
+            _grab("blitz")
+            _grab("flash")
+            continue
+
+        # 2) Lines that mention “price”
+        if "price" in low:
+            for num, _cur in PRICE_NUMBER_RE.findall(line):
+                if _is_revenueish(num, line):
+                    continue
+                cleaned = num.replace(",", "")
+                loose_prices.append(cleaned)
+
+    if tiers:
+        return ", ".join(tiers)
+
+    if loose_prices:
+        seen = set()
+        unique = []
+        for p in loose_prices:
+            if p not in seen:
+                seen.add(p)
+                unique.append(p)
+        return ", ".join(unique[:3])
+
+    return ""
+
+
+def suggest_revenue(text: str) -> str:
+    low = text.lower()
+
+    kk_match = re.search(r"\b(\d+)\s*kk\b", low)
+    if kk_match:
+        num = kk_match.group(1)
+        return normalize_revenue(f"{num}M")
+
+    range_match = re.search(
+        r"([\d.,]+)\s*[-–]\s*([\d.,]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)",
+        text,
+        flags=re.IGNORECASE,
+    )
+    if range_match:
+        lo, hi, unit = range_match.groups()
+        lo_clean = lo.replace(",", "")
+        hi_clean = hi.replace(",", "")
+        unit_clean = unit.strip().upper()[0]
+        return f"{lo_clean}-{hi_clean}{unit_clean}"
+
+    single = re.search(
+        r"(revenue|turnover|income)\s*[:\-]*\s*[<\$\s]*([\d.,]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)",
+        text,
+        flags=re.IGNORECASE,
+    )
+    if single:
+        _, num, unit = single.groups()
+        num_clean = num.replace(",", "")
+        return normalize_revenue(f"{num_clean}{unit}")
+
+    generic = re.search(
+        r"\b([\d.]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)\b",
+        text,
+        flags=re.IGNORECASE,
+    )
+    if generic:
+        num, unit = generic.groups()
+        num_clean = num.replace(",", "")
+        return normalize_revenue(f"{num_clean}{unit}")
+
+    return ""
+
+
+def suggest_sector(text: str, title: str = "") -> str:
+    low_title = title.lower()
+    low = text.lower()
+
+    ind = re.search(r"(industry|sector)[:\s]+(.+)", low)
+    if ind:
+        key = match_sector_key(ind.group(2))
+        if key:
+            return normalize_sector(key)
+
+    for scope in (low_title, low):
+        key = match_sector_key(scope)
+        if key:
+            return normalize_sector(key)
+
+    return ""
+
+
+def suggest_post_date(text: str) -> str:
+    patterns = [
+        (r"\b(20\d{2}-\d{2}-\d{2})\b", "%Y-%m-%d"),
+        (r"\b(\d{2}\.\d{2}\.20\d{2})\b", "%d.%m.%Y"),
+        (r"\b(20\d{2}/\d{2}/\d{2})\b", "%Y/%m/%d"),
+    ]
+    for regex, fmt in patterns:
+        m = re.search(regex, text)
+        if m:
+            try:
+                return datetime.strptime(m.group(1), fmt).strftime("%Y-%m-%d")
+            except:
+                pass
+    return ""
+
+
+def _build_description(title: str, text: str, max_len: int = 200) -> str:
+    low = text.lower()
+
+    access = ""
+    if "rdp" in low: access = "RDP"
+    elif "vpn" in low: access = "VPN"
+    elif "ssh" in low: access = "SSH"
+
+    country = ""
+    m = re.search(r"\b([A-Z]{2})\b", text)
+    if m:
+        country = m.group(1)
+
+    rev = ""
+    m = re.search(r"([\d.]+)\s*(M|B|K)", text, flags=re.IGNORECASE)
+    if m:
+        rev = f"{m.group(1)}{m.group(2).upper()}"
+
+    parts = [title.strip()]
+    if access: parts.append(access)
+    if country: parts.append(country)
+    if rev: parts.append(rev)
+
+    desc = " | ".join(parts)
+
+    return desc[: max_len - 3] + "..." if len(desc) > max_len else desc
+
+
+def suggest_listing_fields(raw_title: str, raw_text: str) -> Dict[str, Any]:
+    combined = f"{raw_title}\n{raw_text}"
+    country = suggest_country(combined, title=raw_title)
+
+    # One token scan feeds both access type and privilege.
+    hits = scan_tokens(combined)
+    access_type = _access_from_hits(scan_tokens(raw_title)) if raw_title else ""
+
+    return {
+        "access_type": access_type or _access_from_hits(hits),
+        "country": country,
+        "privilege": _privilege_from_hits(hits),
+        "price": suggest_price(combined),
+        "sector": suggest_sector(combined, title=raw_title),
+        "revenue": suggest_revenue(combined),
+        "post_date": suggest_post_date(combined),
+        "description": _build_description(raw_title, raw_text),
+    }
@@ -0,0 +1,72 @@
+"""
+Parser benchmark: allocations and throughput of suggest_listing_fields.
+
+"before" is suggest_listing_fields as it was before ParsedDocument,
+vendored in benchmarks/parse_baseline.py: each suggester lowers, splits and
+scans the post again. "after" is the current suggest_listing_fields, which
+builds one ParsedDocument per post and shares its views.
+
+Allocation is reported as the traced peak while parsing one post. Use
+--repeat-body to see how both figures move with post length.
+
+Run from the repository root:
+
+    python -m benchmarks.parse_bench [--posts N] [--rounds N] [--repeat-body N]
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks import parse_baseline
+from benchmarks.posts import sample_posts
+from utils.parse import suggest_listing_fields
+
+
+def throughput(fn: Callable[[str, str], Dict[str, Any]], posts: List[Tuple[str, str]]) -> float:
+    start = time.perf_counter()
+    for title, text in posts:
+        fn(title, text)
+    return len(posts) / (time.perf_counter() - start)
+
+
+def peak_bytes(fn: Callable[[str, str], Dict[str, Any]], posts: List[Tuple[str, str]]) -> int:
+    """Average traced peak while parsing one post."""
+    total = 0
+    tracemalloc.start()
+    for title, text in posts:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn(title, text)
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return total // len(posts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--repeat-body", type=int, default=1, help="repeat each body N times")
+    args = parser.parse_args()
+
+    posts = [(title, "\n".join([text] * args.repeat_body)) for title, text in sample_posts(args.posts)]
+    for title, text in posts[:200]:
+        assert parse_baseline.suggest_listing_fields(title, text) == suggest_listing_fields(title, text)
+
+    print(f"{args.posts} posts")
+    variants = {"before": parse_baseline.suggest_listing_fields, "after": suggest_listing_fields}
+    # Interleave the timed rounds and keep the best, so background noise
+    # hits both variants alike.
+    rates = {label: 0.0 for label in variants}
+    for _ in range(args.rounds):
+        for label, fn in variants.items():
+            rates[label] = max(rates[label], throughput(fn, posts))
+
+    print(f"{'variant':<8} {'posts/sec':>10} {'peak bytes/post':>16}")
+    for label, fn in variants.items():
+        # tracemalloc slows everything down, so it only sees a sample.
+        print(f"{label:<8} {rates[label]:>10.0f} {peak_bytes(fn, posts[:2000]):>16}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import random
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Synthetic IAB posts for the benchmark scripts. Shapes follow what we see on
+# the forums: a short title plus a loosely structured body.
+
+_TITLES = [
+    "{country} {access} access | {sector} | {revenue}",
+    "[{country}] {access} {privilege} - {sector} company",
+    "Selling {access} into {sector} ({revenue} revenue)",
+    "{access} / {privilege} / {country}",
+]
+
+_BODY_LINES = [
+    "Country: {country_name}",
+    "Industry: {sector}",
+    "Revenue: {revenue}",
+    "Access: {access} with {privilege} rights",
+    "Hosts: {hosts}, AV: defender",
+    "START {start}, STEP {step}, BLITZ {blitz}",
+    "price is {start}$ negotiable",
+    "Posted {date}",
+    "Escrow accepted, PM for details.",
+    "No admin rights on the DC, {privilege} on the file server.",
+]
+
+_ACCESS = ["RDP", "vpn", "Citrix", "fortigate", "ssh", "RDWeb", "AnyConnect", "webmail"]
+_PRIVILEGE = ["domain admin", "local admin", "user", "admin", "DA"]
+_COUNTRIES = [("US", "United States"), ("DE", "Germany"), ("GB", "England"),
+              ("FR", "France"), ("BR", "Brazil"), ("JP", "Japan"), ("IT", "Italy")]
+_SECTORS = ["healthcare", "manufacturing", "law firm", "university", "bank",
+            "logistics", "oil and gas", "retail", "government", "insurance"]
+_REVENUES = ["25M", "10-25M", "1.5B", "300kk", "$80 million", "5M"]
+
+
+def sample_posts(n: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Return `n` reproducible (raw_title, raw_text) pairs."""
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n):
+        iso, name = rng.choice(_COUNTRIES)
+        start = rng.randrange(300, 3000, 100)
+        values = {
+            "country": iso,
+            "country_name": name,
+            "access": rng.choice(_ACCESS),
+            "privilege": rng.choice(_PRIVILEGE),
+            "sector": rng.choice(_SECTORS),
+            "revenue": rng.choice(_REVENUES),
+            "hosts": rng.randint(5, 4000),
+            "start": start,
+            "step": rng.choice([50, 100, 200]),
+            "blitz": start * rng.randint(2, 4),
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+        title = rng.choice(_TITLES).format(**values)
+        lines = rng.sample(_BODY_LINES, rng.randint(3, len(_BODY_LINES)))
+        posts.append((title, "\n".join(line.format(**values) for line in lines)))
+    return posts
+
+
+def sample_listing_rows(n: int, broker_ids: List[int], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield `n` listing rows (insert_listings() format) built from sample posts,
+    generated in chunks so large databases can be filled without holding
+    every post in memory. Each post also names a pseudo-unique domain, so
+    benchmarks have selective terms next to the very common ones.
+    """
+    rng = random.Random(seed)
+    chunk = 10000
+    for offset in range(0, n, chunk):
+        for title, text in sample_posts(min(chunk, n - offset), seed=seed + offset):
+            iso, _name = rng.choice(_COUNTRIES)
+            yield {
+                "broker_id": rng.choice(broker_ids),
+                "access_type": rng.choice(_ACCESS).lower(),
+                "country": iso,
+                "privilege": rng.choice(_PRIVILEGE),
+                "price": str(rng.randrange(300, 3000, 100)),
+                "description": title,
+                "source": rng.choice(["exploit", "xss", "ramp"]),
+                "post_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "sector": rng.choice(_SECTORS),
+                "revenue": rng.choice(_REVENUES),
+                "raw_title": title,
+                "raw_text": f"{text}\nDomain: corp{rng.randrange(10 ** 6)}.local",
+                "raw_url": "",
+            }
@@ -0,0 +1,176 @@
+"""
+Pragma profile benchmark: insert-heavy and read-heavy workloads per profile.
+
+Insert workload (fresh database per profile): N listings through
+insert_listings in committed batches, then single-row insert_listing calls
+that each commit, as the CLI does. Read workload (one shared database):
+listing pages, searches, detail lookups, analytics counts and a full export
+scan. Concurrent workload: page reads while another thread imports, counting
+reads that failed with "database is locked" and the slowest read. Run from
+the repository root:
+
+    python -m benchmarks.pragma_bench [--listings N] [--profiles a,b]
+
+"sqlite-defaults" (rollback journal, stock settings) is included for
+comparison.
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db.database as database
+from benchmarks.posts import sample_listing_rows
+
+SEARCHES = ["rdp", "vpn healthcare", '"domain admin"', "country:de bank"]
+
+# What connections used before the profiles: rollback journal, stock settings.
+BASELINE = "sqlite-defaults"
+database.PRAGMA_PROFILES.setdefault(BASELINE, {"journal_mode": "DELETE", "synchronous": "FULL"})
+
+
+def use(path: Path, profile: str) -> None:
+    database.close_shared_connection()
+    database.DB_PATH = path
+    database.PRAGMA_PROFILE = profile
+
+
+def elapsed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def insert_workload(path: Path, listings: int, singles: int, batch_size: int) -> tuple:
+    database.create_tables()
+    broker_ids = database.insert_brokers((f"broker{i}", f"Broker{i}", "") for i in range(50))
+    rows = sample_listing_rows(listings, broker_ids)
+    batch = elapsed(lambda: database.insert_listings(rows, batch_size=batch_size))
+
+    def insert_singles() -> None:
+        for row in sample_listing_rows(singles, broker_ids, seed=1):
+            database.insert_listing(**row)
+
+    single = elapsed(insert_singles)
+    return listings / batch, singles / single
+
+
+def read_workload(lookups: int) -> dict:
+    total = database.get_summary_counts().listings
+    rng = random.Random(0)
+    ids = [rng.randint(1, total) for _ in range(lookups)]
+
+    def pages() -> None:
+        after = None
+        for _ in range(50):
+            page = database.get_all_listings(page_size=20, after=after)
+            after = (page[-1].created_at, page[-1].id)
+
+    def searches() -> None:
+        for q in SEARCHES:
+            database.search_query(q, limit=50, snippets=True)
+
+    def details() -> None:
+        for listing_id in ids:
+            database.get_listing_by_id(listing_id, include_raw=True)
+
+    def analytics() -> None:
+        database.get_summary_counts()
+        database.get_broker_listing_counts()
+        database.get_sector_counts()
+
+    def export_scan() -> None:
+        for _ in database.iter_listings(include_raw=True):
+            pass
+
+    return {
+        "50 pages": elapsed(pages),
+        "searches": elapsed(searches),
+        f"{lookups} details": elapsed(details),
+        "analytics": elapsed(analytics),
+        "export scan": elapsed(export_scan),
+    }
+
+
+def concurrent_workload(listings: int, batch_size: int) -> tuple:
+    """(reads, failed reads, slowest read in seconds) during an import."""
+    broker_ids = [row[0] for row in database.get_all_brokers()]
+    done = threading.Event()
+
+    def writer() -> None:
+        try:
+            database.insert_listings(sample_listing_rows(listings, broker_ids, seed=2), batch_size=batch_size)
+        finally:
+            database.close_shared_connection()
+            done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = failed = 0
+    slowest = 0.0
+    while not done.is_set():
+        start = time.perf_counter()
+        try:
+            database.get_all_listings(page_size=20)
+        except sqlite3.OperationalError:
+            failed += 1
+        slowest = max(slowest, time.perf_counter() - start)
+        reads += 1
+    thread.join()
+    return reads, failed, slowest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=50000)
+    parser.add_argument("--singles", type=int, default=500, help="single-row committed inserts")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=2000, help="random get_listing_by_id calls")
+    parser.add_argument("--profiles", default=",".join(database.PRAGMA_PROFILES))
+    args = parser.parse_args()
+    profiles = args.profiles.split(",")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Insert workload: {args.listings} batched + {args.singles} single-row inserts")
+        print(f"{'profile':<22} {'batched rows/s':>15} {'single rows/s':>14}")
+        for profile in profiles:
+            if database.PRAGMA_PROFILES[profile].get("query_only") == "ON":
+                print(f"{profile:<22} {'(read-only)':>15} {'-':>14}")
+                continue
+            use(Path(tmp) / f"{profile}.db", profile)
+            batch_rate, single_rate = insert_workload(
+                database.DB_PATH, args.listings, args.singles, args.batch_size
+            )
+            print(f"{profile:<22} {batch_rate:>15.0f} {single_rate:>14.0f}")
+
+        read_db = Path(tmp) / "read.db"
+        use(read_db, "bulk-load")
+        insert_workload(read_db, args.listings, 0, 5000)
+
+        print(f"\nRead workload on {args.listings} listings (ms)")
+        results = {}
+        for profile in profiles:
+            use(read_db, profile)
+            results[profile] = read_workload(args.lookups)
+        labels = list(next(iter(results.values())))
+        print(f"{'profile':<22} " + " ".join(f"{label:>13}" for label in labels))
+        for profile, times in results.items():
+            print(f"{profile:<22} " + " ".join(f"{times[label] * 1000:>13.0f}" for label in labels))
+
+        print(f"\nPage reads while importing {args.listings // 5} listings")
+        print(f"{'profile':<22} {'reads':>8} {'failed':>8} {'slowest ms':>11}")
+        for profile in profiles:
+            if database.PRAGMA_PROFILES[profile].get("query_only") == "ON":
+                continue
+            use(read_db, profile)
+            reads, failed, slowest = concurrent_workload(args.listings // 5, args.batch_size)
+            print(f"{profile:<22} {reads:>8} {failed:>8} {slowest * 1000:>11.0f}")
+
+        database.close_shared_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Row representation benchmark: memory and fetch time for N listing rows.
+
+"full tuples" is how listing rows were passed around before the row types:
+positional 15-tuples with raw_title/raw_text/raw_url loaded. "sqlite3.Row"
+is the stock named-column alternative. "Listing" is get_all_listings():
+summary rows built by the row_factory, raw_* loaded only on access; plain
+12-tuples of the same columns are listed to show what the type itself costs.
+Memory is what the fetched list keeps alive (tracemalloc). Run from the
+repository root:
+
+    python -m benchmarks.row_bench [--listings N] [--db PATH]
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import db.database as database
+from benchmarks.posts import sample_listing_rows
+
+_SUMMARY_SQL = f"""
+    SELECT {database._LISTING_COLUMNS_SQL}
+    FROM listings l {database._LISTING_JOINS_SQL}
+    ORDER BY l.created_at DESC, l.id DESC
+"""
+_FULL_SQL = f"""
+    SELECT l.id, b.name, access_types.name, countries.name, l.privilege, l.price,
+           l.description, sources.name, l.post_date, sectors.name, l.revenue,
+           l.raw_title, l.raw_text, l.raw_url, l.created_at
+    FROM listings l {database._LISTING_JOINS_SQL}
+    ORDER BY l.created_at DESC, l.id DESC
+"""
+
+
+def fetch(sql: str, row_factory=None) -> Callable[[], list]:
+    def run() -> list:
+        cursor = database.shared_connection().cursor()
+        cursor.row_factory = row_factory
+        return cursor.execute(sql).fetchall()
+    return run
+
+
+def measure(fn: Callable[[], list]) -> Tuple[int, float, float]:
+    """(rows, MiB held by the result, seconds to fetch)."""
+    fn()  # warm the page cache
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    count = len(rows)
+    del rows
+    return count, held / 2 ** 20, elapsed
+
+
+def build(n: int) -> None:
+    database.create_tables()
+    broker_ids = database.insert_brokers((f"broker{i}", f"Broker{i}", "") for i in range(50))
+    database.insert_listings(sample_listing_rows(n, broker_ids), batch_size=5000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--db", type=Path, default=None, help="reuse or keep this database")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.db:
+        database.DB_PATH = args.db
+        fresh = not args.db.exists()
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        database.DB_PATH = Path(tmp.name) / "row_bench.db"
+        fresh = True
+    if fresh:
+        build(args.listings)
+    else:
+        database.create_tables()
+
+    variants: List[Tuple[str, Callable[[], list]]] = [
+        ("full tuples (before)", fetch(_FULL_SQL)),
+        ("sqlite3.Row", fetch(_FULL_SQL, sqlite3.Row)),
+        ("summary tuples", fetch(_SUMMARY_SQL)),
+        ("Listing", database.get_all_listings),
+    ]
+    print(f"{'rows':<22} {'count':>8} {'MiB':>8} {'fetch ms':>9}")
+    for label, fn in variants:
+        count, mib, seconds = measure(fn)
+        print(f"{label:<22} {count:>8} {mib:>8.1f} {seconds * 1000:>9.0f}")
+
+    database.close_shared_connection()
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Search benchmark: FTS5 search_query latency against the old LIKE scan.
+
+Builds a throwaway database with N synthetic listings (or reuses one given
+with --db), then times each query. Run from the repository root:
+
+    python -m benchmarks.search_bench [--listings N] [--db PATH]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import db.database as database
+from benchmarks.posts import sample_listing_rows
+
+QUERIES = [
+    ("common word", "rdp"),
+    ("two words", "vpn healthcare"),
+    ("phrase", '"domain admin"'),
+    ("prefix", "fortig*"),
+    ("field filter", "country:de bank"),
+    ("rare word", "corp123456"),
+]
+
+_LIKE_FIELDS = [
+    "b.name", "access_types.name", "countries.name", "l.privilege", "l.price",
+    "l.description", "sources.name", "l.post_date", "sectors.name", "l.revenue",
+]
+
+
+def like_search(q: str) -> list:
+    """The pre-FTS search_query: ten LOWER(col) LIKE '%tok%' per token."""
+    field_expr = " OR ".join(f"LOWER({col}) LIKE ?" for col in _LIKE_FIELDS)
+    tokens = [t.lower() for t in q.replace('"', " ").replace("*", " ").split()]
+    tokens = [t.split(":", 1)[-1] for t in tokens]
+    where = " AND ".join(f"({field_expr})" for _ in tokens)
+    params = [f"%{t}%" for t in tokens for _ in _LIKE_FIELDS]
+    conn = database.shared_connection()
+    return conn.execute(
+        f"""
+        SELECT l.id FROM listings l {database._LISTING_JOINS_SQL}
+        WHERE {where} ORDER BY l.created_at DESC
+        """,
+        params,
+    ).fetchall()
+
+
+def build(n: int) -> None:
+    database.create_tables()
+    broker_ids = database.insert_brokers((f"broker{i}", f"Broker{i}", "") for i in range(50))
+    start = time.perf_counter()
+    database.insert_listings(sample_listing_rows(n, broker_ids), batch_size=5000)
+    print(f"Inserted {n} listings in {time.perf_counter() - start:.1f}s")
+
+
+def timed(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=200000)
+    parser.add_argument("--db", type=Path, default=None, help="reuse or keep this database")
+    parser.add_argument("--limit", type=int, default=50, help="rows per search (as in the CLI)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-like", action="store_true", help="do not time the LIKE scan")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.db:
+        database.DB_PATH = args.db
+        fresh = not args.db.exists()
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        database.DB_PATH = Path(tmp.name) / "search_bench.db"
+        fresh = True
+    if fresh:
+        build(args.listings)
+    else:
+        database.create_tables()
+
+    total = database.get_summary_counts().listings
+    print(f"{total} listings, top {args.limit} results, median of {args.repeat} runs\n")
+    print(f"{'query':<26} {'matches':>8} {'fts ms':>8} {'like ms':>9}")
+    for label, q in QUERIES:
+        matches = len(database.search_query(q))
+        fts_ms = timed(lambda: database.search_query(q, limit=args.limit, snippets=True), args.repeat)
+        like = "-" if args.skip_like else f"{timed(lambda: like_search(q), 1):.0f}"
+        print(f"{label + ' ' + q:<26} {matches:>8} {fts_ms:>8.1f} {like:>9}")
+
+    database.close_shared_connection()
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
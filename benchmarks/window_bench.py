@@ -0,0 +1,120 @@
+"""
+Date window benchmark: latency and query plan of the DateWindow queries.
+
+Builds a throwaway database with N synthetic listings (or reuses one given
+with --db), then times each listing query with a one-day, one-week and
+half-year post_date window and prints the indexes its query plan reads.
+Narrow windows should read idx_listings_post_date_sector or
+idx_listings_broker_post_date; wide ones walk the created_at order indexes.
+Run from the repository root:
+
+    python -m benchmarks.window_bench [--listings N] [--db PATH]
+"""
+import argparse
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import db.database as database
+from benchmarks.posts import sample_listing_rows
+from db.database import DateWindow
+
+# Synthetic posts are dated within 2025 (benchmarks/posts.py).
+WINDOWS = [
+    ("day", DateWindow("2025-12-01", "2025-12-01")),
+    ("week", DateWindow("2025-12-20", "2025-12-26")),
+    ("half year", DateWindow("2025-07-01", "2025-12-31")),
+]
+
+QUERIES = [
+    ("all listings", lambda w: database.get_all_listings(page_size=20, window=w)),
+    ("sector", lambda w: database.find_listings_by_sector("healthcare", page_size=20, window=w)),
+    ("broker", lambda w: database.find_listings_by_broker_name("broker7", page_size=20, window=w)),
+    ("price", lambda w: database.find_listings_by_price(500, 2000, page_size=20, window=w)),
+    ("search", lambda w: database.search_query("rdp", limit=50, window=w)),
+    ("count", lambda w: database.count_listings(w)),
+    ("sector counts", lambda w: database.get_window_counts("sector", w)),
+    ("broker counts", lambda w: database.get_window_counts("broker", w)),
+]
+
+_PLAN_INDEX = re.compile(r"(?:COVERING )?INDEX (\w+)")
+
+
+def build(n: int) -> None:
+    database.create_tables()
+    broker_ids = database.insert_brokers((f"broker{i}", f"Broker{i}", "") for i in range(50))
+    start = time.perf_counter()
+    database.insert_listings(sample_listing_rows(n, broker_ids), batch_size=5000)
+    print(f"Inserted {n} listings in {time.perf_counter() - start:.1f}s")
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def indexes_used(fn: Callable[[], object]) -> List[str]:
+    """
+    Indexes on listings in the plan of the last query fn() runs (earlier
+    ones are _narrow_range() probes).
+    """
+    conn = database.shared_connection()
+    statements: List[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+
+    queries = [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+    found: List[str] = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {queries[-1]}"):
+        for index in _PLAN_INDEX.findall(row[3]):
+            if index.startswith("idx_listings") and index not in found:
+                found.append(index)
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=200000)
+    parser.add_argument("--db", type=Path, default=None, help="reuse or keep this database")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = None
+    if args.db:
+        database.DB_PATH = args.db
+        fresh = not args.db.exists()
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        database.DB_PATH = Path(tmp.name) / "window_bench.db"
+        fresh = True
+    if fresh:
+        build(args.listings)
+    else:
+        database.create_tables()
+
+    total = database.get_summary_counts().listings
+    print(f"{total} listings, median of {args.repeat} runs\n")
+    print(f"{'query':<26} {'window':<10} {'ms':>8}  indexes")
+    for label, query in QUERIES:
+        for window_label, window in WINDOWS:
+            ms = timed(lambda: query(window), args.repeat)
+            used = ", ".join(indexes_used(lambda: query(window))) or "-"
+            print(f"{label:<26} {window_label:<10} {ms:>8.1f}  {used}")
+
+    database.close_shared_connection()
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Marks the repository root as pytest's rootdir, so tests/ can import db,
+utils and the entry-point modules as `python3 main.py` does.
+"""
@@ -1,20 +1,468 @@
+import atexit
+import json
+import re
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
 import sqlite3
-from typing import List, Tuple, Optional
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
 
+from utils.minhash import band_buckets, minhash_signature, pack_signature, similarity, unpack_signature
+from utils.normalize import listing_fingerprint, normalize_broker_name, parse_price_amounts, parse_revenue_bounds
 
-DB_PATH = Path("axis.db") #should change to .env file
 
+# Set from utils.config at startup (see configure()).
+DB_PATH = Path("axis.db")
 
-def get_connection() -> sqlite3.Connection:
+# Connection pragmas by workload. All profiles use WAL, so readers are not
+# blocked while a long import is writing. Sizes: negative cache_size is KiB,
+# mmap_size is bytes.
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    # CLI use: durable commits at WAL speed, modest memory.
+    "interactive": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Imports: large cache for index maintenance. NORMAL in WAL mode only
+    # fsyncs at checkpoints; a power loss can drop the last commits but
+    # leaves the database intact.
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -262144,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    # Opt-in only: bulk-load without any fsync. A process crash is still
+    # safe, but an OS crash or power loss during (or shortly after) an
+    # import can corrupt the whole database, not just lose the last
+    # batches. Use it for throwaway databases or with a backup.
+    "bulk-load-unsafe": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    # Reports and exports: large cache and mmap, writes refused.
+    "read-only-analytics": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -131072,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "query_only": "ON",
+    },
+}
+
+# Profile used by get_connection() when none is given, and an optional
+# page cache size (MiB) that overrides the profile's.
+PRAGMA_PROFILE = "interactive"
+CACHE_SIZE_MB: Optional[int] = None
+
+# One long-lived connection per thread (sqlite3 connections must stay on the
+# thread that opened them), reused by every query function.
+_local = threading.local()
+
+
+def configure(db_path: Path, pragma_profile: str, cache_size_mb: Optional[int] = None) -> None:
+    """
+    Point the database layer at `db_path` with the given connection
+    settings (normally from utils.config.load_config()). Connections opened
+    with the previous settings are replaced on next use.
+    """
+    global DB_PATH, PRAGMA_PROFILE, CACHE_SIZE_MB
+    if pragma_profile not in PRAGMA_PROFILES:
+        raise ValueError(
+            f"unknown pragma profile {pragma_profile!r} (expected one of: {', '.join(PRAGMA_PROFILES)})"
+        )
+    DB_PATH = Path(db_path)
+    PRAGMA_PROFILE = pragma_profile
+    CACHE_SIZE_MB = cache_size_mb
+    close_shared_connection()
+
+
+def apply_pragma_profile(conn: sqlite3.Connection, profile: str) -> None:
+    """Set the pragmas of a PRAGMA_PROFILES entry on `conn`."""
+    try:
+        pragmas = PRAGMA_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"unknown pragma profile {profile!r} (expected one of: {', '.join(PRAGMA_PROFILES)})"
+        ) from None
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def get_connection(profile: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open a new connection with the given pragma profile (PRAGMA_PROFILE by
+    default). Most code should use shared_connection().
+    """
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
+    apply_pragma_profile(conn, profile or PRAGMA_PROFILE)
+    if CACHE_SIZE_MB:
+        conn.execute(f"PRAGMA cache_size = {-CACHE_SIZE_MB * 1024}")
     return conn
 
 
-def create_tables() -> None:
-    with get_connection() as conn:
+def shared_connection() -> sqlite3.Connection:
+    """
+    Return this thread's connection, opening it on first use (or after
+    DB_PATH or PRAGMA_PROFILE changed).
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH or _local.profile != PRAGMA_PROFILE:
+        if conn is not None:
+            conn.close()
+        conn = get_connection()
+        _local.conn = conn
+        _local.path = DB_PATH
+        _local.profile = PRAGMA_PROFILE
+        _local.depth = 0
+    return conn
+
+
+def in_transaction_block() -> bool:
+    """True inside a transaction() block on this thread."""
+    return getattr(_local, "depth", 0) > 0
+
+
+def close_shared_connection() -> None:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+atexit.register(close_shared_connection)
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Group several calls into one transaction on the shared connection:
+
+        with transaction() as conn:
+            broker_id = insert_broker(..., conn=conn)
+            insert_listing(broker_id, ..., conn=conn)
+
+    Commits when the outermost block exits, rolls back on an exception.
+    Query functions called without `conn` inside the block join it too.
+    """
+    conn = shared_connection()
+    _local.depth += 1
+    try:
+        yield conn
+    except BaseException:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.rollback()
+            # Brokers and lookup names created in the block are gone again.
+            _invalidate_lookups()
+        raise
+    _local.depth -= 1
+    if _local.depth == 0:
+        conn.commit()
+
+
+@contextmanager
+def connection_scope(conn: Optional[sqlite3.Connection] = None) -> Iterator[sqlite3.Connection]:
+    """
+    Yield `conn` when the caller passes one (the caller then owns commit and
+    rollback). Otherwise yield the shared connection: inside transaction()
+    the block owns the commit, outside it the work is committed on success.
+    """
+    if conn is not None:
+        yield conn
+        return
+    with transaction() as shared:
+        yield shared
+
+
+# --- Row types ---
+
+# Columns of a listing summary row, in the order every list-style query
+# selects them.
+LISTING_FIELDS = (
+    "id",
+    "broker_name",
+    "access_type",
+    "country",
+    "privilege",
+    "price",
+    "description",
+    "source",
+    "post_date",
+    "sector",
+    "revenue",
+    "created_at",
+)
+RAW_FIELDS = ("raw_title", "raw_text", "raw_url")
+
+
+def get_listing_raw_field(listing_id: int, field: str, conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+    """One raw_* column of a listing, read by primary key."""
+    if field not in RAW_FIELDS:
+        raise ValueError(f"not a raw field: {field!r}")
+    with connection_scope(conn) as conn:
+        row = conn.execute(f"SELECT {field} FROM listings WHERE id = ?", (listing_id,)).fetchone()
+        return row[0] if row else None
+
+
+class _LazyRawFields:
+    """
+    raw_title, raw_text and raw_url for row types that do not select them:
+    each is read from the database when accessed (rows are immutable, so
+    nothing is cached). List views never touch them.
+    """
+
+    __slots__ = ()
+
+    @property
+    def raw_title(self) -> Optional[str]:
+        return get_listing_raw_field(self.id, "raw_title")
+
+    @property
+    def raw_text(self) -> Optional[str]:
+        return get_listing_raw_field(self.id, "raw_text")
+
+    @property
+    def raw_url(self) -> Optional[str]:
+        return get_listing_raw_field(self.id, "raw_url")
+
+
+class Listing(_LazyRawFields, namedtuple("Listing", LISTING_FIELDS)):
+    """Listing summary row; the raw_* attributes are loaded on access."""
+
+    __slots__ = ()
+
+
+class FullListing(namedtuple("FullListing", LISTING_FIELDS + RAW_FIELDS)):
+    """Listing row with raw_title, raw_text and raw_url read up front."""
+
+    __slots__ = ()
+
+
+class SearchHit(_LazyRawFields, namedtuple("SearchHit", LISTING_FIELDS + ("snippet",))):
+    """search_query(snippets=True) row: a summary plus the match excerpt."""
+
+    __slots__ = ()
+
+
+class SimilarListing(_LazyRawFields, namedtuple("SimilarListing", LISTING_FIELDS + ("similarity",))):
+    """find_near_duplicates() row: a summary plus the estimated similarity."""
+
+    __slots__ = ()
+
+
+class Broker(namedtuple("Broker", ("id", "name", "raw_name", "notes", "created_at"))):
+    __slots__ = ()
+
+
+class SummaryCounts(namedtuple("SummaryCounts", ("brokers", "listings"))):
+    """get_summary_counts() result: total brokers and listings."""
+
+    __slots__ = ()
+
+
+class NameCount(namedtuple("NameCount", ("name", "listing_count"))):
+    """Analytics row: a broker, dimension value or band and its listing count."""
+
+    __slots__ = ()
+
+
+class SummaryMismatch(namedtuple("SummaryMismatch", ("table", "key", "stored", "actual"))):
+    """check_summary_tables() row: a summary count that differs from the listings."""
+
+    __slots__ = ()
+
+
+def _row_factory(row_type: Any) -> Callable[[sqlite3.Cursor, Tuple], Tuple]:
+    """A cursor row_factory that builds `row_type` rows from the column tuple."""
+    make = row_type._make
+    return lambda _cursor, row: make(row)
+
+
+_LISTING_ROWS = _row_factory(Listing)
+_FULL_LISTING_ROWS = _row_factory(FullListing)
+_BROKER_ROWS = _row_factory(Broker)
+_NAME_COUNT_ROWS = _row_factory(NameCount)
+
+
+# --- Dimension tables ---
+
+# Low-cardinality listing fields, stored as <field>_id into a small lookup
+# table (id, name) instead of repeating the text in every row:
+#   field -> (lookup table, canonical form of a name)
+# Empty values are stored as NULL.
+DIMENSIONS: Dict[str, Tuple[str, Callable[[str], str]]] = {
+    "access_type": ("access_types", str.lower),
+    "country": ("countries", str.upper),
+    "source": ("sources", str.lower),
+    "sector": ("sectors", str.lower),
+}
+
+# Names per INSERT ... ON CONFLICT statement in LookupTable.ids_for().
+LOOKUP_UPSERT_CHUNK = 300
+
+
+def _listing_column(field: str) -> str:
+    """The listings column holding `field`."""
+    return f"{field}_id" if field in DIMENSIONS else field
+
+
+def _listing_column_sql(field: str) -> str:
+    if field == "broker_name":
+        return "b.name AS broker_name"
+    if field in DIMENSIONS:
+        return f"COALESCE({DIMENSIONS[field][0]}.name, '') AS {field}"
+    return f"l.{field}"
+
+
+# Summary row columns of `listings l` (LISTING_FIELDS order) and the joins
+# they need: the broker and every dimension name.
+_LISTING_COLUMNS_SQL = ",\n            ".join(_listing_column_sql(field) for field in LISTING_FIELDS)
+_LISTING_JOINS_SQL = "JOIN brokers b ON l.broker_id = b.id" + "".join(
+    f"\n            LEFT JOIN {table} ON {table}.id = l.{field}_id"
+    for field, (table, _canonical) in DIMENSIONS.items()
+)
+
+
+class LookupTable:
+    """
+    Interned name -> id map for one dimension lookup table, so writes turn
+    names into ids without a query per row. Loaded with one query on first
+    use (and again after invalidate() or when DB_PATH changes); ids_for()
+    adds the names it creates. Invalidated with BROKER_RESOLVER when a
+    transaction() rolls back.
+    """
+
+    def __init__(self, table: str, canonical: Callable[[str], str]) -> None:
+        self.table = table
+        self._canonical = canonical
+        self._ids: Optional[Dict[str, int]] = None
+        self._db_path: Optional[Path] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ids = None
+
+    def canonical(self, value: Optional[str]) -> Optional[str]:
+        """The stored spelling of `value`, or None when it is empty."""
+        name = self._canonical(str(value or "").strip())
+        return sys.intern(name) if name else None
+
+    def _map(self, conn: Optional[sqlite3.Connection]) -> Dict[str, int]:
+        ids = self._ids
+        if ids is not None and self._db_path == DB_PATH:
+            return ids
+        with connection_scope(conn) as conn:
+            rows = conn.execute(f"SELECT name, id FROM {self.table}").fetchall()
+        ids = {sys.intern(name): id_ for name, id_ in rows}
+        with self._lock:
+            self._ids, self._db_path = ids, DB_PATH
+        return ids
+
+    def ids_for(
+        self,
+        values: Iterable[Optional[str]],
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Dict[str, int]:
+        """
+        Return {canonical name: id} for `values`, creating missing names with
+        one INSERT ... ON CONFLICT per LOOKUP_UPSERT_CHUNK names. Empty values
+        are skipped.
+        """
+        ids = self._map(conn)
+        result: Dict[str, int] = {}
+        missing: Dict[str, None] = {}
+        for value in values:
+            name = self.canonical(value)
+            if name is None or name in result:
+                continue
+            if name in ids:
+                result[name] = ids[name]
+            else:
+                missing[name] = None
+
+        if missing:
+            with connection_scope(conn) as conn:
+                cursor = conn.cursor()
+                for chunk in _batches(missing, LOOKUP_UPSERT_CHUNK):
+                    cursor.execute(
+                        f"""
+                        INSERT INTO {self.table} (name)
+                        VALUES {", ".join(["(?)"] * len(chunk))}
+                        ON CONFLICT(name) DO UPDATE SET name = excluded.name
+                        RETURNING name, id
+                        """,
+                        chunk,
+                    )
+                    created = {sys.intern(name): id_ for name, id_ in cursor.fetchall()}
+                    ids.update(created)
+                    result.update(created)
+        return result
+
+
+LOOKUP_TABLES = {field: LookupTable(table, canonical) for field, (table, canonical) in DIMENSIONS.items()}
+
+
+def _dimension_ids(
+    rows: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection],
+) -> List[Tuple[Optional[int], ...]]:
+    """The DIMENSIONS ids of each row (dicts with the field names), in order."""
+    columns = []
+    for field, lookup in LOOKUP_TABLES.items():
+        ids = lookup.ids_for((row.get(field) for row in rows), conn=conn)
+        columns.append([ids.get(lookup.canonical(row.get(field))) for row in rows])
+    return list(zip(*columns))
+
+
+def _invalidate_lookups() -> None:
+    """Forget cached ids after a rollback that may have removed new rows."""
+    BROKER_RESOLVER.invalidate()
+    for lookup in LOOKUP_TABLES.values():
+        lookup.invalidate()
+
+
+# ALTER TABLE ... DROP COLUMN (migrate_dimension_columns) and
+# INSERT ... RETURNING (BrokerResolver, LookupTable) need SQLite 3.35.
+SQLITE_MIN_VERSION = (3, 35, 0)
+
+
+def create_tables(conn: Optional[sqlite3.Connection] = None) -> None:
+    if sqlite3.sqlite_version_info < SQLITE_MIN_VERSION:
+        raise RuntimeError(
+            f"SQLite {'.'.join(map(str, SQLITE_MIN_VERSION))}+ is required "
+            f"(this Python uses {sqlite3.sqlite_version})"
+        )
+    if conn is None and PRAGMA_PROFILES[PRAGMA_PROFILE].get("query_only") == "ON":
+        # Schema upgrades need a writable connection.
+        conn = get_connection("interactive")
+        try:
+            create_tables(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return
+
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
 
         cursor.execute(
@@ -39,37 +487,76 @@ def create_tables() -> None:
             CREATE TABLE IF NOT EXISTS listings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 broker_id INTEGER NOT NULL,
-                access_type TEXT,
-                country TEXT,
+                access_type_id INTEGER REFERENCES access_types(id),
+                country_id INTEGER REFERENCES countries(id),
                 privilege TEXT,
                 price TEXT,
                 description TEXT,
-                source TEXT,
+                source_id INTEGER REFERENCES sources(id),
                 post_date TEXT,
-                sector TEXT,
+                sector_id INTEGER REFERENCES sectors(id),
                 revenue TEXT,
                 raw_title TEXT,
                 raw_text TEXT,
                 raw_url TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                fingerprint TEXT,           -- listing_fingerprint() of the duplicate-check fields
+                price_start INTEGER,        -- parse_price_amounts() of price
+                price_step INTEGER,
+                price_blitz INTEGER,
+                price_min_usd INTEGER,      -- lowest USD price (start, else plain amount, else blitz)
+                revenue_min_usd INTEGER,    -- parse_revenue_bounds() of revenue
+                revenue_max_usd INTEGER,    -- NULL when open-ended (">100M")
+                parser_version TEXT,        -- PARSER_VERSION of parsed_fields
+                parsed_fields TEXT,         -- parser suggestion (JSON) the listing was built from
                 FOREIGN KEY (broker_id) REFERENCES brokers(id) ON DELETE CASCADE
             )
             """
         )
 
+        add_column_if_missing(cursor, "listings", "fingerprint", "TEXT")
+        new_price_columns = [
+            column for column in PRICE_COLUMNS
+            if add_column_if_missing(cursor, "listings", column, "INTEGER")
+        ]
+        new_revenue_columns = [
+            column for column in REVENUE_COLUMNS
+            if add_column_if_missing(cursor, "listings", column, "INTEGER")
+        ]
+        add_column_if_missing(cursor, "listings", "parser_version", "TEXT")
+        add_column_if_missing(cursor, "listings", "parsed_fields", "TEXT")
+
+        for table, _canonical in DIMENSIONS.values():
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+                """
+            )
+        # Databases from before the lookup tables still store the names.
+        if has_column(cursor, "listings", "sector"):
+            migrate_dimension_columns(conn=conn)
+
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_brokers_name "
             "ON brokers(name)"
         )
 
+        # (x, created_at) indexes serve both the filter and the keyset page
+        # order; they replace the single-column broker_id/sector indexes.
+        cursor.execute("DROP INDEX IF EXISTS idx_listings_broker_id")
+        cursor.execute("DROP INDEX IF EXISTS idx_listings_sector")
+
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_listings_broker_id "
-            "ON listings(broker_id)"
+            "CREATE INDEX IF NOT EXISTS idx_listings_broker_created "
+            "ON listings(broker_id, created_at)"
         )
 
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_listings_sector "
-            "ON listings(sector)"
+            "CREATE INDEX IF NOT EXISTS idx_listings_sector_created "
+            "ON listings(sector_id, created_at)"
         )
 
         cursor.execute(
@@ -77,11 +564,649 @@ def create_tables() -> None:
             "ON listings(created_at)"
         )
 
-        conn.commit()
+        # post_date windows (DateWindow): alone or with a sector, and per broker.
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_post_date_sector "
+            "ON listings(post_date, sector_id)"
+        )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_broker_post_date "
+            "ON listings(broker_id, post_date)"
+        )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_fingerprint "
+            "ON listings(fingerprint)"
+        )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_price_min_usd "
+            "ON listings(price_min_usd)"
+        )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_price_blitz "
+            "ON listings(price_blitz)"
+        )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_revenue_min_usd "
+            "ON listings(revenue_min_usd)"
+        )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listings_revenue_max_usd "
+            "ON listings(revenue_max_usd)"
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,           -- sha256 of parser version + normalized post
+                parser_version TEXT NOT NULL,
+                fields TEXT NOT NULL,           -- suggest_listing_fields() result as JSON
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_parse_cache_parser_version "
+            "ON parse_cache(parser_version)"
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listing_minhash (
+                listing_id INTEGER PRIMARY KEY,  -- listings.id
+                signature BLOB NOT NULL          -- utils.minhash signature of raw_text (empty if none)
+            )
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listing_lsh (
+                bucket INTEGER NOT NULL,         -- utils.minhash.band_buckets() value
+                listing_id INTEGER NOT NULL,
+                PRIMARY KEY (bucket, listing_id)
+            ) WITHOUT ROWID
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listing_lsh_listing_id "
+            "ON listing_lsh(listing_id)"
+        )
+
+        # Signatures go with their listing however it is deleted (including
+        # the brokers ON DELETE CASCADE). Rows orphaned before the trigger
+        # existed are removed once, when it is created.
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'listings_minhash_ad'"
+        )
+        if cursor.fetchone() is None:
+            for table in ("listing_lsh", "listing_minhash"):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE listing_id NOT IN (SELECT id FROM listings)"
+                )
+            cursor.execute(
+                """
+                CREATE TRIGGER listings_minhash_ad AFTER DELETE ON listings BEGIN
+                    DELETE FROM listing_lsh WHERE listing_id = old.id;
+                    DELETE FROM listing_minhash WHERE listing_id = old.id;
+                END
+                """
+            )
+
+        # Before the summaries: the revenue band summary reads these columns.
+        if new_price_columns:
+            backfill_price_amounts(conn=conn)
+        if new_revenue_columns:
+            backfill_revenue_bounds(conn=conn)
+
+        create_search_index(conn)
+        create_summary_tables(conn)
+        backfill_fingerprints(conn=conn)
+
 
+def has_column(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cursor.fetchall())
 
-def insert_broker(name: str, raw_name: str, notes: str) -> int:
-    with get_connection() as conn:
+
+def add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, decl: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN unless the column exists. True if it was added."""
+    if has_column(cursor, table, column):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    return True
+
+
+def indexes_on_columns(cursor: sqlite3.Cursor, table: str, columns: Iterable[str]) -> List[str]:
+    """Names of the CREATE INDEX indexes on `table` that cover any of `columns`."""
+    columns = set(columns)
+    cursor.execute(f"PRAGMA index_list({table})")
+    names = [row[1] for row in cursor.fetchall() if row[3] == "c"]
+    found = []
+    for name in names:
+        cursor.execute(f'PRAGMA index_info("{name}")')
+        if any(row[2] in columns for row in cursor.fetchall()):
+            found.append(name)
+    return found
+
+
+# Triggers and summary tables that read the dimension name columns, dropped
+# before those columns are (create_tables() recreates them). Indexes on the
+# columns are found with indexes_on_columns(), since older schemas had
+# different ones (idx_listings_sector, then idx_listings_sector_created).
+_NAME_COLUMN_DEPENDENTS = (
+    ("TRIGGER", "listings_fts_ai"),
+    ("TRIGGER", "listings_fts_au"),
+    ("TRIGGER", "listings_stats_ai"),
+    ("TRIGGER", "listings_stats_ad"),
+    ("TRIGGER", "listings_stats_au"),
+    ("TABLE", "stats_sectors"),
+    ("TABLE", "stats_countries"),
+    ("TABLE", "stats_access_types"),
+)
+
+
+def migrate_dimension_columns(batch_size: int = 10000, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Move the DIMENSIONS fields of an older database from text columns to
+    lookup ids: fill the lookup tables and <field>_id columns `batch_size`
+    listings at a time, then drop the text columns (and the triggers,
+    indexes and summary tables that read them; create_tables() rebuilds
+    those).
+    Returns the number of listings migrated.
+
+    Dropping the columns leaves free pages behind; `python maintenance.py
+    vacuum` returns them to the file system.
+    """
+    fields = list(DIMENSIONS)
+    migrated = 0
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        for kind, name in _NAME_COLUMN_DEPENDENTS:
+            cursor.execute(f"DROP {kind} IF EXISTS {name}")
+        for name in indexes_on_columns(cursor, "listings", fields):
+            cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+        for field, (table, _canonical) in DIMENSIONS.items():
+            add_column_if_missing(cursor, "listings", f"{field}_id", f"INTEGER REFERENCES {table}(id)")
+
+        last_id = 0
+        while True:
+            cursor.execute(
+                f"SELECT id, {', '.join(fields)} FROM listings WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            ids = _dimension_ids([dict(zip(fields, row[1:])) for row in rows], conn)
+            cursor.executemany(
+                f"UPDATE listings SET {', '.join(f'{field}_id = ?' for field in fields)} WHERE id = ?",
+                [(*row_ids, row[0]) for row_ids, row in zip(ids, rows)],
+            )
+            migrated += len(rows)
+            last_id = rows[-1][0]
+
+        for field in fields:
+            cursor.execute(f"ALTER TABLE listings DROP COLUMN {field}")
+    return migrated
+
+
+def database_size(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Size of the database in bytes (pages in use and free pages)."""
+    with connection_scope(conn) as conn:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+
+def vacuum_database() -> Tuple[int, int]:
+    """
+    Rebuild the database file without its free pages. Returns the size in
+    bytes before and after. Runs on its own connection, since VACUUM cannot
+    run inside a transaction.
+    """
+    conn = get_connection()
+    try:
+        before = database_size(conn)
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return before, database_size(conn)
+    finally:
+        conn.close()
+
+
+PRICE_COLUMNS = ("price_start", "price_step", "price_blitz", "price_min_usd")
+REVENUE_COLUMNS = ("revenue_min_usd", "revenue_max_usd")
+
+
+def _price_values(price: Optional[str]) -> Tuple[Optional[int], ...]:
+    amounts = parse_price_amounts(price or "")
+    return tuple(amounts[column] for column in PRICE_COLUMNS)
+
+
+def _revenue_values(revenue: Optional[str]) -> Tuple[Optional[int], ...]:
+    return parse_revenue_bounds(revenue or "")
+
+
+def _backfill_derived_columns(
+    source: str,
+    columns: Tuple[str, ...],
+    compute: Callable[[Optional[str]], Tuple[Optional[int], ...]],
+    batch_size: int,
+    conn: Optional[sqlite3.Connection],
+) -> int:
+    """Recompute `columns` of every listing from its `source` column, in batches."""
+    updated = 0
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        last_id = 0
+        while True:
+            cursor.execute(
+                f"SELECT id, {source} FROM listings WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return updated
+            cursor.executemany(
+                f"UPDATE listings SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                [(*compute(value), listing_id) for listing_id, value in rows],
+            )
+            updated += len(rows)
+            last_id = rows[-1][0]
+
+
+def backfill_price_amounts(batch_size: int = 1000, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Recompute the integer price columns of every listing from its price
+    text, `batch_size` rows per UPDATE batch (run when the columns are
+    added). Returns the number of rows updated.
+    """
+    return _backfill_derived_columns("price", PRICE_COLUMNS, _price_values, batch_size, conn)
+
+
+def backfill_revenue_bounds(batch_size: int = 1000, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Recompute revenue_min_usd/revenue_max_usd of every listing from its
+    revenue text, in batches as backfill_price_amounts(). Returns the number
+    of rows updated.
+    """
+    return _backfill_derived_columns("revenue", REVENUE_COLUMNS, _revenue_values, batch_size, conn)
+
+
+def backfill_fingerprints(batch_size: int = 1000, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Fill in the fingerprint of listings that have none (rows from before the
+    column existed), `batch_size` rows per UPDATE batch. Returns the number
+    of rows updated.
+    """
+    updated = 0
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        last_id = 0
+        while True:
+            cursor.execute(
+                f"""
+                SELECT l.id, l.broker_id, access_types.name, countries.name, l.price, l.description,
+                       sources.name, l.post_date, sectors.name, l.revenue
+                FROM listings l
+                {_LISTING_JOINS_SQL}
+                WHERE l.fingerprint IS NULL AND l.id > ?
+                ORDER BY l.id
+                LIMIT ?
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return updated
+            cursor.executemany(
+                "UPDATE listings SET fingerprint = ? WHERE id = ?",
+                [(listing_fingerprint(*row[1:]), row[0]) for row in rows],
+            )
+            updated += len(rows)
+            last_id = rows[-1][0]
+
+
+# --- Full-text search ---
+
+# Columns of the listings_fts index, in order. broker_name and the
+# DIMENSIONS names are copied from their tables by the triggers; the rest
+# mirror listings.
+SEARCH_COLUMNS = (
+    "broker_name",
+    "access_type",
+    "country",
+    "privilege",
+    "price",
+    "description",
+    "source",
+    "post_date",
+    "sector",
+    "revenue",
+    "raw_title",
+    "raw_text",
+)
+
+# bm25() weight per column above: hits in titles and descriptions rank
+# higher than hits buried in the raw post.
+SEARCH_WEIGHTS = (2.0, 1.0, 1.0, 1.0, 1.0, 2.0, 1.0, 1.0, 1.0, 1.0, 3.0, 1.0)
+
+# Interactive searches (with a limit) rank only this many of the most recent
+# matches: BM25 has to score every candidate, which is what bounds latency.
+SEARCH_RANK_WINDOW = 5000
+
+SNIPPET_OPEN = "**"
+SNIPPET_CLOSE = "**"
+
+_FTS_VALUES = ", ".join(
+    ["{p}.id", "(SELECT name FROM brokers WHERE id = {p}.broker_id)"]
+    + [
+        f"(SELECT name FROM {DIMENSIONS[col][0]} WHERE id = {{p}}.{col}_id)" if col in DIMENSIONS
+        else f"{{p}}.{col}"
+        for col in SEARCH_COLUMNS[1:]
+    ]
+)
+
+_FTS_INSERT = (
+    f"INSERT INTO listings_fts (rowid, {', '.join(SEARCH_COLUMNS)}) "
+    f"VALUES ({_FTS_VALUES.format(p='new')});"
+)
+
+
+def _create_search_insert_trigger(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN
+            {_FTS_INSERT}
+        END
+        """
+    )
+
+
+def create_search_index(conn: Optional[sqlite3.Connection] = None) -> None:
+    """
+    Create the listings_fts table and the triggers that keep it in sync with
+    listings. A newly created index is filled from the existing listings,
+    and an existing one gets any listings newer than its last row (left
+    behind if a load with a paused trigger was interrupted).
+    """
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'listings_fts'"
+        )
+        exists = cursor.fetchone() is not None
+
+        cursor.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+                {', '.join(SEARCH_COLUMNS)},
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """
+        )
+
+        _create_search_insert_trigger(cursor)
+
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN
+                DELETE FROM listings_fts WHERE rowid = old.id;
+            END
+            """
+        )
+
+        # Only changes to indexed columns reindex a row (not e.g. backfills of
+        # derived columns); dropped first so older databases get this form.
+        cursor.execute("DROP TRIGGER IF EXISTS listings_fts_au")
+        indexed = ", ".join(["broker_id"] + [_listing_column(col) for col in SEARCH_COLUMNS[1:]])
+        cursor.execute(
+            f"""
+            CREATE TRIGGER listings_fts_au AFTER UPDATE OF {indexed} ON listings BEGIN
+                DELETE FROM listings_fts WHERE rowid = old.id;
+                {_FTS_INSERT}
+            END
+            """
+        )
+
+        if not exists:
+            rebuild_search_index(conn)
+            return
+        cursor.execute("SELECT rowid FROM listings_fts ORDER BY rowid DESC LIMIT 1")
+        row = cursor.fetchone()
+        index_listings_for_search(row[0] + 1 if row else 0, conn=conn)
+
+
+def rebuild_search_index(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Refill listings_fts from listings. Returns the number of rows indexed."""
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM listings_fts")
+        return index_listings_for_search(conn=conn)
+
+
+def index_listings_for_search(
+    first_id: int = 0,
+    last_id: int = -1,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    Add listings with first_id <= id <= last_id (all of them by default) to
+    listings_fts, for rows inserted while the insert trigger was paused.
+    """
+    where = "WHERE l.id >= ?" if last_id < 0 else "WHERE l.id BETWEEN ? AND ?"
+    params = (first_id,) if last_id < 0 else (first_id, last_id)
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            INSERT INTO listings_fts (rowid, {', '.join(SEARCH_COLUMNS)})
+            SELECT {_FTS_VALUES.format(p='l')}
+            FROM listings l
+            {where}
+            """,
+            params,
+        )
+        return cursor.rowcount
+
+
+_SEARCH_TERM_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+
+
+def build_search_match(q: str) -> str:
+    """
+    Translate a user query into an FTS5 MATCH expression.
+
+    - words must all match (implicit AND); OR / NOT between terms work
+    - "quoted words" match as a phrase
+    - word* matches by prefix
+    - column:term limits a term to one field, e.g. country:us sector:health*
+
+    Every term is quoted, so punctuation in a query never turns into FTS5
+    syntax errors. Returns "" when nothing searchable is left.
+    """
+    parts: List[str] = []
+    operator = "AND"
+
+    # SQLite ends an FTS5 string at a NUL, which would leave a quote open.
+    for m in _SEARCH_TERM_RE.finditer(q.replace("\0", " ")):
+        column, phrase, word = m.groups()
+
+        if column and column.lower() not in SEARCH_COLUMNS:
+            # Not a field filter (e.g. a URL): search for the text as is.
+            column, phrase, word = None, None, m.group(0).replace('"', " ")
+
+        if phrase is None and not column and word in ("AND", "OR", "NOT"):
+            if parts:
+                operator = word
+            continue
+
+        text = phrase if phrase is not None else word
+        prefix = phrase is None and text.endswith("*")
+        text = text.rstrip("*") if prefix else text
+        if not any(ch.isalnum() for ch in text):
+            continue
+
+        term = '"' + text.replace('"', '""') + '"' + ("*" if prefix else "")
+        if column:
+            term = f"{column.lower()} : {term}"
+
+        if parts:
+            parts.append(operator)
+        parts.append(term)
+        operator = "AND"
+
+    return " ".join(parts)
+
+
+# --- Near-duplicate index (MinHash/LSH over raw_text) ---
+
+# Default similarity (estimated Jaccard of raw_text shingles) above which a
+# stored post counts as a near duplicate.
+NEAR_DUP_THRESHOLD = 0.75
+
+# Upper bound on LSH candidates compared per lookup, so boilerplate posts
+# that share buckets with thousands of others stay cheap to check.
+NEAR_DUP_MAX_CANDIDATES = 200
+
+
+def _index_near_duplicates(cursor: sqlite3.Cursor, items: Iterable[Tuple[int, Optional[str]]]) -> None:
+    """Store signatures and LSH buckets for (listing_id, raw_text) pairs."""
+    signatures = []
+    buckets = []
+    for listing_id, raw_text in items:
+        sig = minhash_signature(raw_text or "")
+        signatures.append((listing_id, pack_signature(sig)))
+        if sig:
+            buckets.extend((bucket, listing_id) for bucket in band_buckets(sig))
+    cursor.executemany(
+        "INSERT OR REPLACE INTO listing_minhash (listing_id, signature) VALUES (?, ?)",
+        signatures,
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO listing_lsh (bucket, listing_id) VALUES (?, ?)",
+        buckets,
+    )
+
+
+def find_near_duplicates(
+    raw_text: str,
+    threshold: float = NEAR_DUP_THRESHOLD,
+    limit: int = 10,
+    exclude_id: Optional[int] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[SimilarListing]:
+    """
+    Listings whose raw_text is estimated at least `threshold` similar to
+    `raw_text`, most similar first.
+
+    Only listings sharing an LSH bucket are compared, so the cost depends on
+    the number of candidates, not on the table size. Rows are SimilarListing
+    summaries with the estimated `similarity` (0..1).
+    """
+    sig = minhash_signature(raw_text or "")
+    if not sig:
+        return []
+
+    buckets = band_buckets(sig)
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        # Candidates sharing more bands are likelier to be similar, so when
+        # the cap applies it drops the weakest ones.
+        cursor.execute(
+            f"""
+            SELECT m.listing_id, m.signature
+            FROM (
+                SELECT listing_id, COUNT(*) AS shared
+                FROM listing_lsh
+                WHERE bucket IN ({", ".join("?" for _ in buckets)})
+                GROUP BY listing_id
+                ORDER BY shared DESC
+                LIMIT ?
+            ) h
+            JOIN listing_minhash m ON m.listing_id = h.listing_id
+            """,
+            (*buckets, NEAR_DUP_MAX_CANDIDATES),
+        )
+        scores = {}
+        for listing_id, blob in cursor.fetchall():
+            if listing_id == exclude_id:
+                continue
+            score = similarity(sig, unpack_signature(blob))
+            if score >= threshold:
+                scores[listing_id] = score
+        if not scores:
+            return []
+
+        best = sorted(scores, key=lambda i: (-scores[i], -i))[:limit]
+        cursor.execute(
+            f"""
+            SELECT
+                {_LISTING_COLUMNS_SQL}
+            FROM listings l
+            {_LISTING_JOINS_SQL}
+            WHERE l.id IN ({", ".join("?" for _ in best)})
+            """,
+            best,
+        )
+        rows = {row[0]: tuple(row) for row in cursor.fetchall()}
+        return [SimilarListing._make(rows[i] + (scores[i],)) for i in best if i in rows]
+
+
+def backfill_near_duplicate_index(
+    batch_size: int = 500,
+    progress: Optional[Callable[[int], None]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    Compute signatures for listings that have none, `batch_size` at a time.
+    Called on its own, every batch is committed, so an interrupted run
+    resumes where it stopped. progress(done) is called after each batch.
+    Returns the number of listings indexed.
+    """
+    owns_conn = conn is None and not in_transaction_block()
+    done = 0
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        last_id = 0
+        while True:
+            cursor.execute(
+                """
+                SELECT l.id, l.raw_text
+                FROM listings l
+                LEFT JOIN listing_minhash m ON m.listing_id = l.id
+                WHERE m.listing_id IS NULL AND l.id > ?
+                ORDER BY l.id
+                LIMIT ?
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return done
+            _index_near_duplicates(cursor, [(row[0], row[1]) for row in rows])
+            if owns_conn:
+                conn.commit()
+            done += len(rows)
+            last_id = rows[-1][0]
+            if progress:
+                progress(done)
+
+
+def insert_broker(
+    name: str,
+    raw_name: str,
+    notes: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -90,13 +1215,14 @@ def insert_broker(name: str, raw_name: str, notes: str) -> int:
             """,
             (name, raw_name, notes),
         )
-        conn.commit()
+        BROKER_RESOLVER.invalidate()
         return cursor.lastrowid
-    
 
-def get_all_brokers() -> List[Tuple]:
-    with get_connection() as conn:
+
+def get_all_brokers(conn: Optional[sqlite3.Connection] = None) -> List[Broker]:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.row_factory = _BROKER_ROWS
         cursor.execute(
             """
             SELECT id, name, raw_name, notes, created_at
@@ -107,9 +1233,10 @@ def get_all_brokers() -> List[Tuple]:
         return cursor.fetchall()
 
 
-def find_broker_by_name(name: str) -> Optional[Tuple]:
-    with get_connection() as conn:
+def find_broker_by_name(name: str, conn: Optional[sqlite3.Connection] = None) -> Optional[Broker]:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.row_factory = _BROKER_ROWS
         cursor.execute(
             """
             SELECT id, name, raw_name, notes, created_at
@@ -121,9 +1248,10 @@ def find_broker_by_name(name: str) -> Optional[Tuple]:
         return cursor.fetchone()
 
 
-def get_broker_by_id(broker_id: int) -> Optional[Tuple]:
-    with get_connection() as conn:
+def get_broker_by_id(broker_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[Broker]:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.row_factory = _BROKER_ROWS
         cursor.execute(
             """
             SELECT id, name, raw_name, notes, created_at
@@ -133,7 +1261,104 @@ def get_broker_by_id(broker_id: int) -> Optional[Tuple]:
             (broker_id,),
         )
         return cursor.fetchone()
-    
+
+
+# --- Broker resolution ---
+
+# Names per INSERT ... ON CONFLICT statement in resolve_or_create_many().
+BROKER_UPSERT_CHUNK = 300
+
+
+class BrokerResolver:
+    """
+    In-process map of normalized broker name -> broker ID, so resolving a
+    broker for every listing is a dict lookup instead of a query.
+
+    The map is loaded with one query on first use (and again after
+    invalidate() or when DB_PATH changes). insert_broker(), insert_brokers()
+    and a rolled-back transaction() invalidate it; resolve_or_create_many()
+    adds the brokers it creates. A caller that rolls back its own
+    connection after creating brokers should call invalidate() too. Names
+    missing from the map are looked up before being reported unknown, so
+    brokers added by another process are still found.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Optional[Dict[str, int]] = None
+        self._db_path: Optional[Path] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ids = None
+
+    def _map(self, conn: Optional[sqlite3.Connection]) -> Dict[str, int]:
+        ids = self._ids
+        if ids is not None and self._db_path == DB_PATH:
+            return ids
+        with connection_scope(conn) as conn:
+            rows = conn.execute("SELECT name, id FROM brokers").fetchall()
+        ids = dict(rows)
+        with self._lock:
+            self._ids, self._db_path = ids, DB_PATH
+        return ids
+
+    def resolve(self, name: str, conn: Optional[sqlite3.Connection] = None) -> Optional[int]:
+        """ID of the broker with this normalized name, or None."""
+        ids = self._map(conn)
+        broker_id = ids.get(name)
+        if broker_id is None:
+            row = find_broker_by_name(name, conn=conn)
+            if row:
+                broker_id = ids[name] = row[0]
+        return broker_id
+
+    def resolve_or_create_many(
+        self,
+        names: Iterable[str],
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Dict[str, int]:
+        """
+        Return {normalized name: ID} for raw broker names, creating the
+        brokers that do not exist yet (raw_name is the first spelling seen).
+        Names that normalize to "" are skipped. Unknown names are upserted on
+        ux_brokers_name with one INSERT ... ON CONFLICT per
+        BROKER_UPSERT_CHUNK names, so a broker created concurrently by
+        another writer is returned instead of raising IntegrityError.
+        """
+        ids = self._map(conn)
+        result: Dict[str, int] = {}
+        missing: Dict[str, str] = {}
+        for raw_name in names:
+            name = normalize_broker_name(raw_name)
+            if not name or name in result:
+                continue
+            if name in ids:
+                result[name] = ids[name]
+            else:
+                missing.setdefault(name, raw_name)
+
+        if missing:
+            with connection_scope(conn) as conn:
+                cursor = conn.cursor()
+                for chunk in _batches(missing.items(), BROKER_UPSERT_CHUNK):
+                    cursor.execute(
+                        f"""
+                        INSERT INTO brokers (name, raw_name, notes)
+                        VALUES {", ".join(["(?, ?, '')"] * len(chunk))}
+                        ON CONFLICT(name) DO UPDATE SET name = excluded.name
+                        RETURNING name, id
+                        """,
+                        [value for item in chunk for value in item],
+                    )
+                    created = dict(cursor.fetchall())
+                    ids.update(created)
+                    result.update(created)
+        return result
+
+
+BROKER_RESOLVER = BrokerResolver()
+
 
 def insert_listing(
     broker_id: int,
@@ -149,257 +1374,905 @@ def insert_listing(
     raw_title: Optional[str] = None,
     raw_text: Optional[str] = None,
     raw_url: Optional[str] = None,
+    parser_version: Optional[str] = None,
+    parsed_fields: Optional[Dict[str, str]] = None,
+    conn: Optional[sqlite3.Connection] = None,
 ) -> int:
     """
     Insert a listing.
 
     raw_title/raw_text/raw_url are new in v0.4. Existing callers can ignore them;
     they default to empty strings for backward compatibility.
+
+    Listings built from parser suggestions pass the normalized suggestion as
+    parsed_fields (with its parser_version), so a later reparse can tell
+    parser values from analyst edits.
+
+    Pass `conn` to insert inside the caller's transaction; nothing is
+    committed until the caller commits.
     """
-    with get_connection() as conn:
+    fingerprint = listing_fingerprint(
+        broker_id, access_type, country, price, description, source, post_date, sector, revenue
+    )
+    names = {"access_type": access_type, "country": country, "source": source, "sector": sector}
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        access_type_id, country_id, source_id, sector_id = _dimension_ids([names], conn)[0]
         cursor.execute(
             """
             INSERT INTO listings (
                 broker_id,
-                access_type,
-                country,
+                access_type_id,
+                country_id,
                 privilege,
                 price,
                 description,
-                source,
+                source_id,
                 post_date,
-                sector,
+                sector_id,
                 revenue,
                 raw_title,
                 raw_text,
-                raw_url
+                raw_url,
+                fingerprint,
+                price_start,
+                price_step,
+                price_blitz,
+                price_min_usd,
+                revenue_min_usd,
+                revenue_max_usd,
+                parser_version,
+                parsed_fields
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                broker_id,
+                access_type_id,
+                country_id,
+                privilege,
+                price,
+                description,
+                source_id,
+                post_date,
+                sector_id,
+                revenue,
+                raw_title,
+                raw_text,
+                raw_url,
+                fingerprint,
+                *_price_values(price),
+                *_revenue_values(revenue),
+                parser_version,
+                _parsed_fields_json(parsed_fields),
+            ),
+        )
+        listing_id = cursor.lastrowid
+        _index_near_duplicates(cursor, [(listing_id, raw_text)])
+        return listing_id
+
+
+LISTING_INSERT_COLUMNS = (
+    "broker_id",
+    "privilege",
+    "price",
+    "description",
+    "post_date",
+    "revenue",
+    "raw_title",
+    "raw_text",
+    "raw_url",
+    "parser_version",
+)
+
+# Computed from the row by insert_listings(): the DIMENSIONS ids (from the
+# access_type, country, source and sector names), then the rest.
+LISTING_DERIVED_COLUMNS = (
+    tuple(_listing_column(field) for field in DIMENSIONS)
+    + ("fingerprint",) + PRICE_COLUMNS + REVENUE_COLUMNS + ("parsed_fields",)
+)
+
+
+def _parsed_fields_json(parsed_fields: Optional[Dict[str, str]]) -> Optional[str]:
+    return json.dumps(parsed_fields, sort_keys=True) if parsed_fields is not None else None
+
+
+def _listing_row_fingerprint(row: Dict[str, Any]) -> str:
+    return row.get("fingerprint") or listing_fingerprint(
+        row["broker_id"],
+        row.get("access_type"),
+        row.get("country"),
+        row.get("price"),
+        row.get("description"),
+        row.get("source"),
+        row.get("post_date"),
+        row.get("sector"),
+        row.get("revenue"),
+    )
+
+
+def _batches(rows: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, max(1, batch_size)))
+        if not batch:
+            return
+        yield batch
+
+
+def _executemany_ids(cursor: sqlite3.Cursor, sql: str, params: List[Tuple]) -> List[int]:
+    """
+    Run one executemany() and return the rowids it assigned.
+
+    The statement runs inside a single write transaction and the tables use
+    AUTOINCREMENT without explicit ids, so the new rows get consecutive ids
+    ending at last_insert_rowid().
+    """
+    cursor.executemany(sql, params)
+    cursor.execute("SELECT last_insert_rowid()")
+    last_id = cursor.fetchone()[0]
+    return list(range(last_id - len(params) + 1, last_id + 1))
+
+
+def drop_table_indexes(table: str, conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """
+    Drop the plain secondary indexes on `table` and return their
+    (name, CREATE sql) so they can be rebuilt with `restore_indexes`.
+
+    Unique indexes are kept: they enforce constraints, not just lookups.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT name, sql
+        FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+        """,
+        (table,),
+    )
+    indexes = [
+        (name, sql) for name, sql in cursor.fetchall()
+        if not sql.upper().startswith("CREATE UNIQUE")
+    ]
+    for name, _sql in indexes:
+        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+    return indexes
+
+
+def restore_indexes(indexes: List[Tuple[str, str]], conn: sqlite3.Connection) -> None:
+    cursor = conn.cursor()
+    for _name, sql in indexes:
+        cursor.execute(sql)
+
+
+def insert_listings(
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = 1000,
+    defer_indexes: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[int]:
+    """
+    Insert many listings with executemany(), `batch_size` rows per statement,
+    and return their new IDs in input order.
+
+    Each row is a dict with the insert_listing() arguments; raw_title,
+    raw_text, raw_url, parser_version and parsed_fields may be left out. The integer price and revenue
+    columns are computed from price and revenue, and the fingerprint unless
+    the row already carries one.
+
+    Called on its own, every batch is its own transaction (one commit per
+    batch instead of per row). With `conn`, inside transaction(), or while
+    the shared connection has a transaction open, everything joins that
+    transaction and nothing is committed here.
+
+    defer_indexes=True drops the secondary listings indexes for the load and
+    rebuilds them at the end (also when the load fails), which is faster for
+    large backlogs. Lookups that rely on those indexes, such as duplicate
+    checks, are slow while the load runs; if the process dies mid-load,
+    create_tables() recreates them on the next start. Each batch also adds
+    its rows to the search index in one statement, with the per-row trigger
+    paused inside the batch's own transaction, so committed rows are always
+    searchable and other connections never see the trigger missing.
+    """
+    columns = LISTING_INSERT_COLUMNS + LISTING_DERIVED_COLUMNS
+    sql = (
+        f"INSERT INTO listings ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    outside_block = conn is None and not in_transaction_block()
+    ids: List[int] = []
+
+    with connection_scope(conn) as conn:
+        # An implicit transaction already open on the shared connection is
+        # joined; BEGIN would fail inside it.
+        owns_conn = outside_block and not conn.in_transaction
+        cursor = conn.cursor()
+        dropped: List[Tuple[str, str]] = []
+        if defer_indexes:
+            dropped = drop_table_indexes("listings", conn)
+            if owns_conn:
+                conn.commit()
+
+        try:
+            for batch in _batches(rows, batch_size):
+                if owns_conn:
+                    cursor.execute("BEGIN IMMEDIATE")
+                if defer_indexes:
+                    cursor.execute("DROP TRIGGER IF EXISTS listings_fts_ai")
+                params = [
+                    tuple(row.get(col) for col in LISTING_INSERT_COLUMNS)
+                    + dimension_ids
+                    + (_listing_row_fingerprint(row),)
+                    + _price_values(row.get("price"))
+                    + _revenue_values(row.get("revenue"))
+                    + (_parsed_fields_json(row.get("parsed_fields")),)
+                    for row, dimension_ids in zip(batch, _dimension_ids(batch, conn))
+                ]
+                batch_ids = _executemany_ids(cursor, sql, params)
+                _index_near_duplicates(cursor, zip(batch_ids, (row.get("raw_text") for row in batch)))
+                if defer_indexes:
+                    index_listings_for_search(batch_ids[0], batch_ids[-1], conn=conn)
+                    _create_search_insert_trigger(cursor)
+                ids.extend(batch_ids)
+                if owns_conn:
+                    conn.commit()
+        except BaseException:
+            _invalidate_lookups()
+            raise
+        finally:
+            if defer_indexes:
+                if owns_conn and conn.in_transaction:
+                    conn.rollback()
+                # Joined transactions may fail mid-batch, trigger dropped.
+                _create_search_insert_trigger(cursor)
+                restore_indexes(dropped, conn)
+                if owns_conn:
+                    conn.commit()
+
+    return ids
+
+
+def insert_brokers(
+    rows: Iterable[Tuple[str, str, str]],
+    batch_size: int = 1000,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[int]:
+    """
+    Insert many (name, raw_name, notes) brokers and return their new IDs in
+    input order. Transactions work as in insert_listings(); a name that
+    already exists raises sqlite3.IntegrityError like insert_broker().
+    """
+    sql = "INSERT INTO brokers (name, raw_name, notes) VALUES (?, ?, ?)"
+    outside_block = conn is None and not in_transaction_block()
+    ids: List[int] = []
+
+    with connection_scope(conn) as conn:
+        owns_conn = outside_block and not conn.in_transaction
+        cursor = conn.cursor()
+        for batch in _batches(rows, batch_size):
+            if owns_conn:
+                cursor.execute("BEGIN IMMEDIATE")
+            ids.extend(_executemany_ids(cursor, sql, [tuple(row) for row in batch]))
+            if owns_conn:
+                conn.commit()
+
+    BROKER_RESOLVER.invalidate()
+    return ids
+
+
+def get_listing_by_id(
+    listing_id: int,
+    include_raw: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[Listing]:
+    """
+    A single listing by ID, joined with broker name. By default a Listing
+    summary whose raw_* attributes are read only if accessed (edit and
+    delete never need them); include_raw=True selects them up front as a
+    FullListing, for the detail view.
+    """
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = _FULL_LISTING_ROWS if include_raw else _LISTING_ROWS
+        cursor.execute(
+            f"""
+            SELECT
+                {_LISTING_COLUMNS_SQL}{_RAW_COLUMNS_SQL if include_raw else ""}
+            FROM listings l
+            {_LISTING_JOINS_SQL}
+            WHERE l.id = ?
+            """,
+            (listing_id,),
+        )
+        return cursor.fetchone()
+
+
+# Position in a listing list: (created_at, id) of a row on the current page.
+PageCursor = Tuple[str, int]
+
+
+def _keyset_page(
+    after: Optional[PageCursor],
+    before: Optional[PageCursor],
+    page_size: Optional[int],
+) -> Tuple[str, str, Dict[str, Any], bool]:
+    """
+    Keyset pagination for listing queries, newest first on (created_at, id).
+
+    Returns (condition, order/limit clause, params, reverse). `after` pages
+    forward (older rows), `before` pages back (newer rows); going back reads
+    in ascending order, so the rows have to be reversed afterwards.
+    """
+    params: Dict[str, Any] = {"page_size": page_size if page_size is not None else -1}
+    condition = "1"
+    order = "DESC"
+    if after is not None:
+        condition = "(l.created_at, l.id) < (:cursor_created, :cursor_id)"
+        params.update(cursor_created=after[0], cursor_id=after[1])
+    elif before is not None:
+        condition = "(l.created_at, l.id) > (:cursor_created, :cursor_id)"
+        params.update(cursor_created=before[0], cursor_id=before[1])
+        order = "ASC"
+    clause = f"ORDER BY l.created_at {order}, l.id {order} LIMIT :page_size"
+    return condition, clause, params, order == "ASC"
+
+
+def _fetch_page(cursor: sqlite3.Cursor, sql: str, params: Dict[str, Any], reverse: bool) -> List[Listing]:
+    cursor.row_factory = _LISTING_ROWS
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    if reverse:
+        rows.reverse()
+    return rows
+
+
+# Listing columns a DateWindow can filter on: when the broker posted the
+# access, or when the listing was stored.
+DATE_FIELDS = ("post_date", "created_at")
+
+
+class DateWindow(NamedTuple):
+    """
+    Inclusive date range (YYYY-MM-DD) for listing queries, on `field` (one
+    of DATE_FIELDS). A None end is open; listings without a date never match.
+    """
+
+    since: Optional[str] = None
+    until: Optional[str] = None
+    field: str = "post_date"
+
+
+def last_days(days: int, field: str = "post_date") -> DateWindow:
+    """The window of the last `days` days, today (UTC) included."""
+    today = datetime.now(timezone.utc).date()
+    return DateWindow(since=(today - timedelta(days=days - 1)).isoformat(), field=field)
+
+
+def _date_window_filters(
+    window: Optional[DateWindow],
+    params: Dict[str, Any],
+    indexed: bool = True,
+) -> List[str]:
+    """
+    Conditions on `listings l` for `window`, with their params added to
+    `params`. The upper bound compares against the next day, so `until`
+    includes all of that day's created_at timestamps.
+
+    With indexed=False a post_date window is written as +l.post_date, which
+    keeps SQLite from reading a wide window through the post_date index and
+    sorting it, instead of walking the pages in created_at order (see
+    _narrow_range()).
+    """
+    if window is None or (window.since is None and window.until is None):
+        return []
+    if window.field not in DATE_FIELDS:
+        raise ValueError(f"Unknown date field: {window.field!r}")
+    column = f"l.{window.field}"
+    if not indexed and window.field == "post_date":
+        column = "+" + column
+    # A lower bound also keeps out empty post dates.
+    filters = [f"{column} >= :window_since"]
+    params["window_since"] = window.since or "0001-01-01"
+    if window.until is not None:
+        filters.append(f"{column} < date(:window_until, '+1 day')")
+        params["window_until"] = window.until
+    return filters
+
+
+def _date_window_candidates(
+    window: Optional[DateWindow],
+    dates: List[str],
+    index: str = "idx_listings_post_date_sector",
+    filters: Iterable[str] = (),
+) -> List[Tuple[str, str]]:
+    """
+    The _narrow_range() candidate for a post_date window: `index` with the
+    window and any `filters` that index also covers. created_at windows need
+    none, since the pages are read in created_at order anyway.
+    """
+    if not dates or window.field != "post_date":
+        return []
+    return [(index, " AND ".join([*filters, *dates]))]
+
+
+def get_all_listings(
+    page_size: Optional[int] = None,
+    after: Optional[PageCursor] = None,
+    before: Optional[PageCursor] = None,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Listing]:
+    """
+    Listings, newest first. Without page_size every listing is returned;
+    with it, one page of rows older than `after` (or newer than `before`),
+    where the cursor is the (created_at, id) of a row on the current page.
+    `window` keeps only listings posted (or stored) within a DateWindow.
+
+    Rows are Listing summaries (LISTING_FIELDS): raw_title, raw_text and
+    raw_url are not selected, so long posts are never read for a list view.
+    """
+    condition, clause, params, reverse = _keyset_page(after, before, page_size)
+    dates = _date_window_filters(window, params)
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        index = _narrow_range(cursor, _date_window_candidates(window, dates), params)
+        dates = _date_window_filters(window, params, indexed=index is not None)
+        return _fetch_page(
+            cursor,
+            f"""
+            SELECT
+                {_LISTING_COLUMNS_SQL}
+            FROM listings l {f"INDEXED BY {index}" if index else ""}
+            {_LISTING_JOINS_SQL}
+            WHERE {" AND ".join([*dates, condition])}
+            {clause}
             """,
-            (
-                broker_id,
-                access_type,
-                country,
-                privilege,
-                price,
-                description,
-                source,
-                post_date,
-                sector,
-                revenue,
-                raw_title,
-                raw_text,
-                raw_url,
-            ),
+            params,
+            reverse,
         )
-        conn.commit()
-        return cursor.lastrowid
 
 
-def get_listing_by_id(listing_id: int) -> Optional[Tuple]:
-    """
-    Return a single listing row by ID, joined with broker name.
-
-    Row layout:
-    (
-        id,
-        broker_name,
-        access_type,
-        country,
-        privilege,
-        price,
-        description,
-        source,
-        post_date,
-        sector,
-        revenue,
-        raw_title,
-        raw_text,
-        raw_url,
-        created_at,
-    )
-    """
-    with get_connection() as conn:
+def find_listings_by_broker_name(
+    broker_name: str,
+    page_size: Optional[int] = None,
+    after: Optional[PageCursor] = None,
+    before: Optional[PageCursor] = None,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Listing]:
+    """Listings of one broker, newest first; paging and window as in get_all_listings()."""
+    condition, clause, params, reverse = _keyset_page(after, before, page_size)
+    params["broker_name"] = broker_name
+    filters = ["l.broker_id = (SELECT id FROM brokers WHERE name = :broker_name)"]
+    dates = _date_window_filters(window, params)
+    candidates = _date_window_candidates(window, dates, "idx_listings_broker_post_date", filters)
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
+        index = _narrow_range(cursor, candidates, params)
+        dates = _date_window_filters(window, params, indexed=index is not None)
+        return _fetch_page(
+            cursor,
+            f"""
             SELECT
-                l.id,
-                b.name AS broker_name,
-                l.access_type,
-                l.country,
-                l.privilege,
-                l.price,
-                l.description,
-                l.source,
-                l.post_date,
-                l.sector,
-                l.revenue,
-                l.raw_title,
-                l.raw_text,
-                l.raw_url,
-                l.created_at
-            FROM listings l
-            JOIN brokers b ON l.broker_id = b.id
-            WHERE l.id = ?
+            {_LISTING_COLUMNS_SQL}
+            FROM listings l {f"INDEXED BY {index}" if index else ""}
+            {_LISTING_JOINS_SQL}
+            WHERE {" AND ".join([*filters, *dates])}
+            AND {condition}
+            {clause}
             """,
-            (listing_id,),
+            params,
+            reverse,
         )
-        return cursor.fetchone()
 
 
-def get_all_listings() -> List[Tuple]:
-    with get_connection() as conn:
+def find_listings_by_sector(
+    sector: str,
+    page_size: Optional[int] = None,
+    after: Optional[PageCursor] = None,
+    before: Optional[PageCursor] = None,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Listing]:
+    """Listings in one sector, newest first; paging and window as in get_all_listings()."""
+    condition, clause, params, reverse = _keyset_page(after, before, page_size)
+    params["sector"] = sector
+    filters = ["l.sector_id = (SELECT id FROM sectors WHERE name = :sector)"]
+    dates = _date_window_filters(window, params)
+    candidates = _date_window_candidates(window, dates, filters=filters)
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
+        index = _narrow_range(cursor, candidates, params)
+        dates = _date_window_filters(window, params, indexed=index is not None)
+        return _fetch_page(
+            cursor,
+            f"""
             SELECT
-                l.id,
-                b.name AS broker_name,
-                l.access_type,
-                l.country,
-                l.privilege,
-                l.price,
-                l.description,
-                l.source,
-                l.post_date,
-                l.sector,
-                l.revenue,
-                l.raw_title,
-                l.raw_text,
-                l.raw_url,
-                l.created_at
-            FROM listings l
-            JOIN brokers b ON l.broker_id = b.id
-            ORDER BY l.created_at DESC
-            """
+            {_LISTING_COLUMNS_SQL}
+            FROM listings l {f"INDEXED BY {index}" if index else ""}
+            {_LISTING_JOINS_SQL}
+            WHERE {" AND ".join([*filters, *dates])}
+            AND {condition}
+            {clause}
+            """,
+            params,
+            reverse,
         )
-        return cursor.fetchall()
 
+# Price, revenue and post_date ranges matching fewer rows than this are read
+# through the column's index instead of walking listings newest first (see
+# _narrow_range).
+RANGE_PROBE_ROWS = 5000
 
 
-def find_listings_by_broker_name(broker_name: str) -> List[Tuple]:
-    with get_connection() as conn:
-        cursor = conn.cursor()
+def _narrow_range(
+    cursor: sqlite3.Cursor,
+    candidates: List[Tuple[str, str]],
+    params: Dict[str, Any],
+) -> Optional[str]:
+    """
+    Pick the index to read a price, revenue or post_date range through: the
+    first of `candidates` ((index, condition on its column) pairs) matching
+    fewer than RANGE_PROBE_ROWS listings, or None to walk listings newest
+    first.
+
+    Walking created_at finds a page quickly when many rows match, but scans
+    the whole table when few do; those are cheaper to read from the range
+    column's index and sort. Each probe reads at most RANGE_PROBE_ROWS
+    entries of one index.
+    """
+    for index, condition in candidates:
         cursor.execute(
-            """
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM listings l INDEXED BY {index} "
+            f"WHERE {condition} LIMIT :probe)",
+            {**params, "probe": RANGE_PROBE_ROWS},
+        )
+        if cursor.fetchone()[0] < RANGE_PROBE_ROWS:
+            return index
+    return None
+
+
+def find_listings_by_price(
+    min_usd: Optional[int] = None,
+    max_usd: Optional[int] = None,
+    sector: Optional[str] = None,
+    privilege: Optional[str] = None,
+    page_size: Optional[int] = None,
+    after: Optional[PageCursor] = None,
+    before: Optional[PageCursor] = None,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Listing]:
+    """
+    Listings whose lowest USD price (price_min_usd) is within
+    [min_usd, max_usd], optionally in one sector and/or with one privilege,
+    newest first; paging and window as in get_all_listings(). Listings
+    without a parseable USD price never match.
+    """
+    condition, clause, params, reverse = _keyset_page(after, before, page_size)
+    filters = ["l.price_min_usd IS NOT NULL"]
+    if min_usd is not None:
+        filters.append("l.price_min_usd >= :min_usd")
+        params["min_usd"] = min_usd
+    if max_usd is not None:
+        filters.append("l.price_min_usd <= :max_usd")
+        params["max_usd"] = max_usd
+    candidates = [("idx_listings_price_min_usd", " AND ".join(filters))]
+    if sector:
+        filters.append("l.sector_id = (SELECT id FROM sectors WHERE name = :sector)")
+        params["sector"] = sector
+    if privilege:
+        filters.append("l.privilege = :privilege")
+        params["privilege"] = privilege
+    dates = _date_window_filters(window, params)
+    candidates += _date_window_candidates(window, dates)
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        index = _narrow_range(cursor, candidates, params)
+        filters += _date_window_filters(window, params, indexed=index is not None)
+        return _fetch_page(
+            cursor,
+            f"""
             SELECT
-            l.id,
-            b.name AS broker_name,
-            l.access_type,
-            l.country,
-            l.privilege,
-            l.price,
-            l.description,
-            l.source,
-            l.post_date,
-            l.sector,
-            l.revenue,
-            l.raw_title,
-            l.raw_text,
-            l.raw_url,
-            l.created_at
-            FROM listings l
-            JOIN brokers b ON l.broker_id = b.id
-            WHERE b.name = ?
-            ORDER BY l.created_at DESC
+            {_LISTING_COLUMNS_SQL}
+            FROM listings l {f"INDEXED BY {index}" if index else ""}
+            {_LISTING_JOINS_SQL}
+            WHERE {" AND ".join(filters)}
+            AND {condition}
+            {clause}
             """,
-            (broker_name,),
+            params,
+            reverse,
         )
-        return cursor.fetchall()
-     
 
-def find_listings_by_sector(sector: str) -> List[Tuple]:
-    with get_connection() as conn:
+
+def find_listings_by_revenue(
+    min_usd: Optional[int] = None,
+    max_usd: Optional[int] = None,
+    page_size: Optional[int] = None,
+    after: Optional[PageCursor] = None,
+    before: Optional[PageCursor] = None,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Listing]:
+    """
+    Listings whose whole revenue range is within [min_usd, max_usd], newest
+    first; paging and window as in get_all_listings(). "revenue >= 100M" is
+    min_usd=100_000_000. Open-ended revenues (">100M") only match without
+    max_usd, and listings with unknown revenue never match.
+    """
+    condition, clause, params, reverse = _keyset_page(after, before, page_size)
+    filters = ["l.revenue_min_usd IS NOT NULL"]
+    candidates = []
+    if min_usd is not None:
+        filters.append("l.revenue_min_usd >= :min_usd")
+        params["min_usd"] = min_usd
+        candidates.append(("idx_listings_revenue_min_usd", "l.revenue_min_usd >= :min_usd"))
+    if max_usd is not None:
+        filters.append("l.revenue_max_usd <= :max_usd")
+        params["max_usd"] = max_usd
+        candidates.append(("idx_listings_revenue_max_usd", "l.revenue_max_usd <= :max_usd"))
+    dates = _date_window_filters(window, params)
+    candidates += _date_window_candidates(window, dates)
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
+        index = _narrow_range(cursor, candidates, params)
+        filters += _date_window_filters(window, params, indexed=index is not None)
+        return _fetch_page(
+            cursor,
+            f"""
             SELECT
-            l.id,
-            b.name AS broker_name,
-            l.access_type,
-            l.country,
-            l.privilege,
-            l.price,
-            l.description,
-            l.source,
-            l.post_date,
-            l.sector,
-            l.revenue,
-            l.raw_title,
-            l.raw_text,
-            l.raw_url,
-            l.created_at
-            FROM listings l
-            JOIN brokers b ON l.broker_id = b.id
-            WHERE l.sector = ?
-            ORDER BY l.created_at DESC
+            {_LISTING_COLUMNS_SQL}
+            FROM listings l {f"INDEXED BY {index}" if index else ""}
+            {_LISTING_JOINS_SQL}
+            WHERE {" AND ".join(filters)}
+            AND {condition}
+            {clause}
             """,
-            (sector,),
+            params,
+            reverse,
         )
-        return cursor.fetchall()
 
-def search_query(q: str) -> List[Tuple]:
 
-    tokens = [t.strip().lower() for t in q.split() if t.strip()]
-    if not tokens:
+def _search_sql(extra_columns: str = "", dates: Iterable[str] = ()) -> str:
+    """
+    The ranked search statement behind search_query() and
+    iter_search_results(). Date window conditions (`dates`) apply before
+    the rank window, so it holds the most recent matches inside the dates.
+    """
+    dates = list(dates)
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    date_join = "JOIN listings l ON l.id = listings_fts.rowid" if dates else ""
+    date_filter = "".join(f" AND {condition}" for condition in dates)
+    return f"""
+        WITH ranked AS (
+            SELECT id, score FROM (
+                SELECT listings_fts.rowid AS id, bm25(listings_fts, {weights}) AS score
+                FROM listings_fts
+                {date_join}
+                WHERE listings_fts MATCH :match{date_filter}
+                ORDER BY listings_fts.rowid DESC
+                LIMIT :window
+            )
+            ORDER BY score, id DESC
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT
+            {_LISTING_COLUMNS_SQL}{extra_columns}
+        FROM ranked
+        JOIN listings l ON l.id = ranked.id
+        {_LISTING_JOINS_SQL}
+        ORDER BY ranked.score, l.id DESC
+    """
+
+
+def search_query(
+    q: str,
+    limit: Optional[int] = None,
+    snippets: bool = False,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+    offset: int = 0,
+) -> List[Listing]:
+    """
+    Full-text search over listings (structured fields, raw title and raw
+    text), best matches first by BM25. See build_search_match() for the
+    query syntax.
+
+    With a `limit`, only the SEARCH_RANK_WINDOW most recent matches are
+    ranked, so a very common term costs the same at 10k or 1M listings.
+    Older matches are cut off before ranking: when a query matches more
+    than SEARCH_RANK_WINDOW listings, a better but older match is not
+    returned at all (compare count_search_results() with the window).
+    Without a limit every match is returned, ranked. `offset` skips that
+    many ranked rows, for paging. `window` keeps only matches posted (or
+    stored) within a DateWindow.
+
+    Rows are Listing summaries; with snippets=True they are SearchHit rows
+    whose `snippet` holds a short excerpt around the match, with the matched
+    terms wrapped in SNIPPET_OPEN / SNIPPET_CLOSE.
+    """
+    match = build_search_match(q)
+    if not match:
         return []
 
-    # We build a WHERE clause like:
-    # (field1 LIKE ? OR field2 LIKE ? OR ...)  AND
-    # (field1 LIKE ? OR field2 LIKE ? OR ...)  AND ...
-    field_expr = """
-        LOWER(b.name)      LIKE ?
-     OR LOWER(l.access_type) LIKE ?
-     OR LOWER(l.country)     LIKE ?
-     OR LOWER(l.privilege)   LIKE ?
-     OR LOWER(l.price)       LIKE ?
-     OR LOWER(l.description) LIKE ?
-     OR LOWER(l.source)      LIKE ?
-     OR LOWER(l.post_date)   LIKE ?
-     OR LOWER(l.sector)      LIKE ?
-     OR LOWER(l.revenue)     LIKE ?
-    """
-
-    where_clauses = []
-    params: list[str] = []
-
-    for token in tokens:
-        pattern = f"%{token}%"
-        where_clauses.append(f"({field_expr})")
-        # 10 fields → 10 params per token
-        params.extend([pattern] * 10)
-
-    where_sql = " AND ".join(where_clauses)
-
-    sql = f"""
-        SELECT
-            l.id,
-            b.name AS broker_name,
-            l.access_type,
-            l.country,
-            l.privilege,
-            l.price,
-            l.description,
-            l.source,
-            l.post_date,
-            l.sector,
-            l.revenue,
-            l.raw_title,
-            l.raw_text,
-            l.raw_url,
-            l.created_at
-        FROM listings l
-        JOIN brokers b ON l.broker_id = b.id
-        WHERE {where_sql}
-        ORDER BY l.created_at DESC
-    """
-
-    with get_connection() as conn:
+    params = {
+        "match": match,
+        "window": SEARCH_RANK_WINDOW if limit is not None else -1,
+        "limit": limit if limit is not None else -1,
+        "offset": offset,
+    }
+    sql = _search_sql(dates=_date_window_filters(window, params))
+
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.row_factory = _LISTING_ROWS
         cursor.execute(sql, params)
-        return cursor.fetchall()
+        rows = cursor.fetchall()
+        if not snippets or not rows:
+            return rows
+
+        found = _search_snippets(conn.cursor(), match, [row.id for row in rows])
+        return [SearchHit._make(row + (found.get(row.id, ""),)) for row in rows]
+
+
+def count_search_results(
+    q: str,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    Number of listings search_query(q) matches, without ranking them (and
+    without the SEARCH_RANK_WINDOW cutoff).
+    """
+    match = build_search_match(q)
+    if not match:
+        return 0
+
+    params: Dict[str, Any] = {"match": match}
+    dates = _date_window_filters(window, params)
+    date_join = "JOIN listings l ON l.id = listings_fts.rowid" if dates else ""
+    date_filter = "".join(f" AND {condition}" for condition in dates)
+
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT COUNT(*) FROM listings_fts
+            {date_join}
+            WHERE listings_fts MATCH :match{date_filter}
+            """,
+            params,
+        )
+        return cursor.fetchone()[0]
+
+
+def _search_snippets(cursor: sqlite3.Cursor, match: str, ids: List[int]) -> Dict[int, str]:
+    """
+    Snippets for the given result ids, from a single pass over the matches
+    in their rowid range. (An IN on rowid would reopen the FTS cursor once
+    per id, which is slow for prefix queries; the unary + keeps it a filter.)
+
+    Prefers an excerpt of the raw post and falls back to whichever field
+    matched when the hit is only in a structured field.
+    """
+    raw_col = SEARCH_COLUMNS.index("raw_text")
+    raw_snippet = f"snippet(listings_fts, {raw_col}, :open, :close, '...', 16)"
+    id_list = ", ".join(str(int(i)) for i in ids)
+    cursor.execute(
+        f"""
+        SELECT
+            rowid,
+            CASE WHEN instr({raw_snippet}, :open) > 0 THEN {raw_snippet}
+                 ELSE snippet(listings_fts, -1, :open, :close, '...', 16)
+            END
+        FROM listings_fts
+        WHERE listings_fts MATCH :match
+          AND rowid >= :low AND rowid <= :high
+          AND +rowid IN ({id_list})
+        """,
+        {
+            "match": match,
+            "low": min(ids),
+            "high": max(ids),
+            "open": SNIPPET_OPEN,
+            "close": SNIPPET_CLOSE,
+        },
+    )
+    return {rowid: snippet for rowid, snippet in cursor.fetchall()}
+
+
+# --- Streaming reads (exports) ---
+
+# Appended to summary rows when a query asks for the raw fields (FullListing).
+_RAW_COLUMNS_SQL = ",\n            l.raw_title,\n            l.raw_text,\n            l.raw_url"
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _stream(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[Listing]:
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            return
+        yield from chunk
+
+
+def iter_listings(
+    broker_name: Optional[str] = None,
+    sector: Optional[str] = None,
+    include_raw: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[Listing]:
+    """
+    Stream listings newest first, optionally filtered by broker, sector or
+    DateWindow, `chunk_size` rows at a time from an open cursor, so memory does not
+    grow with the table.
+
+    Rows are Listing summaries; include_raw=True yields FullListing rows
+    with raw_title, raw_text and raw_url. Reads only: without `conn` it runs on the shared connection
+    outside any transaction.
+    """
+    conditions = []
+    params: Dict[str, Any] = {}
+    if broker_name is not None:
+        conditions.append("l.broker_id = (SELECT id FROM brokers WHERE name = :broker_name)")
+        params["broker_name"] = broker_name
+    if sector is not None:
+        conditions.append("l.sector_id = (SELECT id FROM sectors WHERE name = :sector)")
+        params["sector"] = sector
+    dates = _date_window_filters(window, params)
+    if broker_name is not None:
+        candidates = _date_window_candidates(window, dates, "idx_listings_broker_post_date", conditions)
+    else:
+        candidates = _date_window_candidates(window, dates, filters=conditions)
+
+    cursor = (conn or shared_connection()).cursor()
+    index = _narrow_range(cursor, candidates, params)
+    conditions += _date_window_filters(window, params, indexed=index is not None)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    cursor.row_factory = _FULL_LISTING_ROWS if include_raw else _LISTING_ROWS
+    cursor.execute(
+        f"""
+        SELECT
+            {_LISTING_COLUMNS_SQL}{_RAW_COLUMNS_SQL if include_raw else ""}
+        FROM listings l {f"INDEXED BY {index}" if index else ""}
+        {_LISTING_JOINS_SQL}
+        {where}
+        ORDER BY l.created_at DESC, l.id DESC
+        """,
+        params,
+    )
+    try:
+        yield from _stream(cursor, chunk_size)
+    finally:
+        cursor.close()
+
+
+def iter_search_results(
+    q: str,
+    include_raw: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    window: Optional[DateWindow] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[Listing]:
+    """Stream every search_query() match, best first, like iter_listings()."""
+    match = build_search_match(q)
+    if not match:
+        return
+
+    params = {"match": match, "window": -1, "limit": -1, "offset": 0}
+    dates = _date_window_filters(window, params)
+    cursor = (conn or shared_connection()).cursor()
+    cursor.row_factory = _FULL_LISTING_ROWS if include_raw else _LISTING_ROWS
+    cursor.execute(_search_sql(_RAW_COLUMNS_SQL if include_raw else "", dates), params)
+    try:
+        yield from _stream(cursor, chunk_size)
+    finally:
+        cursor.close()
+
 
 def find_duplicate_listings(
     broker_id: int,
@@ -411,136 +2284,355 @@ def find_duplicate_listings(
     post_date: str,
     sector: str,
     revenue: str,
-) -> List[Tuple]:
-    with get_connection() as conn:
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Listing]:
+    """
+    Existing listings with the same structured fields, compared after
+    normalization (case, whitespace, price format), as summary rows.
+    """
+    fingerprint = listing_fingerprint(
+        broker_id, access_type, country, price, description, source, post_date, sector, revenue
+    )
+    return find_listings_by_fingerprint(fingerprint, conn=conn)
+
+
+def find_listings_by_fingerprint(fingerprint: str, conn: Optional[sqlite3.Connection] = None) -> List[Listing]:
+    """Listings with this fingerprint (one index lookup), as summary rows."""
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.row_factory = _LISTING_ROWS
         cursor.execute(
-            """
+            f"""
             SELECT
-                l.id,
-                b.name AS broker_name,
-                l.access_type,
-                l.country,
-                l.privilege,
-                l.price,
-                l.description,
-                l.source,
-                l.post_date,
-                l.sector,
-                l.revenue,
-                l.raw_title,
-                l.raw_text,
-                l.raw_url,
-                l.created_at
+                {_LISTING_COLUMNS_SQL}
             FROM listings l
-            JOIN brokers b ON l.broker_id = b.id
-            WHERE
-                l.broker_id   = ?
-            AND l.access_type = ?
-            AND l.country     = ?
-            AND l.price       = ?
-            AND l.source      = ?
-            AND l.post_date   = ?
-            AND l.sector      = ?
-            AND l.revenue     = ?
-            AND l.description = ?
+            {_LISTING_JOINS_SQL}
+            WHERE l.fingerprint = ?
             ORDER BY l.created_at DESC
             """,
-            (
-                broker_id,
-                access_type,
-                country,
-                price,
-                source,
-                post_date,
-                sector,
-                revenue,
-                description,
-            ),
+            (fingerprint,),
         )
         return cursor.fetchall()
 
 
+def update_listing(listing_id: int,access_type: str,country: str,privilege: str,price: str,description: str,source: str,post_date: str,sector: str,revenue: str,conn: Optional[sqlite3.Connection] = None,) -> None:
 
-
-def update_listing(listing_id: int,access_type: str,country: str,privilege: str,price: str,description: str,source: str,post_date: str,sector: str,revenue: str,) -> None:
-
-    with get_connection() as conn:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.execute("SELECT broker_id FROM listings WHERE id = ?", (listing_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return
+        fingerprint = listing_fingerprint(
+            row[0], access_type, country, price, description, source, post_date, sector, revenue
+        )
+        names = {"access_type": access_type, "country": country, "source": source, "sector": sector}
+        access_type_id, country_id, source_id, sector_id = _dimension_ids([names], conn)[0]
         cursor.execute(
             """
             UPDATE listings
             SET
-                access_type = ?,
-                country     = ?,
-                privilege   = ?,
-                price       = ?,
-                description = ?,
-                source      = ?,
-                post_date   = ?,
-                sector      = ?,
-                revenue     = ?
+                access_type_id = ?,
+                country_id     = ?,
+                privilege      = ?,
+                price          = ?,
+                description    = ?,
+                source_id      = ?,
+                post_date      = ?,
+                sector_id      = ?,
+                revenue        = ?,
+                fingerprint    = ?,
+                price_start    = ?,
+                price_step     = ?,
+                price_blitz    = ?,
+                price_min_usd  = ?,
+                revenue_min_usd = ?,
+                revenue_max_usd = ?
             WHERE id = ?
             """,
             (
-                access_type,
-                country,
+                access_type_id,
+                country_id,
                 privilege,
                 price,
                 description,
-                source,
+                source_id,
                 post_date,
-                sector,
+                sector_id,
                 revenue,
+                fingerprint,
+                *_price_values(price),
+                *_revenue_values(revenue),
                 listing_id,
             ),
         )
-        conn.commit()
 
 
-def delete_listing(listing_id: int) -> None:
+def delete_listing(listing_id: int, conn: Optional[sqlite3.Connection] = None) -> None:
     """Delete a listing by ID."""
-    with get_connection() as conn:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
         cursor.execute(
             "DELETE FROM listings WHERE id = ?",
             (listing_id,),
         )
-        conn.commit()
 
 
-def get_summary_counts() -> Tuple[int, int]:
+# --- Reparse support ---
+
+def iter_listings_to_reparse(
+    parser_version: str,
+    batch_size: int = 500,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[Tuple]:
+    """
+    Listings with raw text that were not parsed by `parser_version`, in id
+    order, read `batch_size` rows at a time (each batch is fetched in full,
+    so the caller may write between rows). Each row:
+    (id, raw_title, raw_text, access_type, country, privilege, price,
+     description, source, post_date, sector, revenue, parsed_fields)
+    where parsed_fields is a dict, or None for listings stored without one.
+    """
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        last_id = 0
+        while True:
+            cursor.execute(
+                f"""
+                SELECT l.id, l.raw_title, l.raw_text, access_types.name, countries.name, l.privilege,
+                       l.price, l.description, sources.name, l.post_date, sectors.name, l.revenue,
+                       l.parsed_fields
+                FROM listings l
+                {_LISTING_JOINS_SQL}
+                WHERE l.id > ?
+                  AND l.raw_text <> ''
+                  AND (l.parser_version IS NULL OR l.parser_version <> ?)
+                ORDER BY l.id
+                LIMIT ?
+                """,
+                (last_id, parser_version, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield tuple(row[:-1]) + (json.loads(row[-1]) if row[-1] else None,)
+            last_id = rows[-1][0]
+
+
+def mark_listings_parsed(
+    items: Iterable[Tuple[int, str, Dict[str, str]]],
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    """Record (listing_id, parser_version, parsed_fields) after a reparse."""
+    with connection_scope(conn) as conn:
+        conn.cursor().executemany(
+            "UPDATE listings SET parser_version = ?, parsed_fields = ? WHERE id = ?",
+            [(version, _parsed_fields_json(fields), listing_id) for listing_id, version, fields in items],
+        )
+
+
+# --- Analytics summaries ---
+
+# Revenue bands for analytics: (label, lower bound in USD), ascending. A
+# listing falls in the band of its revenue_min_usd.
+REVENUE_BANDS = (
+    ("<10M", 0),
+    ("10M-100M", 10 ** 7),
+    ("100M-1B", 10 ** 8),
+    ("1B+", 10 ** 9),
+)
+
+_REVENUE_BAND_SQL = (
+    "CASE WHEN {row}.revenue_min_usd IS NULL THEN 'unknown' "
+    + " ".join(
+        f"WHEN {{row}}.revenue_min_usd < {upper} THEN '{label}'"
+        for (label, _lower), (_next, upper) in zip(REVENUE_BANDS, REVENUE_BANDS[1:])
+    )
+    + f" ELSE '{REVENUE_BANDS[-1][0]}' END"
+)
+
+# Listing counts per dimension, kept current by triggers on listings so the
+# analytics screen never scans the table:
+#   (summary table, key column, key column type, listings expression,
+#    listings column it depends on)
+# Lookup-table dimensions are keyed by id; listings without a value are
+# counted under 0 and shown as 'unknown'.
+SUMMARY_DIMENSIONS = (
+    ("stats_brokers", "broker_id", "INTEGER", "{row}.broker_id", "broker_id"),
+    ("stats_sectors", "sector_id", "INTEGER", "COALESCE({row}.sector_id, 0)", "sector_id"),
+    ("stats_countries", "country_id", "INTEGER", "COALESCE({row}.country_id, 0)", "country_id"),
+    ("stats_access_types", "access_type_id", "INTEGER", "COALESCE({row}.access_type_id, 0)", "access_type_id"),
+    ("stats_revenue_bands", "band", "TEXT", _REVENUE_BAND_SQL, "revenue_min_usd"),
+)
+
+# Row counts of whole tables, in stats_totals.
+SUMMARY_TOTALS = ("brokers", "listings")
+
+
+def _summary_adjust(row: str, delta: int) -> str:
+    """Trigger statements adding `delta` to every summary for new/old row."""
+    statements = [
+        f"UPDATE stats_totals SET row_count = row_count + ({delta}) WHERE name = 'listings';"
+    ]
+    for table, key, _decl, expr, _column in SUMMARY_DIMENSIONS:
+        statements.append(
+            f"INSERT INTO {table} ({key}, listing_count) VALUES ({expr.format(row=row)}, {delta}) "
+            f"ON CONFLICT({key}) DO UPDATE SET listing_count = listing_count + ({delta});"
+        )
+    return "\n                ".join(statements)
+
+
+def create_summary_tables(conn: Optional[sqlite3.Connection] = None) -> None:
+    """
+    Create the summary tables and the triggers that maintain them. When a
+    summary table is new, all summaries are refilled from the existing rows.
+    """
+    tables = ["stats_totals"] + [table for table, *_rest in SUMMARY_DIMENSIONS]
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+            f"AND name IN ({', '.join('?' for _ in tables)})",
+            tables,
+        )
+        complete = cursor.fetchone()[0] == len(tables)
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stats_totals (
+                name TEXT PRIMARY KEY,          -- counted table
+                row_count INTEGER NOT NULL
+            )
+            """
+        )
+        for table, key, decl, _expr, _column in SUMMARY_DIMENSIONS:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key} {decl} PRIMARY KEY,
+                    listing_count INTEGER NOT NULL
+                )
+                """
+            )
+
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS brokers_stats_ai AFTER INSERT ON brokers BEGIN
+                UPDATE stats_totals SET row_count = row_count + 1 WHERE name = 'brokers';
+            END
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS brokers_stats_ad AFTER DELETE ON brokers BEGIN
+                UPDATE stats_totals SET row_count = row_count - 1 WHERE name = 'brokers';
+            END
+            """
+        )
+        # The listings triggers are recreated so they cover every dimension.
+        for trigger in ("listings_stats_ai", "listings_stats_ad", "listings_stats_au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(
+            f"""
+            CREATE TRIGGER listings_stats_ai AFTER INSERT ON listings BEGIN
+                {_summary_adjust("new", 1)}
+            END
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER listings_stats_ad AFTER DELETE ON listings BEGIN
+                {_summary_adjust("old", -1)}
+            END
+            """
+        )
+
+        # An edit moves the listing between keys; unchanged keys net to zero.
+        columns = ", ".join(column for *_rest, column in SUMMARY_DIMENSIONS)
+        cursor.execute(
+            f"""
+            CREATE TRIGGER listings_stats_au AFTER UPDATE OF {columns} ON listings BEGIN
+                {_summary_adjust("old", -1)}
+                {_summary_adjust("new", 1)}
+            END
+            """
+        )
+
+        if not complete:
+            rebuild_summary_tables(conn)
+
+
+def _summary_queries() -> List[Tuple[str, str, str]]:
+    """(summary table, key column, GROUP BY query over the raw tables)."""
+    queries = [
+        ("stats_totals", "name", " UNION ALL ".join(
+            f"SELECT '{name}', COUNT(*) FROM {name}" for name in SUMMARY_TOTALS
+        )),
+    ]
+    for table, key, _decl, expr, _column in SUMMARY_DIMENSIONS:
+        column = expr.format(row="listings")
+        queries.append((table, key, f"SELECT {column}, COUNT(*) FROM listings GROUP BY 1"))
+    return queries
+
+
+def check_summary_tables(conn: Optional[sqlite3.Connection] = None) -> List[SummaryMismatch]:
     """
-    Return (total_brokers, total_listings).
+    Compare the summary tables with counts computed from the raw tables.
+    Returns one SummaryMismatch row per difference.
     """
-    with get_connection() as conn:
+    mismatches = []
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        for table, key, query in _summary_queries():
+            count = "row_count" if table == "stats_totals" else "listing_count"
+            cursor.execute(f"SELECT {key}, {count} FROM {table} WHERE {count} != 0")
+            stored = dict(cursor.fetchall())
+            cursor.execute(query)
+            actual = dict(cursor.fetchall())
+            for k in sorted(stored.keys() | actual.keys(), key=str):
+                if stored.get(k, 0) != actual.get(k, 0):
+                    mismatches.append(SummaryMismatch(table, k, stored.get(k, 0), actual.get(k, 0)))
+    return mismatches
+
 
-        cursor.execute("SELECT COUNT(*) FROM brokers")
-        total_brokers = cursor.fetchone()[0] or 0
+def rebuild_summary_tables(conn: Optional[sqlite3.Connection] = None) -> None:
+    """Recompute every summary table from the raw tables."""
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        for table, key, query in _summary_queries():
+            count = "row_count" if table == "stats_totals" else "listing_count"
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"INSERT INTO {table} ({key}, {count}) {query}")
 
-        cursor.execute("SELECT COUNT(*) FROM listings")
-        total_listings = cursor.fetchone()[0] or 0
 
-        return total_brokers, total_listings
+def get_summary_counts(conn: Optional[sqlite3.Connection] = None) -> SummaryCounts:
+    """
+    Return SummaryCounts(brokers, listings): the total of each.
+    """
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name, row_count FROM stats_totals")
+        totals = dict(cursor.fetchall())
+        return SummaryCounts(totals.get("brokers", 0), totals.get("listings", 0))
 
 
-def get_broker_listing_counts(limit: int = 10) -> List[Tuple]:
+def get_broker_listing_counts(limit: int = 10, conn: Optional[sqlite3.Connection] = None) -> List[NameCount]:
     """
     Return top brokers by listing count.
 
-    Each row: (broker_name, listing_count)
+    Each row: NameCount(broker name, listing_count)
     """
-    with get_connection() as conn:
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
+        cursor.row_factory = _NAME_COUNT_ROWS
         cursor.execute(
             """
             SELECT
                 b.name AS broker_name,
-                COUNT(l.id) AS listing_count
+                COALESCE(s.listing_count, 0) AS listing_count
             FROM brokers b
-            LEFT JOIN listings l ON l.broker_id = b.id
-            GROUP BY b.id
+            LEFT JOIN stats_brokers s ON s.broker_id = b.id
             ORDER BY listing_count DESC, broker_name ASC
             LIMIT ?
             """,
@@ -549,28 +2641,192 @@ def get_broker_listing_counts(limit: int = 10) -> List[Tuple]:
         return cursor.fetchall()
 
 
-def get_sector_counts(limit: int = 10) -> List[Tuple]:
+def _dimension_counts(
+    table: str,
+    key: str,
+    limit: int,
+    conn: Optional[sqlite3.Connection],
+    names: Optional[str] = None,
+) -> List[NameCount]:
+    """NameCount(key, listing_count) rows of a summary table; with `names`,
+    the key is an id into that lookup table and its name is returned instead."""
+    label = "COALESCE(d.name, 'unknown')" if names else f"s.{key}"
+    join = f"LEFT JOIN {names} d ON d.id = s.{key}" if names else ""
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = _NAME_COUNT_ROWS
+        cursor.execute(
+            f"""
+            SELECT {label} AS label, s.listing_count
+            FROM {table} s
+            {join}
+            WHERE s.listing_count > 0
+            ORDER BY s.listing_count DESC, label ASC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return cursor.fetchall()
+
+
+def get_sector_counts(limit: int = 10, conn: Optional[sqlite3.Connection] = None) -> List[NameCount]:
+    """
+    Return top sectors by listing count (empty sectors count as 'unknown').
+
+    Each row: NameCount(sector, listing_count)
+    """
+    return _dimension_counts("stats_sectors", "sector_id", limit, conn, names="sectors")
+
+
+def get_revenue_band_counts(conn: Optional[sqlite3.Connection] = None) -> List[NameCount]:
     """
-    Return top sectors by listing count (ignores empty/null sectors).
+    Listing counts per REVENUE_BANDS band, smallest band first, then
+    'unknown' (revenue not parseable).
 
-    Each row: (sector, listing_count)
+    Each row: NameCount(band, listing_count)
     """
-    with get_connection() as conn:
+    order = [label for label, _lower in REVENUE_BANDS] + ["unknown"]
+    counts = dict(_dimension_counts("stats_revenue_bands", "band", len(order), conn))
+    return [NameCount(band, counts[band]) for band in order if counts.get(band)]
+
+
+def get_country_counts(limit: int = 10, conn: Optional[sqlite3.Connection] = None) -> List[NameCount]:
+    """
+    Return top countries by listing count.
+
+    Each row: NameCount(country, listing_count)
+    """
+    return _dimension_counts("stats_countries", "country_id", limit, conn, names="countries")
+
+
+def get_access_type_counts(limit: int = 10, conn: Optional[sqlite3.Connection] = None) -> List[NameCount]:
+    """
+    Return top access types by listing count.
+
+    Each row: NameCount(access_type, listing_count)
+    """
+    return _dimension_counts("stats_access_types", "access_type_id", limit, conn, names="access_types")
+
+
+# --- Date window counts (recent activity) ---
+# Counted from the listings rather than the summary tables, through the
+# post_date / created_at indexes.
+
+def count_listings(window: Optional[DateWindow] = None, conn: Optional[sqlite3.Connection] = None) -> int:
+    """Number of listings, optionally only those within a DateWindow."""
+    params: Dict[str, Any] = {}
+    dates = _date_window_filters(window, params)
+    with connection_scope(conn) as conn:
         cursor = conn.cursor()
         cursor.execute(
-            """
-            SELECT
-                COALESCE(NULLIF(l.sector, ''), 'unknown') AS sector,
-                COUNT(*) AS listing_count
-            FROM listings l
-            GROUP BY sector
-            ORDER BY listing_count DESC, sector ASC
-            LIMIT ?
+            f"SELECT COUNT(*) FROM listings l WHERE {' AND '.join(dates) or '1'}",
+            params,
+        )
+        return cursor.fetchone()[0]
+
+
+def get_window_counts(
+    dimension: str,
+    window: DateWindow,
+    limit: int = 10,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[NameCount]:
+    """
+    Top values of a dimension ("broker" or a DIMENSIONS field) among the
+    listings within `window`.
+
+    Each row: NameCount(name, listing_count)
+    """
+    if dimension == "broker":
+        key, names = "broker_id", "brokers"
+    elif dimension in DIMENSIONS:
+        key, names = f"{dimension}_id", DIMENSIONS[dimension][0]
+    else:
+        raise ValueError(f"Unknown dimension: {dimension!r}")
+
+    params: Dict[str, Any] = {"limit": limit}
+    dates = _date_window_filters(window, params)
+    candidates = _date_window_candidates(window, dates)
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        # Sectors are counted from (post_date, sector_id) alone. Brokers
+        # too in a narrow window; a wide one is cheaper to count by walking
+        # all of (broker_id, post_date) than by reading every row in it.
+        index = None
+        if candidates and key == "sector_id":
+            index = "idx_listings_post_date_sector"
+        elif candidates:
+            index = _narrow_range(cursor, candidates, params)
+            if index is None and key == "broker_id":
+                index = "idx_listings_broker_post_date"
+        cursor.row_factory = _NAME_COUNT_ROWS
+        cursor.execute(
+            f"""
+            SELECT COALESCE(d.name, 'unknown') AS label, c.listing_count
+            FROM (
+                SELECT l.{key} AS key, COUNT(*) AS listing_count
+                FROM listings l {f"INDEXED BY {index}" if index else ""}
+                WHERE {" AND ".join(dates) or "1"}
+                GROUP BY l.{key}
+            ) c
+            LEFT JOIN {names} d ON d.id = c.key
+            ORDER BY c.listing_count DESC, label ASC
+            LIMIT :limit
             """,
-            (limit,),
+            params,
         )
         return cursor.fetchall()
 
 
+def get_parse_cache_entry(key: str, conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+    """
+    Return the cached parser output (JSON) for a post key, or None.
+    """
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT fields FROM parse_cache WHERE key = ?",
+            (key,),
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+
+def insert_parse_cache_entry(
+    key: str,
+    parser_version: str,
+    fields: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO parse_cache (key, parser_version, fields)
+            VALUES (?, ?, ?)
+            """,
+            (key, parser_version, fields),
+        )
+
+
+def prune_parse_cache(parser_version: str, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Delete cached results stored by any other parser version; their keys
+    can never be looked up again. Returns the number of rows deleted.
+    """
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        # Two ranges instead of `!=`, so the parser_version index answers a
+        # cache with nothing stale without scanning it.
+        cursor.execute(
+            "DELETE FROM parse_cache WHERE parser_version < ? OR parser_version > ?",
+            (parser_version, parser_version),
+        )
+        return cursor.rowcount
 
 
+def get_parse_cache_count(conn: Optional[sqlite3.Connection] = None) -> int:
+    with connection_scope(conn) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM parse_cache")
+        return cursor.fetchone()[0] or 0
@@ -0,0 +1,387 @@
+"""
+Non-interactive bulk ingestion of raw posts.
+
+Reads a JSONL file (one post per line) or a directory of post files and
+streams every record through:
+
+    read -> parse -> normalize -> resolve broker -> duplicate check -> insert
+
+Inserts are committed in batches. Records that fail any stage are written
+to a rejects file (JSONL) with the reason, and the run ends with a
+rows/sec summary. Records are never collected in memory, so input size
+does not matter.
+
+Record fields (JSONL lines and *.json files):
+    broker      broker name (falls back to --broker)
+    title       raw title
+    text        raw post text (required)
+    url         source URL (optional)
+    source, post_date, access_type, country, privilege, price,
+    description, sector, revenue
+                optional overrides for the parser suggestions
+
+*.txt files in a directory are read as: first line = title, rest = text.
+
+Usage:
+    python ingest.py posts.jsonl --source exploit
+    python ingest.py dumps/ --broker hydra --rejects rejected.jsonl
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from itertools import tee
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from db.database import (
+    BROKER_RESOLVER,
+    PRAGMA_PROFILES,
+    configure,
+    create_tables,
+    find_listings_by_fingerprint,
+    get_connection,
+    insert_listings,
+)
+from utils.config import load_config
+from utils.normalize import listing_fingerprint, normalize_broker_name, normalize_listing_fields
+from utils.parse import PARSER_VERSION, SUGGESTED_FIELDS, suggest_listing_fields_many
+from utils.parse_cache import PARSE_CACHE
+
+STRUCTURED_FIELDS = (
+    "access_type",
+    "country",
+    "privilege",
+    "price",
+    "description",
+    "source",
+    "post_date",
+    "sector",
+    "revenue",
+)
+
+Record = Dict[str, Any]
+
+
+class Rejected(Exception):
+    """A record that cannot be ingested; the message is the reason."""
+
+
+def validate_date(date_str: str) -> bool:
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+# --- Stage 1: read ---
+
+def read_jsonl(path: Path) -> Iterator[Tuple[str, Any]]:
+    """Yield (ref, record-or-error) for each non-empty line of a JSONL file."""
+    with path.open("r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            ref = f"{path}:{lineno}"
+            try:
+                yield ref, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ref, Rejected(f"invalid JSON: {e}")
+
+
+def read_directory(path: Path) -> Iterator[Tuple[str, Any]]:
+    """Yield (ref, record-or-error) for each *.json / *.txt file in a directory."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            file_path = Path(entry.path)
+            ref = str(file_path)
+            try:
+                content = file_path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                yield ref, Rejected(f"unreadable file: {e}")
+                continue
+
+            if file_path.suffix == ".json":
+                try:
+                    yield ref, json.loads(content)
+                except json.JSONDecodeError as e:
+                    yield ref, Rejected(f"invalid JSON: {e}")
+            elif file_path.suffix == ".txt":
+                title, _, text = content.partition("\n")
+                yield ref, {"title": title, "text": text}
+
+
+def read_records(path: Path) -> Iterator[Tuple[str, Any]]:
+    if path.is_dir():
+        return read_directory(path)
+    return read_jsonl(path)
+
+
+# --- Stage 2: parse ---
+
+def parse_records(
+    records: Iterable[Tuple[str, Any]],
+    workers: int = 1,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[Tuple[str, Any, Dict[str, Any]]]:
+    """
+    Attach parser suggestions to each record.
+
+    Serial runs go through the parse cache (on `conn`, so cache writes join
+    the ingest transaction instead of waiting on its lock) and reposts skip
+    parsing. With workers > 1 the batch parser fans out to a process pool;
+    tee() only buffers the records that are in flight.
+    """
+    for_parser, for_output = tee(records)
+
+    def _posts() -> Iterator[Tuple[str, str]]:
+        for _ref, record in for_parser:
+            if isinstance(record, dict):
+                yield str(record.get("title") or ""), str(record.get("text") or "")
+
+    if workers > 1:
+        suggestions = suggest_listing_fields_many(_posts(), workers=workers)
+    else:
+        suggestions = (PARSE_CACHE.get_or_parse(t, x, conn=conn) for t, x in _posts())
+
+    for ref, record in for_output:
+        if isinstance(record, dict):
+            yield ref, record, next(suggestions)
+        else:
+            yield ref, record, {}
+
+
+# --- Stage 3: normalize ---
+
+def build_listing(record: Record, suggested: Dict[str, Any], default_source: str) -> Record:
+    """
+    Merge record overrides over parser suggestions and apply the same
+    normalization and required-field rules as the interactive flows.
+    """
+    if not str(record.get("text") or "").strip():
+        raise Rejected("raw text is empty")
+
+    values = {}
+    for field in STRUCTURED_FIELDS:
+        value = record.get(field)
+        if value is None or value == "":
+            value = suggested.get(field, "")
+        values[field] = value
+    values["source"] = str(values["source"] or "").strip() or default_source
+
+    listing = {
+        **normalize_listing_fields(values),
+        "raw_title": str(record.get("title") or ""),
+        "raw_text": str(record.get("text") or ""),
+        "raw_url": str(record.get("url") or ""),
+        # What the parser suggested, so reparse.py can tell record overrides
+        # from parser output.
+        "parser_version": PARSER_VERSION,
+        "parsed_fields": normalize_listing_fields(
+            {field: suggested.get(field, "") for field in SUGGESTED_FIELDS}
+        ),
+    }
+
+    for field in ("access_type", "country", "price", "description"):
+        if not listing[field]:
+            raise Rejected(f"{field} is required")
+
+    if not listing["post_date"]:
+        raise Rejected("post_date is required")
+    if not validate_date(listing["post_date"]):
+        raise Rejected(f"invalid post_date {listing['post_date']!r}")
+
+    return listing
+
+
+# --- Stages 4-6: resolve broker, duplicate check, batched insert ---
+
+class Ingestor:
+    """
+    Holds the per-run state: counters, the listings waiting for the next
+    batched insert, the connection whose transaction is committed after
+    every batch, and the rejects file. Brokers are resolved through
+    BROKER_RESOLVER.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        rejects: IO[str],
+        default_broker: str = "",
+        default_source: str = "",
+        create_brokers: bool = False,
+        batch_size: int = 500,
+        progress_every: int = 5000,
+    ) -> None:
+        self.conn = conn
+        self.rejects = rejects
+        self.default_broker = default_broker
+        self.default_source = default_source
+        self.create_brokers = create_brokers
+        self.batch_size = batch_size
+        self.progress_every = progress_every
+
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+        self._pending: List[Record] = []
+        self._pending_keys: set = set()
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def reject(self, ref: str, reason: str, record: Any = None) -> None:
+        self.rejected += 1
+        entry = {"ref": ref, "reason": reason}
+        if isinstance(record, dict):
+            entry["record"] = record
+        self.rejects.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def resolve_broker(self, record: Record, conn: sqlite3.Connection) -> int:
+        raw_name = str(record.get("broker") or self.default_broker)
+        name = normalize_broker_name(raw_name)
+        if not name:
+            raise Rejected("broker name is empty")
+
+        broker_id = BROKER_RESOLVER.resolve(name, conn=conn)
+        if broker_id is None:
+            if not self.create_brokers:
+                raise Rejected(f"broker {name!r} not found")
+            broker_id = BROKER_RESOLVER.resolve_or_create_many([raw_name], conn=conn)[name]
+        return broker_id
+
+    def commit(self) -> None:
+        """Insert the pending listings with one executemany() and commit."""
+        ids = []
+        if self._pending:
+            ids = insert_listings(self._pending, batch_size=self.batch_size, conn=self.conn)
+        self.conn.commit()
+        self.inserted += len(ids)
+        self._pending = []
+        self._pending_keys.clear()
+
+    def ingest_one(self, ref: str, record: Any, suggested: Dict[str, Any]) -> None:
+        self.read += 1
+        if isinstance(record, Rejected):
+            self.reject(ref, str(record))
+            return
+        if not isinstance(record, dict):
+            self.reject(ref, "record is not a JSON object")
+            return
+
+        conn = self.conn
+        try:
+            listing = build_listing(record, suggested, self.default_source)
+            broker_id = self.resolve_broker(record, conn)
+
+            fingerprint = listing_fingerprint(
+                broker_id,
+                listing["access_type"],
+                listing["country"],
+                listing["price"],
+                listing["description"],
+                listing["source"],
+                listing["post_date"],
+                listing["sector"],
+                listing["revenue"],
+            )
+            # Listings waiting in the current batch are not in the table yet,
+            # so they are checked against the fingerprints collected below.
+            if fingerprint in self._pending_keys:
+                raise Rejected("duplicate of an earlier record in this batch")
+
+            duplicates = find_listings_by_fingerprint(fingerprint, conn=conn)
+            if duplicates:
+                raise Rejected(f"duplicate of listing {duplicates[0][0]}")
+        except Rejected as e:
+            self.reject(ref, str(e), record)
+            return
+
+        self._pending.append({"broker_id": broker_id, **listing, "fingerprint": fingerprint})
+        self._pending_keys.add(fingerprint)
+        if len(self._pending) >= self.batch_size:
+            self.commit()
+
+        if self.progress_every and self.read % self.progress_every == 0:
+            print(f"[INFO] {self.read} read, {self.inserted} inserted, "
+                  f"{self.rejected} rejected ({self.rate():.0f} rows/sec)")
+
+    def run(self, parsed: Iterable[Tuple[str, Any, Dict[str, Any]]]) -> None:
+        # No commit on the way out of an exception: the pending batch is
+        # dropped with the connection, and the original error surfaces.
+        for ref, record, suggested in parsed:
+            self.ingest_one(ref, record, suggested)
+        self.commit()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        config = load_config()
+        configure(config.db_path, config.pragma_profile, config.db_cache_mb)
+    except ValueError as e:
+        print(f"\n[ERROR] Configuration: {e}\n")
+        return 1
+    PARSE_CACHE.resize(config.parse_cache_size)
+
+    parser = argparse.ArgumentParser(description="Bulk-ingest raw posts into AXIS.")
+    parser.add_argument("input", type=Path, help="JSONL file or directory of post files")
+    parser.add_argument("--broker", default="", help="broker for records that do not name one")
+    parser.add_argument("--source", default="", help="source forum for records that do not name one")
+    parser.add_argument("--create-brokers", action="store_true", help="create unknown brokers instead of rejecting")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per committed transaction")
+    parser.add_argument("--workers", type=int, default=config.workers,
+                        help=f"parser processes (default: {config.workers}, from AXIS_WORKERS)")
+    parser.add_argument("--rejects", type=Path, default=None, help="rejects file (default: <input>.rejects.jsonl)")
+    parser.add_argument("--profile", default="bulk-load", choices=sorted(PRAGMA_PROFILES),
+                        help="connection pragma profile (default: bulk-load; bulk-load-unsafe skips "
+                             "fsync and can corrupt the database on an OS crash or power loss)")
+    args = parser.parse_args(argv)
+
+    if not args.input.exists():
+        print(f"\n[ERROR] {args.input} does not exist.\n")
+        return 1
+
+    rejects_path = args.rejects or args.input.with_name(args.input.name + ".rejects.jsonl")
+
+    create_tables()
+    PARSE_CACHE.prune()
+
+    if PRAGMA_PROFILES[args.profile].get("synchronous") == "OFF":
+        print(f"\n[WARN] Profile {args.profile} does not fsync: an OS crash or power loss "
+              "during the import can corrupt the database. Keep a backup.")
+
+    conn = get_connection(args.profile)
+    with rejects_path.open("w", encoding="utf-8") as rejects:
+        ingestor = Ingestor(
+            conn,
+            rejects,
+            default_broker=args.broker,
+            default_source=args.source,
+            create_brokers=args.create_brokers,
+            batch_size=args.batch_size,
+        )
+        try:
+            ingestor.run(parse_records(read_records(args.input), workers=args.workers, conn=conn))
+        finally:
+            conn.close()
+
+    elapsed = time.perf_counter() - ingestor.started
+    print(f"\n[OK] {ingestor.read} read, {ingestor.inserted} inserted, {ingestor.rejected} rejected "
+          f"in {elapsed:.1f}s ({ingestor.rate():.0f} rows/sec)")
+    if ingestor.rejected:
+        print(f"[INFO] Rejected records written to {rejects_path}")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
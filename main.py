@@ -1,17 +1,26 @@
+import gzip
 import sys
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from utils.normalize import normalize_broker_name, normalize_sector, normalize_revenue
+from typing import Callable, Iterable
+from utils.normalize import normalize_broker_name, normalize_sector, normalize_revenue, parse_price_amounts, parse_revenue_bounds, normalize_listing_fields
+from utils.parse import PARSER_VERSION, SUGGESTED_FIELDS
 from utils.scoring import calculate_tier
-from utils.parse import suggest_listing_fields
-from db.database import create_tables,insert_broker,get_all_brokers,find_broker_by_name,insert_listing,get_all_listings,find_listings_by_broker_name,find_listings_by_sector,search_query,find_duplicate_listings, update_listing,get_broker_by_id,delete_listing,get_summary_counts,get_broker_listing_counts,get_sector_counts,get_listing_by_id
+from utils.config import Config, load_config
+from utils.parse_cache import PARSE_CACHE, cached_suggest_listing_fields
+from db.database import BROKER_RESOLVER,Broker,FullListing,Listing,configure,create_tables,insert_broker,get_all_brokers,insert_listing,get_all_listings,find_listings_by_broker_name,find_listings_by_sector,search_query,count_search_results,SEARCH_RANK_WINDOW,find_duplicate_listings, update_listing,delete_listing,get_summary_counts,get_broker_listing_counts,get_sector_counts,get_listing_by_id,get_parse_cache_count,iter_listings,iter_search_results,find_near_duplicates,get_country_counts,get_access_type_counts,find_listings_by_price,find_listings_by_revenue,get_revenue_band_counts,count_listings,get_window_counts,last_days
 from datetime import datetime
 import csv
 
-EXPORTS_DIR = Path("exports")
+EXPORTS_DIR = Path("exports")  # replaced by the configured export_dir in main()
+SEARCH_RESULT_LIMIT = 50
+PAGE_SIZE = 20
+RECENT_DAYS = 7
 
 
 def ensure_exports_dir() -> None:
-    EXPORTS_DIR.mkdir(exist_ok=True)
+    EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def validate_date(date_str: str) -> bool:
@@ -32,27 +41,29 @@ def wait_for_enter() -> None:
     input("Press ENTER to return to the menu...")
 
 
-def print_brokers(rows):
+def print_brokers(rows: list[Broker]) -> None:
     if not rows:
         print("\n[No brokers found]\n")
         return
 
     print()
-    for broker_id, name, raw_name, notes, created_at in rows:
-        display_name = raw_name or name
-        print(f"[{broker_id}] {display_name} (normalized: {name})")
-        if notes:
-            preview = notes if len(notes) <= 80 else notes[:77] + "..."
+    for broker in rows:
+        display_name = broker.raw_name or broker.name
+        print(f"[{broker.id}] {display_name} (normalized: {broker.name})")
+        if broker.notes:
+            preview = broker.notes if len(broker.notes) <= 80 else broker.notes[:77] + "..."
             print(f"    Notes: {preview}")
-        print(f"    Created: {created_at}")
+        print(f"    Created: {broker.created_at}")
         print()
     print()
 
 
-def print_listings(rows: list[tuple]) -> None:
+def print_listings(rows: list[Listing]) -> None:
     """
     Compact table-style output for multiple listings (not full detail view).
     Used by: view_listings, find_by_broker, search, exports preview, etc.
+    Takes summary rows (no raw_* fields); search results may carry a match
+    snippet.
     """
 
     if not rows:
@@ -62,86 +73,54 @@ def print_listings(rows: list[tuple]) -> None:
     print()
 
     for row in rows:
-        (
-            listing_id,
-            broker_name,
-            access_type,
-            country,
-            privilege,
-            price,
-            description,
-            source,
-            post_date,
-            sector,
-            revenue,
-            raw_title,
-            raw_text,
-            raw_url,
-            created_at,
-        ) = row
-
+        description = row.description
         short_desc = description[:60] + "..." if description and len(description) > 60 else description
+        snippet = getattr(row, "snippet", None)
 
-        print(f"[{listing_id}] {broker_name} | {access_type or '-'} | {country or '-'} | {price or '-'}")
-        print(f"    Sector: {sector or '-'} | Revenue: {revenue or '-'} | Date: {post_date or '-'}")
+        print(f"[{row.id}] {row.broker_name} | {row.access_type or '-'} | {row.country or '-'} | {row.price or '-'}")
+        print(f"    Sector: {row.sector or '-'} | Revenue: {row.revenue or '-'} | Date: {row.post_date or '-'}")
         print(f"    Desc: {short_desc or '-'}")
-        print(f"    Created: {created_at}")
+        if snippet:
+            print(f"    Match: {' '.join(snippet.split())}")
+        print(f"    Created: {row.created_at}")
         print()
 
     print()
 
 
-def print_listing_detail(row: tuple) -> None:
-    (
-        listing_id,
-        broker_name,
-        access_type,
-        country,
-        privilege,
-        price,
-        description,
-        source,
-        post_date,
-        sector,
-        revenue,
-        raw_title,
-        raw_text,
-        raw_url,
-        created_at,
-    ) = row
-
+def print_listing_detail(row: FullListing) -> None:
     print("\n==================== LISTING DETAIL ====================\n")
-    print(f"ID:        {listing_id}")
-    print(f"Broker:    {broker_name}")
-    print(f"Created:   {created_at}")
+    print(f"ID:        {row.id}")
+    print(f"Broker:    {row.broker_name}")
+    print(f"Created:   {row.created_at}")
     print()
 
     print("[STRUCTURED]")
-    print(f"  Access:    {access_type or '-'}")
-    print(f"  Country:   {country or '-'}")
-    print(f"  Privilege: {privilege or '-'}")
-    print(f"  Price:     {price or '-'}")
-    print(f"  Sector:    {sector or '-'}")
-    print(f"  Revenue:   {revenue or '-'}")
-    print(f"  Source:    {source or '-'}")
-    print(f"  Post date: {post_date or '-'}")
-    print(f"  Desc:      {description or '-'}")
+    print(f"  Access:    {row.access_type or '-'}")
+    print(f"  Country:   {row.country or '-'}")
+    print(f"  Privilege: {row.privilege or '-'}")
+    print(f"  Price:     {row.price or '-'}")
+    print(f"  Sector:    {row.sector or '-'}")
+    print(f"  Revenue:   {row.revenue or '-'}")
+    print(f"  Source:    {row.source or '-'}")
+    print(f"  Post date: {row.post_date or '-'}")
+    print(f"  Desc:      {row.description or '-'}")
     print()
 
     print("[RAW TITLE]")
-    print(raw_title or "-")
+    print(row.raw_title or "-")
     print()
 
     print("[RAW TEXT]")
-    if raw_text:
-        print(raw_text)
+    if row.raw_text:
+        print(row.raw_text)
     else:
         print("-")
     print()
 
-    if raw_url:
+    if row.raw_url:
         print("[SOURCE URL]")
-        print(raw_url)
+        print(row.raw_url)
         print()
 
     print("========================================================\n")
@@ -161,14 +140,11 @@ def add_broker_flow() -> None:
         wait_for_enter()
         return
 
-    existing = find_broker_by_name(normalized_name)
-    if existing:
-        broker_id = existing[0]
-        print(f"\n[WARN] Broker already exists with ID {broker_id}.")
-        choice = prompt("Add duplicate broker anyway? (y/N): ").lower()
-        if choice != "y":
-            wait_for_enter()
-            return
+    existing_id = BROKER_RESOLVER.resolve(normalized_name)
+    if existing_id is not None:
+        print(f"\n[WARN] Broker already exists with ID {existing_id}.\n")
+        wait_for_enter()
+        return
 
     created_id = insert_broker(normalized_name, raw_name, notes)
     print(f"\n[OK] Broker added with ID {created_id}\n")
@@ -193,14 +169,12 @@ def add_listing_flow() -> None:
         wait_for_enter()
         return
 
-    broker_row = find_broker_by_name(broker_name)
-    if not broker_row:
+    broker_id = BROKER_RESOLVER.resolve(broker_name)
+    if broker_id is None:
         print(f"\n[ERROR] Broker '{broker_name}' not found. Add it first using option [1].\n")
         wait_for_enter()
         return
 
-    broker_id = broker_row[0]
-
     access_type = prompt("Access type (rdp/vpn/etc): ").lower()
     country = prompt("Country (US/UK/RU/etc): ").upper()
     privilege = prompt("Privilege (admin/user, optional): ").lower()
@@ -240,7 +214,7 @@ def add_listing_flow() -> None:
         print("\n[ERROR] Description is required\n")
         wait_for_enter()
         return
-    
+
     duplicates = find_duplicate_listings(
         broker_id=broker_id,
         access_type=access_type,
@@ -295,7 +269,7 @@ def view_listing_detail_flow() -> None:
         wait_for_enter()
         return
 
-    row = get_listing_by_id(listing_id)
+    row = get_listing_by_id(listing_id, include_raw=True)
     if not row:
         print(f"\n[INFO] No listing found with ID {listing_id}.\n")
         wait_for_enter()
@@ -306,11 +280,56 @@ def view_listing_detail_flow() -> None:
 
 
 
+def page_cursor(row: Listing) -> tuple:
+    """(created_at, id) of a listing row, for keyset paging."""
+    return row.created_at, row.id
+
+
+def paged_listings_view(fetch_page: Callable[..., list]) -> None:
+    """
+    Show listings PAGE_SIZE at a time with next/prev navigation.
+
+    fetch_page(page_size=..., after=..., before=...) returns one page; only
+    the page being shown is ever loaded.
+    """
+    rows = fetch_page(page_size=PAGE_SIZE)
+    if not rows:
+        print_listings(rows)
+        wait_for_enter()
+        return
+
+    page = 1
+    while True:
+        print_listings(rows)
+        has_next = len(rows) == PAGE_SIZE
+        nav = []
+        if has_next:
+            nav.append("[n] Next")
+        if page > 1:
+            nav.append("[p] Prev")
+        nav.append("[ENTER] Back to menu")
+        print(f"Page {page} | " + "  ".join(nav))
+        choice = prompt("> ").lower()
+
+        if choice == "n" and has_next:
+            next_rows = fetch_page(page_size=PAGE_SIZE, after=page_cursor(rows[-1]))
+            if not next_rows:
+                print("\n[INFO] No more listings.\n")
+                continue
+            rows = next_rows
+            page += 1
+        elif choice == "p" and page > 1:
+            rows = fetch_page(page_size=PAGE_SIZE, before=page_cursor(rows[0]))
+            page -= 1
+        elif choice == "":
+            return
+        else:
+            print("\n[ERROR] Invalid choice\n")
+
+
 def view_listings_flow() -> None:
     print("\n[All listings]\n")
-    rows = get_all_listings()
-    print_listings(rows)
-    wait_for_enter()
+    paged_listings_view(get_all_listings)
 
 
 def find_listings_by_broker_flow() -> None:
@@ -323,9 +342,7 @@ def find_listings_by_broker_flow() -> None:
         wait_for_enter()
         return
 
-    rows = find_listings_by_broker_name(broker_name)
-    print_listings(rows)
-    wait_for_enter()
+    paged_listings_view(partial(find_listings_by_broker_name, broker_name))
 
 
 def find_listings_by_sector_flow() -> None:
@@ -338,26 +355,112 @@ def find_listings_by_sector_flow() -> None:
         wait_for_enter()
         return
 
-    rows = find_listings_by_sector(sector)
-    print_listings(rows)
-    wait_for_enter()
+    paged_listings_view(partial(find_listings_by_sector, sector))
+
+
+def parse_usd_amount(text: str) -> int:
+    """'2000', '$2,000' or '2k' as an integer USD amount (ValueError if not)."""
+    amounts = parse_price_amounts(text)
+    if amounts["price_min_usd"] is None:
+        raise ValueError(text)
+    return amounts["price_min_usd"]
 
 
+def find_listings_by_revenue_flow() -> None:
+    print("\n[Find listings by revenue]\n")
+    print("Victim revenue, e.g. 100M or 1.5B. Leave a bound empty to skip it.")
+
+    # A range typed as a bound counts from its low end for the minimum and
+    # up to its high end for the maximum ("10-25M" as max is 25M). An
+    # open-ended maximum ("100M+") is no maximum.
+    bounds = []
+    for label, side in (("Min revenue: ", 0), ("Max revenue: ", 1)):
+        raw = prompt(label)
+        if not raw:
+            bounds.append(None)
+            continue
+        parsed = parse_revenue_bounds(raw)
+        if parsed[0] is None:
+            print(f"\n[ERROR] Invalid revenue: {raw}\n")
+            wait_for_enter()
+            return
+        bounds.append(parsed[side])
+
+    paged_listings_view(partial(find_listings_by_revenue, bounds[0], bounds[1]))
+
+
+def find_listings_by_price_flow() -> None:
+    print("\n[Find listings by price]\n")
+    print("Matches the lowest asking price (START, or the only price). Leave a bound empty to skip it.")
+
+    bounds = []
+    for label in ("Min price (USD): ", "Max price (USD): "):
+        raw = prompt(label)
+        if not raw:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(parse_usd_amount(raw))
+        except ValueError:
+            print(f"\n[ERROR] Invalid amount: {raw}\n")
+            wait_for_enter()
+            return
+
+    sector = normalize_sector(prompt("Sector (optional): "))
+    privilege = prompt("Privilege (optional, e.g. da): ").lower()
 
+    paged_listings_view(
+        partial(find_listings_by_price, bounds[0], bounds[1], sector or None, privilege or None)
+    )
 
 
 def search_query_flow() -> None:
     print("\n[Search]\n")
+    print("Words must all match. Use \"exact phrase\", prefix*, OR / NOT, field:term (e.g. country:us).")
     q = prompt("Query: ").strip()
 
     if not q:
         print("\n[ERROR] Query cannot be empty\n")
         wait_for_enter()
         return
-    
-    rows = search_query(q)
-    print_listings(rows)
-    wait_for_enter()
+
+    total = count_search_results(q)
+    if not total:
+        print_listings([])
+        wait_for_enter()
+        return
+
+    # Ranked results stop at SEARCH_RANK_WINDOW (the most recent matches).
+    ranked = min(total, SEARCH_RANK_WINDOW)
+    offset = 0
+    while True:
+        rows = search_query(q, limit=SEARCH_RESULT_LIMIT, snippets=True, offset=offset)
+        print_listings(rows)
+        print(f"[INFO] Showing {offset + 1}-{offset + len(rows)} of {total} matches.")
+        if total > SEARCH_RANK_WINDOW:
+            print(
+                f"[WARN] Only the {SEARCH_RANK_WINDOW} most recent matches are ranked; older ones are not shown. "
+                "Add words or a field:term filter, or export the search ([10]) to get every match."
+            )
+
+        has_next = offset + len(rows) < ranked
+        nav = []
+        if has_next:
+            nav.append("[n] Next")
+        if offset > 0:
+            nav.append("[p] Prev")
+        nav.append("[ENTER] Back to menu")
+        print("  ".join(nav))
+        choice = prompt("> ").lower()
+
+        if choice == "n" and has_next:
+            offset += SEARCH_RESULT_LIMIT
+        elif choice == "p" and offset > 0:
+            offset -= SEARCH_RESULT_LIMIT
+        elif choice == "":
+            return
+        else:
+            print("\n[ERROR] Invalid choice\n")
 
 
 def edit_listing_flow() -> None:
@@ -377,26 +480,18 @@ def edit_listing_flow() -> None:
         wait_for_enter()
         return
 
-    (
-        _id,
-        broker_name,
-        current_access_type,
-        current_country,
-        current_privilege,
-        current_price,
-        current_description,
-        current_source,
-        current_post_date,
-        current_sector,
-        current_revenue,
-        current_raw_title,
-        current_raw_text,
-        current_raw_url,
-        created_at,
-    ) = row
-
-    print(f"\nEditing listing [{listing_id}] for broker: {broker_name}")
-    print(f"Created at: {created_at}\n")
+    current_access_type = row.access_type
+    current_country = row.country
+    current_privilege = row.privilege
+    current_price = row.price
+    current_description = row.description
+    current_source = row.source
+    current_post_date = row.post_date
+    current_sector = row.sector
+    current_revenue = row.revenue
+
+    print(f"\nEditing listing [{listing_id}] for broker: {row.broker_name}")
+    print(f"Created at: {row.created_at}\n")
 
     print("Press ENTER to keep existing value.\n")
 
@@ -504,36 +599,19 @@ def delete_listing_flow() -> None:
         wait_for_enter()
         return
 
-    (
-        _id,
-        broker_name,
-        access_type,
-        country,
-        privilege,
-        price,
-        description,
-        source,
-        post_date,
-        sector,
-        revenue,
-        raw_title,
-        raw_text,
-        raw_url,
-        created_at,
-    ) = row
-
     print("\nYou are about to delete this listing:\n")
-    print(f"[{listing_id}] Broker: {broker_name}")
+    print(f"[{listing_id}] Broker: {row.broker_name}")
     print(
-        f"    Access: {access_type or '-'} | Country: {country or '-'} | "
-        f"Privilege: {privilege or '-'}"
+        f"    Access: {row.access_type or '-'} | Country: {row.country or '-'} | "
+        f"Privilege: {row.privilege or '-'}"
     )
-    print(f"    Price: {price or '-'} | Sector: {sector or '-'} | Revenue: {revenue or '-'}")
-    print(f"    Source: {source or '-'} | Post date: {post_date or '-'}")
+    print(f"    Price: {row.price or '-'} | Sector: {row.sector or '-'} | Revenue: {row.revenue or '-'}")
+    print(f"    Source: {row.source or '-'} | Post date: {row.post_date or '-'}")
+    description = row.description
     if description:
         short_desc = description if len(description) <= 100 else description[:97] + "..."
         print(f"    Desc: {short_desc}")
-    print(f"    Created: {created_at}\n")
+    print(f"    Created: {row.created_at}\n")
 
     choice = prompt("Type 'delete' to confirm, or press ENTER to cancel: ").strip().lower()
     if choice != "delete":
@@ -546,71 +624,73 @@ def delete_listing_flow() -> None:
     wait_for_enter()
 
 
-def export_listings_to_csv(rows: list[tuple], filename: str | None = None) -> Path:
+EXPORT_FIELDNAMES = [
+    "id",
+    "broker",
+    "access_type",
+    "country",
+    "privilege",
+    "price",
+    "description",
+    "source",
+    "post_date",
+    "sector",
+    "revenue",
+    "created_at",
+]
+
+EXPORT_RAW_FIELDNAMES = ["raw_title", "raw_text", "raw_url"]
+
+EXPORT_PROGRESS_EVERY = 10000
+
+
+def export_listings_to_csv(
+    rows: Iterable[tuple],
+    filename: str | None = None,
+    compress: bool = False,
+    include_raw: bool = False,
+    progress: Callable[[int], None] | None = None,
+) -> tuple[Path, int]:
+    """
+    Write rows to a CSV file under EXPORTS_DIR as they arrive, so memory
+    stays flat however many rows the iterator yields.
+
+    Rows are summary rows, plus raw_title/raw_text/raw_url when include_raw
+    is set. compress=True writes gzip (.csv.gz). progress(count) is called
+    every EXPORT_PROGRESS_EVERY rows. Returns (path, rows written).
+    """
     ensure_exports_dir()
 
     if not filename:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"axis_listings_{timestamp}.csv"
+    if compress and not filename.endswith(".gz"):
+        filename += ".gz"
 
     export_path = EXPORTS_DIR / filename
 
-    fieldnames = [
-        "id",
-        "broker",
-        "access_type",
-        "country",
-        "privilege",
-        "price",
-        "description",
-        "source",
-        "post_date",
-        "sector",
-        "revenue",
-        "created_at",
-    ]
-
-    with export_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for (
-            listing_id,
-            broker_name,
-            access_type,
-            country,
-            privilege,
-            price,
-            description,
-            source,
-            post_date,
-            sector,
-            revenue,
-            raw_title,
-            raw_text,
-            raw_url,
-            created_at,
-        ) in rows:
-            writer.writerow(
-                {
-                    "id": listing_id,
-                    "broker": broker_name,
-                    "access_type": access_type,
-                    "country": country,
-                    "privilege": privilege,
-                    "price": price,
-                    "description": description,
-                    "source": source,
-                    "post_date": post_date,
-                    "sector": sector,
-                    "revenue": revenue,
-                    "created_at": created_at,
-                }
-            )
+    fieldnames = EXPORT_FIELDNAMES + (EXPORT_RAW_FIELDNAMES if include_raw else [])
+
+    if compress:
+        f = gzip.open(export_path, "wt", newline="", encoding="utf-8")
+    else:
+        f = export_path.open("w", newline="", encoding="utf-8")
+
+    count = 0
+    with f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if progress and count % EXPORT_PROGRESS_EVERY == 0:
+                progress(count)
 
+    return export_path, count
 
-    return export_path
 
+def print_export_progress(count: int) -> None:
+    print(f"\r[INFO] {count} rows written...", end="", flush=True)
 
 
 def export_listings_flow() -> None:
@@ -624,47 +704,61 @@ def export_listings_flow() -> None:
 
     choice = prompt("> ").strip()
 
+    include_raw = False
+    if choice in ("1", "2", "3", "4"):
+        include_raw = prompt("Include raw title/text/URL? (y/N): ").lower() == "y"
+
     if choice == "1":
-        rows = get_all_listings()
+        rows = iter_listings(include_raw=include_raw)
     elif choice == "2":
         broker_raw = prompt("Broker name: ")
         broker_name = normalize_broker_name(broker_raw)
-        rows = find_listings_by_broker_name(broker_name)
+        rows = iter_listings(broker_name=broker_name, include_raw=include_raw)
     elif choice == "3":
         sector_raw = prompt("Sector: ")
         sector = normalize_sector(sector_raw)
-        rows = find_listings_by_sector(sector)
+        rows = iter_listings(sector=sector, include_raw=include_raw)
     elif choice == "4":
         q = prompt("Query: ").strip()
         if not q:
             print("\n[ERROR] Query cannot be empty.\n")
             wait_for_enter()
             return
-        rows = search_query(q)
+        rows = iter_search_results(q, include_raw=include_raw)
     else:
         print("\n[ERROR] Invalid choice.\n")
         wait_for_enter()
         return
 
-    if not rows:
+    first = next(rows, None)
+    if first is None:
         print("\n[INFO] No rows to export for this filter.\n")
         wait_for_enter()
         return
 
     filename_input = prompt("Filename (leave empty for auto): ").strip()
     filename = filename_input or None
+    compress = prompt("Compress with gzip? (y/N): ").lower() == "y"
+
+    export_path, count = export_listings_to_csv(
+        chain([first], rows),
+        filename,
+        compress=compress,
+        include_raw=include_raw,
+        progress=print_export_progress,
+    )
+    if count >= EXPORT_PROGRESS_EVERY:
+        print()
 
-    export_path = export_listings_to_csv(rows, filename)
-
-    print(f"\n[OK] Exported {len(rows)} listing(s) to {export_path}\n")
+    print(f"\n[OK] Exported {count} listing(s) to {export_path}\n")
     wait_for_enter()
 
 def analytics_flow() -> None:
     print("\n[Basic analytics]\n")
 
-    total_brokers, total_listings = get_summary_counts()
-    print(f"Total brokers:  {total_brokers}")
-    print(f"Total listings: {total_listings}\n")
+    totals = get_summary_counts()
+    print(f"Total brokers:  {totals.brokers}")
+    print(f"Total listings: {totals.listings}\n")
 
     # Top brokers
     print("Top brokers by listings:")
@@ -687,9 +781,88 @@ def analytics_flow() -> None:
             print(f"  - {sector}: {count}")
         print()
 
+    print("Listings by country:")
+    country_rows = get_country_counts(limit=10)
+    if not country_rows:
+        print("  [No listings]\n")
+    else:
+        for country, count in country_rows:
+            print(f"  - {country}: {count}")
+        print()
+
+    print("Listings by victim revenue:")
+    band_rows = get_revenue_band_counts()
+    if not band_rows:
+        print("  [No listings]\n")
+    else:
+        for band, count in band_rows:
+            print(f"  - {band}: {count}")
+        print()
+
+    print("Listings by access type:")
+    access_rows = get_access_type_counts(limit=10)
+    if not access_rows:
+        print("  [No listings]\n")
+    else:
+        for access_type, count in access_rows:
+            print(f"  - {access_type}: {count}")
+        print()
+
+    # Parser cache
+    stats = PARSE_CACHE.stats()
+    hits = stats["memory_hits"] + stats["db_hits"]
+    print("Parse cache:")
+    print(f"  Stored results: {get_parse_cache_count()}")
+    print(
+        f"  This session:   {hits} hit(s) ({stats['memory_hits']} memory, "
+        f"{stats['db_hits']} database), {stats['misses']} miss(es)"
+    )
+    print()
+
     wait_for_enter()
 
 
+def recent_activity_flow() -> None:
+    print("\n[Recent activity]\n")
+    raw = prompt(f"Days to look back (default {RECENT_DAYS}): ")
+    try:
+        days = int(raw) if raw else RECENT_DAYS
+        if days < 1:
+            raise ValueError(raw)
+    except ValueError:
+        print("\n[ERROR] Days must be a positive number\n")
+        wait_for_enter()
+        return
+
+    posted = last_days(days)
+    added = last_days(days, field="created_at")
+    print(f"\nPosted since {posted.since}: {count_listings(posted)} listing(s)")
+    print(f"Added since {added.since}:  {count_listings(added)} listing(s)\n")
+
+    print("Most active brokers:")
+    broker_rows = get_window_counts("broker", posted, limit=5)
+    if not broker_rows:
+        print("  [No listings]\n")
+    else:
+        for broker_name, count in broker_rows:
+            print(f"  - {broker_name}: {count} listing(s)")
+        print()
+
+    print("Sectors:")
+    sector_rows = get_window_counts("sector", posted, limit=5)
+    if not sector_rows:
+        print("  [No listings]\n")
+    else:
+        for sector, count in sector_rows:
+            print(f"  - {sector}: {count}")
+        print()
+
+    if broker_rows and prompt("Show the listings? (y/N): ").lower() == "y":
+        paged_listings_view(partial(get_all_listings, window=posted))
+    else:
+        wait_for_enter()
+
+
 def add_raw_listing_flow() -> None:
     print("\n[Add listing from raw post]\n")
 
@@ -702,14 +875,12 @@ def add_raw_listing_flow() -> None:
         wait_for_enter()
         return
 
-    broker_row = find_broker_by_name(broker_name)
-    if not broker_row:
+    broker_id = BROKER_RESOLVER.resolve(broker_name)
+    if broker_id is None:
         print(f"\n[ERROR] Broker '{broker_name}' not found. Add it first using option [1].\n")
         wait_for_enter()
         return
 
-    broker_id = broker_row[0]
-
     # --- Raw fields ---
     raw_title = prompt("Raw title (as shown on forum): ")
     raw_url = prompt("Source URL (optional): ")
@@ -733,9 +904,9 @@ def add_raw_listing_flow() -> None:
         print("\n[ERROR] Raw post text cannot be empty.\n")
         wait_for_enter()
         return
-        
+
     print("\n[Parser suggestions]\n")
-    suggested = suggest_listing_fields(raw_title, raw_text)
+    suggested = cached_suggest_listing_fields(raw_title, raw_text)
     for key, value in suggested.items():
         print(f"{key}: {value}")
     print()
@@ -808,11 +979,20 @@ def add_raw_listing_flow() -> None:
         revenue=revenue,
     )
 
+    near_duplicates = find_near_duplicates(raw_text)
+
     if duplicates:
         print("\n[WARN] Possible duplicate listing(s) found:\n")
         print_listings(duplicates)
 
-        choice = prompt("Insert anyway? (y/N): ").lower()
+    if near_duplicates:
+        print("\n[WARN] Similar post(s) already stored (likely reposts):\n")
+        for row in near_duplicates:
+            listing_id, broker_name, price, post_date, similarity = row.id, row.broker_name, row.price, row.post_date, row.similarity
+            print(f"[{listing_id}] {similarity:.0%} similar | {broker_name} | {price} | {post_date}")
+
+    if duplicates or near_duplicates:
+        choice = prompt("\nInsert anyway? (y/N): ").lower()
         if choice != "y":
             print("\n[INFO] Listing was NOT saved.\n")
             wait_for_enter()
@@ -833,6 +1013,8 @@ def add_raw_listing_flow() -> None:
         raw_title=raw_title,
         raw_text=raw_text,
         raw_url=raw_url,
+        parser_version=PARSER_VERSION,
+        parsed_fields=normalize_listing_fields({field: suggested.get(field, "") for field in SUGGESTED_FIELDS}),
     )
 
     print(f"\n[OK] Added listing with ID {listing_id} (raw + structured saved).\n")
@@ -859,11 +1041,29 @@ def print_menu() -> None:
     print("[11] Basic analytics")
     print("[12] Add listing from raw post")
     print("[13] View listing details")
+    print("[14] Find listings by price")
+    print("[15] Find listings by revenue")
+    print("[16] Recent activity")
     print("[0] Exit")
     print()
 
+def apply_config(config: Config) -> None:
+    """Pass the startup configuration to the database, parser and export layers."""
+    global EXPORTS_DIR
+    configure(config.db_path, config.pragma_profile, config.db_cache_mb)
+    PARSE_CACHE.resize(config.parse_cache_size)
+    EXPORTS_DIR = config.export_dir
+
+
 def main() -> None:
+    try:
+        apply_config(load_config())
+    except ValueError as e:
+        print(f"\n[ERROR] Configuration: {e}\n")
+        sys.exit(1)
+
     create_tables()
+    PARSE_CACHE.prune()
 
     while True:
         print_menu()
@@ -895,6 +1095,12 @@ def main() -> None:
             add_raw_listing_flow()
         elif choice == "13":
             view_listing_detail_flow()
+        elif choice == "14":
+            find_listings_by_price_flow()
+        elif choice == "15":
+            find_listings_by_revenue_flow()
+        elif choice == "16":
+            recent_activity_flow()
         elif choice == "0":
             print("\nGoodbye.\n")
             sys.exit(0)
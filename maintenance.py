@@ -0,0 +1,106 @@
+"""
+Database maintenance jobs that are too slow to run on startup.
+
+Usage:
+    python maintenance.py backfill-minhash [--batch-size 500]
+    python maintenance.py rebuild-stats [--check]
+    python maintenance.py vacuum
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from db.database import (
+    backfill_near_duplicate_index,
+    check_summary_tables,
+    configure,
+    create_tables,
+    rebuild_summary_tables,
+    vacuum_database,
+)
+from utils.config import load_config
+from utils.parse_cache import PARSE_CACHE
+
+
+def backfill_minhash(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+
+    def progress(done: int) -> None:
+        if done % 10000 < args.batch_size:
+            print(f"[INFO] {done} listings indexed")
+
+    done = backfill_near_duplicate_index(batch_size=args.batch_size, progress=progress)
+    elapsed = time.perf_counter() - started
+    print(f"\n[OK] Near-duplicate signatures computed for {done} listings in {elapsed:.1f}s\n")
+    return 0
+
+
+def rebuild_stats(args: argparse.Namespace) -> int:
+    mismatches = check_summary_tables()
+    for table, key, stored, actual in mismatches:
+        print(f"[WARN] {table} {key!r}: stored {stored}, actual {actual}")
+
+    if not mismatches:
+        print("\n[OK] Analytics summaries match the listings.\n")
+        return 0
+    if args.check:
+        print(f"\n[ERROR] {len(mismatches)} summary count(s) out of date.\n")
+        return 1
+
+    rebuild_summary_tables()
+    print(f"\n[OK] Rebuilt analytics summaries ({len(mismatches)} count(s) corrected).\n")
+    return 0
+
+
+def vacuum(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    pruned = PARSE_CACHE.prune()
+    if pruned:
+        print(f"[INFO] Dropped {pruned} parse results from older parser versions")
+    before, after = vacuum_database()
+    elapsed = time.perf_counter() - started
+    print(f"\n[OK] Database compacted from {before / 2 ** 20:.1f} MiB to {after / 2 ** 20:.1f} MiB "
+          f"in {elapsed:.1f}s\n")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AXIS database maintenance.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-minhash",
+        help="compute near-duplicate signatures for listings that have none (resumable)",
+    )
+    backfill.add_argument("--batch-size", type=int, default=500, help="listings per committed batch")
+    backfill.set_defaults(run=backfill_minhash)
+
+    stats = commands.add_parser(
+        "rebuild-stats",
+        help="check the analytics summary tables against the listings and rebuild them if they differ",
+    )
+    stats.add_argument("--check", action="store_true", help="only report differences (exit status 1 if any)")
+    stats.set_defaults(run=rebuild_stats)
+
+    compact = commands.add_parser(
+        "vacuum",
+        help="drop stale parse results and rebuild the database file without its free pages "
+             "(e.g. after a schema migration)",
+    )
+    compact.set_defaults(run=vacuum)
+
+    args = parser.parse_args(argv)
+    try:
+        config = load_config()
+        configure(config.db_path, config.pragma_profile, config.db_cache_mb)
+    except ValueError as e:
+        print(f"\n[ERROR] Configuration: {e}\n")
+        return 1
+
+    create_tables()
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
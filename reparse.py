@@ -0,0 +1,218 @@
+"""
+Re-run the parser over stored raw posts after parser improvements.
+
+Listings whose parser_version differs from the current PARSER_VERSION are
+streamed in id order, their raw title/text parsed again (in a process pool
+with --workers > 1), and each field the analyst did not override is updated
+to the new suggestion. A field counts as overridden when its stored value
+differs from what the parser suggested when the listing was stored
+(parsed_fields). Listings stored without parsed_fields (before it existed)
+only get their empty fields filled. New suggestions never blank a field.
+
+Every chunk of listings is committed together with its new parser_version,
+so an interrupted run resumes where it stopped. --dry-run changes nothing
+and reports what would change.
+
+Usage:
+    python reparse.py --dry-run [--report changes.jsonl]
+    python reparse.py --workers 4
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections import Counter
+from itertools import tee
+from pathlib import Path
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+from db.database import (
+    configure,
+    create_tables,
+    get_connection,
+    iter_listings_to_reparse,
+    mark_listings_parsed,
+    update_listing,
+)
+from ingest import validate_date
+from utils.config import load_config
+from utils.normalize import normalize_listing_fields
+from utils.parse import PARSER_VERSION, SUGGESTED_FIELDS, suggest_listing_fields_many
+from utils.parse_cache import normalize_post
+
+# Row layout of iter_listings_to_reparse().
+ROW_FIELDS = (
+    "access_type",
+    "country",
+    "privilege",
+    "price",
+    "description",
+    "source",
+    "post_date",
+    "sector",
+    "revenue",
+)
+
+Changes = Dict[str, Tuple[str, str]]
+
+
+def plan_changes(
+    current: Dict[str, str],
+    parsed_before: Optional[Dict[str, str]],
+    parsed_now: Dict[str, str],
+) -> Changes:
+    """
+    {field: (old, new)} for the parser fields to update: those still equal
+    to the previous suggestion (or empty, without one) whose new suggestion
+    is non-empty and different.
+    """
+    parsed_before = parsed_before or {}
+    changes = {}
+    for field in SUGGESTED_FIELDS:
+        old = current[field]
+        new = parsed_now.get(field, "")
+        if old != parsed_before.get(field, ""):
+            continue
+        if not new or new == old:
+            continue
+        if field == "post_date" and not validate_date(new):
+            continue
+        changes[field] = (old, new)
+    return changes
+
+
+def reparsed_rows(
+    conn: sqlite3.Connection,
+    workers: int,
+    chunk_size: int,
+) -> Iterator[Tuple[Tuple, Dict[str, str]]]:
+    """Yield (listing row, normalized new suggestion) for every outdated listing."""
+    for_parser, for_output = tee(iter_listings_to_reparse(PARSER_VERSION, chunk_size, conn=conn))
+    posts = (normalize_post(row[1] or "", row[2] or "") for row in for_parser)
+    suggestions = suggest_listing_fields_many(posts, workers=workers, chunk_size=chunk_size)
+    for row, suggested in zip(for_output, suggestions):
+        yield row, normalize_listing_fields({field: suggested.get(field, "") for field in SUGGESTED_FIELDS})
+
+
+class Reparser:
+    """
+    Applies (or, in a dry run, only reports) the planned changes, and commits
+    every `chunk_size` listings.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        chunk_size: int = 500,
+        dry_run: bool = False,
+        report: Optional[IO[str]] = None,
+        show: int = 0,
+    ) -> None:
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.report = report
+        self.show = show
+
+        self.checked = 0
+        self.changed = 0
+        self.field_changes: Counter = Counter()
+        self.started = time.perf_counter()
+        self._pending: List[Tuple[int, Dict[str, str]]] = []
+
+    def handle(self, row: Tuple, parsed_now: Dict[str, str]) -> None:
+        listing_id = row[0]
+        current = dict(zip(ROW_FIELDS, row[3:12]))
+        current = {field: value or "" for field, value in current.items()}
+        changes = plan_changes(current, row[12], parsed_now)
+
+        self.checked += 1
+        if changes:
+            self.changed += 1
+            self.field_changes.update(changes.keys())
+            self.write_report(listing_id, changes)
+            if not self.dry_run:
+                values = {**current, **{field: new for field, (_old, new) in changes.items()}}
+                update_listing(listing_id, conn=self.conn, **values)
+
+        if not self.dry_run:
+            self._pending.append((listing_id, parsed_now))
+            if len(self._pending) >= self.chunk_size:
+                self.commit()
+
+    def write_report(self, listing_id: int, changes: Changes) -> None:
+        if self.report:
+            entry = {
+                "id": listing_id,
+                "changes": {field: {"old": old, "new": new} for field, (old, new) in changes.items()},
+            }
+            self.report.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if self.changed <= self.show:
+            print(f"[{listing_id}]")
+            for field, (old, new) in changes.items():
+                print(f"    {field}: {old!r} -> {new!r}")
+
+    def commit(self) -> None:
+        if self._pending:
+            mark_listings_parsed(
+                ((listing_id, PARSER_VERSION, fields) for listing_id, fields in self._pending),
+                conn=self.conn,
+            )
+        self.conn.commit()
+        self._pending = []
+
+    def run(self, rows: Iterator[Tuple[Tuple, Dict[str, str]]], progress_every: int = 10000) -> None:
+        try:
+            for row, parsed_now in rows:
+                self.handle(row, parsed_now)
+                if progress_every and self.checked % progress_every == 0:
+                    print(f"[INFO] {self.checked} checked, {self.changed} changed")
+        finally:
+            if not self.dry_run:
+                self.commit()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        config = load_config()
+        configure(config.db_path, config.pragma_profile, config.db_cache_mb)
+    except ValueError as e:
+        print(f"\n[ERROR] Configuration: {e}\n")
+        return 1
+
+    parser = argparse.ArgumentParser(description="Re-run the parser over stored raw posts.")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    parser.add_argument("--report", type=Path, default=None, help="write every change as JSONL to this file")
+    parser.add_argument("--show", type=int, default=20, help="changed listings to print (default: 20)")
+    parser.add_argument("--workers", type=int, default=config.workers,
+                        help=f"parser processes (default: {config.workers}, from AXIS_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="listings per committed chunk")
+    args = parser.parse_args(argv)
+
+    create_tables()
+
+    conn = get_connection()
+    report = args.report.open("w", encoding="utf-8") if args.report else None
+    try:
+        reparser = Reparser(conn, args.chunk_size, args.dry_run, report, args.show)
+        reparser.run(reparsed_rows(conn, args.workers, args.chunk_size))
+    finally:
+        conn.close()
+        if report:
+            report.close()
+
+    elapsed = time.perf_counter() - reparser.started
+    verb = "would change" if args.dry_run else "changed"
+    print(f"\n[OK] Parser {PARSER_VERSION}: {reparser.checked} listing(s) checked, "
+          f"{reparser.changed} {verb} in {elapsed:.1f}s")
+    for field, count in reparser.field_changes.most_common():
+        print(f"  - {field}: {count}")
+    if args.report:
+        print(f"[INFO] Changes written to {args.report}")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
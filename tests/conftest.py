@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import pytest
+
+import db.database as database
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    """Point the database layer at a fresh file for one test."""
+    path = tmp_path / "axis.db"
+    database.configure(path, "interactive")
+    yield path
+    database.close_shared_connection()
+    database._invalidate_lookups()
@@ -0,0 +1,139 @@
+import pytest
+
+import db.database as database
+
+
+def listing_rows(n, broker_id, start=0):
+    for i in range(start, start + n):
+        yield {
+            "broker_id": broker_id,
+            "access_type": "rdp",
+            "country": "US",
+            "privilege": "user",
+            "price": str(1000 + i),
+            "description": f"listing {i}",
+            "source": "exploit",
+            "post_date": "2025-03-01",
+            "sector": "finance",
+            "revenue": "10M",
+            "raw_title": f"title {i}",
+            "raw_text": f"RDP access marker{i}",
+        }
+
+
+def listings_indexes(conn):
+    return {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'listings' "
+            "AND sql IS NOT NULL"
+        )
+    }
+
+
+def has_insert_trigger(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'listings_fts_ai'"
+    ).fetchone() is not None
+
+
+@pytest.fixture
+def broker_id(db_path):
+    database.create_tables()
+    return database.insert_broker("hydra", "Hydra", "")
+
+
+@pytest.mark.parametrize("defer_indexes", [False, True])
+def test_ids_match_stored_rows_in_input_order(broker_id, defer_indexes):
+    ids = database.insert_listings(listing_rows(25, broker_id), batch_size=10, defer_indexes=defer_indexes)
+
+    assert len(ids) == 25
+    assert [database.get_listing_by_id(i).description for i in ids] == [f"listing {i}" for i in range(25)]
+    assert [row.id for row in database.search_query("marker7")] == [ids[7]]
+
+
+def test_executemany_ids_are_the_new_rowids(broker_id):
+    conn = database.shared_connection()
+    cursor = conn.cursor()
+    database.insert_broker("spacer", "Spacer", "")
+    ids = database._executemany_ids(
+        cursor,
+        "INSERT INTO brokers (name, raw_name, notes) VALUES (?, ?, '')",
+        [("a", "A"), ("b", "B"), ("c", "C")],
+    )
+    conn.commit()
+    names = dict(conn.execute("SELECT id, name FROM brokers").fetchall())
+    assert [names[i] for i in ids] == ["a", "b", "c"]
+
+
+def test_drop_and_restore_indexes(broker_id):
+    conn = database.shared_connection()
+    before = listings_indexes(conn)
+
+    dropped = database.drop_table_indexes("listings", conn)
+    assert {name for name, _sql in dropped} == before
+    assert listings_indexes(conn) == set()
+    # Unique indexes enforce constraints and are kept.
+    assert database.drop_table_indexes("brokers", conn) == [
+        ("idx_brokers_name", "CREATE INDEX idx_brokers_name ON brokers(name)")
+    ]
+    assert "ux_brokers_name" in {row[1] for row in conn.execute("PRAGMA index_list(brokers)")}
+
+    database.restore_indexes(dropped, conn)
+    conn.commit()
+    assert listings_indexes(conn) == before
+
+
+def test_failed_deferred_load_keeps_committed_rows_searchable(broker_id):
+    conn = database.shared_connection()
+    indexes = listings_indexes(conn)
+
+    def rows_then_failure():
+        yield from listing_rows(25, broker_id)
+        raise RuntimeError("feed broke")
+
+    with pytest.raises(RuntimeError, match="feed broke"):
+        database.insert_listings(rows_then_failure(), batch_size=10, defer_indexes=True)
+
+    assert listings_indexes(conn) == indexes
+    assert has_insert_trigger(conn)
+    # The two full batches were committed; the partial third one was not.
+    stored = database.get_all_listings()
+    assert len(stored) == 20
+    for row in stored:
+        number = row.description.split()[-1]
+        assert [hit.id for hit in database.search_query(f"marker{number}")] == [row.id]
+
+    # Later single inserts are indexed by the trigger again.
+    listing_id = database.insert_listing(
+        broker_id, "vpn", "DE", "", "500", "late", "xss", "2025-04-01", "", "", "", "late marker", ""
+    )
+    assert [row.id for row in database.search_query("late")] == [listing_id]
+
+
+def test_interrupted_load_is_repaired_on_startup(broker_id):
+    # What a killed process leaves behind: indexes dropped and committed
+    # rows that never reached listings_fts.
+    conn = database.shared_connection()
+    indexes = listings_indexes(conn)
+    database.drop_table_indexes("listings", conn)
+    conn.execute("DROP TRIGGER listings_fts_ai")
+    conn.commit()
+    database.insert_listings(listing_rows(5, broker_id))
+
+    database.create_tables()
+
+    assert listings_indexes(conn) == indexes
+    assert has_insert_trigger(conn)
+    assert len(database.search_query("marker3")) == 1
+
+
+def test_joins_an_open_implicit_transaction(broker_id):
+    conn = database.shared_connection()
+    conn.execute("UPDATE brokers SET notes = 'pending' WHERE id = ?", (broker_id,))
+    assert conn.in_transaction
+
+    ids = database.insert_listings(listing_rows(15, broker_id), batch_size=10, defer_indexes=True)
+
+    assert len(ids) == 15
+    assert not conn.in_transaction
+    assert conn.execute("SELECT notes FROM brokers WHERE id = ?", (broker_id,)).fetchone()[0] == "pending"
@@ -0,0 +1,25 @@
+import pytest
+
+import utils.config as config
+from utils.config import ConfigError, load_config
+
+
+def test_environment_overrides_toml_file(tmp_path):
+    toml = tmp_path / "axis.toml"
+    toml.write_text('[database]\npath = "other.db"\n\n[parser]\nworkers = 4\n')
+    cfg = load_config(config_file=toml, env_file=None, environ={"AXIS_WORKERS": "2"})
+    assert cfg.db_path.name == "other.db"
+    assert cfg.workers == 2
+
+
+def test_environment_only_without_toml_parser(tmp_path, monkeypatch):
+    # Python 3.10 without tomli: .env and environment variables still work.
+    monkeypatch.setattr(config, "tomllib", None)
+    monkeypatch.chdir(tmp_path)
+    cfg = load_config(env_file=None, environ={"AXIS_DB_PATH": "env.db"})
+    assert cfg.db_path.name == "env.db"
+
+    toml = tmp_path / "axis.toml"
+    toml.write_text("[database]\n")
+    with pytest.raises(ConfigError, match="tomli"):
+        load_config(env_file=None, environ={})
@@ -0,0 +1,74 @@
+import pytest
+
+import db.database as database
+from benchmarks.posts import sample_listing_rows
+from benchmarks.window_bench import indexes_used
+from db.database import DateWindow
+
+DAY = DateWindow("2025-12-01", "2025-12-01")
+WEEK = DateWindow("2025-12-20", "2025-12-26")
+HALF_YEAR = DateWindow("2025-07-01", "2025-12-31")
+
+
+@pytest.fixture(scope="module")
+def seeded_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("windows") / "axis.db"
+    database.configure(path, "interactive")
+    database.create_tables()
+    broker_ids = database.insert_brokers((f"broker{i}", f"Broker{i}", "") for i in range(10))
+    database.insert_listings(sample_listing_rows(2000, broker_ids), batch_size=500)
+    database.close_shared_connection()
+    return path
+
+
+@pytest.fixture
+def seeded(seeded_path):
+    """The seeded database, read-only for the test."""
+    database.configure(seeded_path, "interactive")
+    yield seeded_path
+    database.close_shared_connection()
+
+
+def by_sector(window):
+    return database.find_listings_by_sector("healthcare", page_size=20, window=window)
+
+
+def by_broker(window):
+    return database.find_listings_by_broker_name("broker7", page_size=20, window=window)
+
+
+@pytest.mark.parametrize("window", [DAY, WEEK], ids=["day", "week"])
+def test_narrow_windows_use_post_date_indexes(seeded, window):
+    assert indexes_used(lambda: by_sector(window)) == ["idx_listings_post_date_sector"]
+    assert indexes_used(lambda: by_broker(window)) == ["idx_listings_broker_post_date"]
+    assert indexes_used(lambda: database.get_all_listings(page_size=20, window=window)) == [
+        "idx_listings_post_date_sector"
+    ]
+
+
+def test_wide_windows_walk_page_order(seeded, monkeypatch):
+    # Every window matches more rows than the probe limit.
+    monkeypatch.setattr(database, "RANGE_PROBE_ROWS", 10)
+    assert indexes_used(lambda: by_sector(HALF_YEAR)) == ["idx_listings_sector_created"]
+    assert indexes_used(lambda: by_broker(HALF_YEAR)) == ["idx_listings_broker_created"]
+    assert indexes_used(lambda: database.get_all_listings(page_size=20, window=HALF_YEAR)) == [
+        "idx_listings_created_at"
+    ]
+
+
+@pytest.mark.parametrize("window", [DAY, WEEK, HALF_YEAR, DateWindow(None, "2025-01-15")])
+def test_window_results_match_post_dates(seeded, window):
+    def posted_within(row):
+        return (window.since or "") <= row.post_date <= (window.until or "9999")
+
+    everything = database.get_all_listings()
+    expected = [row.id for row in everything if posted_within(row)]
+    assert [row.id for row in database.get_all_listings(window=window)] == expected
+    assert [row.id for row in database.iter_listings(window=window)] == expected
+    assert database.count_listings(window) == len(expected)
+
+    healthcare = [row.id for row in everything if row.sector == "healthcare" and posted_within(row)]
+    assert [row.id for row in database.find_listings_by_sector("healthcare", window=window)] == healthcare
+
+    matches = {row.id for row in database.search_query("rdp")}
+    assert {row.id for row in database.search_query("rdp", window=window)} == matches.intersection(expected)
@@ -0,0 +1,110 @@
+import io
+import json
+
+import pytest
+
+import db.database as database
+import ingest
+
+
+def post(description, **fields):
+    record = {
+        "broker": "hydra",
+        "title": f"US RDP {description}",
+        "text": f"RDP access, {description}",
+        "access_type": "rdp",
+        "country": "US",
+        "price": "1500",
+        "description": description,
+        "post_date": "2025-01-02",
+    }
+    record.update(fields)
+    return json.dumps(record)
+
+
+@pytest.fixture
+def run_ingest(db_path, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AXIS_DB_PATH", str(db_path))
+    database.create_tables()
+    database.insert_broker("hydra", "Hydra", "")
+
+    def run(lines, *args):
+        path = tmp_path / "posts.jsonl"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        capsys.readouterr()
+        assert ingest.main([str(path), "--batch-size", "2", *args]) == 0
+        rejects_path = tmp_path / "posts.jsonl.rejects.jsonl"
+        rejects = [json.loads(line) for line in rejects_path.read_text(encoding="utf-8").splitlines()]
+        return capsys.readouterr().out, rejects
+
+    return run
+
+
+def test_counts_and_reject_reasons(run_ingest):
+    out, rejects = run_ingest([
+        post("first"),
+        post("first"),
+        "{not json",
+        post("no text", text=""),
+        post("bad date", post_date="2025-13-01"),
+        post("unknown broker", broker="nobody"),
+        "[1, 2]",
+        post("second"),
+        post("third"),
+    ])
+
+    assert "[OK] 9 read, 3 inserted, 6 rejected" in out
+    reasons = [entry["reason"] for entry in rejects]
+    assert reasons[0] == "duplicate of an earlier record in this batch"
+    assert reasons[1].startswith("invalid JSON")
+    assert reasons[2:] == [
+        "raw text is empty",
+        "invalid post_date '2025-13-01'",
+        "broker 'nobody' not found",
+        "record is not a JSON object",
+    ]
+    assert sorted(row.description for row in database.get_all_listings()) == ["first", "second", "third"]
+
+
+def test_second_run_rejects_everything_as_duplicate(run_ingest):
+    lines = [post(f"listing {i}") for i in range(5)]
+    out, rejects = run_ingest(lines)
+    assert "[OK] 5 read, 5 inserted, 0 rejected" in out
+    assert rejects == []
+
+    out, rejects = run_ingest(lines)
+    assert "[OK] 5 read, 0 inserted, 5 rejected" in out
+    assert all(entry["reason"].startswith("duplicate of listing") for entry in rejects)
+    assert len(database.get_all_listings()) == 5
+
+
+def test_failed_insert_is_not_counted(run_ingest, monkeypatch):
+    def broken_insert(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(ingest, "insert_listings", broken_insert)
+    with pytest.raises(RuntimeError, match="disk full"):
+        run_ingest([post("first"), post("second"), post("third")])
+    assert database.get_all_listings() == []
+
+
+def test_counts_follow_committed_batches(db_path):
+    database.create_tables()
+    database.insert_broker("hydra", "Hydra", "")
+    conn = database.get_connection()
+    records = [(f"ref{i}", json.loads(post(f"listing {i}")), {}) for i in range(3)]
+
+    def fail_second_batch():
+        yield from records
+        raise RuntimeError("reader broke")
+
+    ingestor = ingest.Ingestor(conn, rejects=io.StringIO(), batch_size=2)
+    with pytest.raises(RuntimeError, match="reader broke"):
+        ingestor.run(fail_second_batch())
+    conn.close()
+
+    # The first batch of two was committed; the third record was pending.
+    assert ingestor.read == 3
+    assert ingestor.inserted == 2
+    assert len(database.get_all_listings()) == 2
@@ -0,0 +1,120 @@
+import sqlite3
+from pathlib import Path
+
+import db.database as database
+
+# The schema create_tables() wrote before any of the upgrades (v0.4).
+BASELINE_SCHEMA = """
+CREATE TABLE brokers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    raw_name TEXT,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX ux_brokers_name ON brokers(name);
+CREATE TABLE listings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    broker_id INTEGER NOT NULL,
+    access_type TEXT,
+    country TEXT,
+    privilege TEXT,
+    price TEXT,
+    description TEXT,
+    source TEXT,
+    post_date TEXT,
+    sector TEXT,
+    revenue TEXT,
+    raw_title TEXT,
+    raw_text TEXT,
+    raw_url TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (broker_id) REFERENCES brokers(id) ON DELETE CASCADE
+);
+CREATE INDEX idx_brokers_name ON brokers(name);
+CREATE INDEX idx_listings_broker_id ON listings(broker_id);
+CREATE INDEX idx_listings_sector ON listings(sector);
+CREATE INDEX idx_listings_created_at ON listings(created_at);
+"""
+
+BASELINE_LISTINGS = [
+    # broker_id, access_type, country, privilege, price, description, source, post_date, sector, revenue
+    (1, "rdp", "US", "da", "1500", "US bank RDP", "exploit", "2025-01-02", "finance", "10-25M"),
+    (1, "RDP", "us", "user", "$900", "second RDP", "Exploit", "2025-01-03", "Finance", ""),
+    (2, "vpn", "DE", "admin", "START 2000", "DE VPN", "", "2025-02-01", "", "1.5B"),
+    (2, "", "", "", "700", "bare", "xss", "2025-02-02", "healthcare", "5M"),
+]
+
+
+def create_baseline_db(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO brokers (name, raw_name, notes) VALUES (?, ?, '')",
+        [("hydra", "Hydra"), ("wazawaka", "Wazawaka")],
+    )
+    conn.executemany(
+        """
+        INSERT INTO listings (broker_id, access_type, country, privilege, price, description,
+                              source, post_date, sector, revenue, raw_title, raw_text, raw_url)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'title', 'raw post text', '')
+        """,
+        BASELINE_LISTINGS,
+    )
+    conn.commit()
+    conn.close()
+
+
+def listing_columns(conn: sqlite3.Connection) -> set:
+    return {row[1] for row in conn.execute("PRAGMA table_info(listings)")}
+
+
+def test_baseline_database_upgrades(db_path):
+    create_baseline_db(db_path)
+
+    database.create_tables()
+
+    conn = database.shared_connection()
+    columns = listing_columns(conn)
+    for field in database.DIMENSIONS:
+        assert field not in columns
+        assert f"{field}_id" in columns
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(listings)")}
+    assert "idx_listings_sector" not in indexes
+    assert "idx_listings_sector_created" in indexes
+
+    rows = {row.description: row for row in database.get_all_listings()}
+    assert len(rows) == len(BASELINE_LISTINGS)
+    assert (rows["second RDP"].access_type, rows["second RDP"].country) == ("rdp", "US")
+    assert rows["second RDP"].sector == "finance"
+    assert rows["second RDP"].source == "exploit"
+    assert rows["DE VPN"].sector == ""
+    assert rows["bare"].access_type == ""
+    assert conn.execute("SELECT COUNT(*) FROM countries").fetchone()[0] == 2
+
+    assert database.check_summary_tables() == []
+    assert dict(database.get_sector_counts()) == {"finance": 2, "healthcare": 1, "unknown": 1}
+    assert {row.description for row in database.find_listings_by_sector("finance")} == {
+        "US bank RDP", "second RDP"
+    }
+    assert {row.description for row in database.search_query("sector:finance")} == {
+        "US bank RDP", "second RDP"
+    }
+
+
+def test_upgraded_database_accepts_writes(db_path):
+    create_baseline_db(db_path)
+    database.create_tables()
+
+    listing_id = database.insert_listing(
+        2, "Citrix", "fr", "user", "1200", "new citrix", "xss", "2025-03-01", "Healthcare", "",
+        "", "", "",
+    )
+    row = database.get_listing_by_id(listing_id)
+    assert (row.access_type, row.country, row.sector) == ("citrix", "FR", "healthcare")
+    assert dict(database.get_sector_counts())["healthcare"] == 2
+    assert database.check_summary_tables() == []
+
+    # A second startup finds nothing left to migrate.
+    database.create_tables()
+    assert len(database.get_all_listings()) == len(BASELINE_LISTINGS) + 1
@@ -0,0 +1,79 @@
+import db.database as database
+
+POST = """Selling RDP access to a US regional bank, domain admin rights.
+Revenue: 250M, 1200 hosts, Defender on endpoints, no EDR.
+Price: START 3000, STEP 500, BLITZ 6000
+Posted 2025-01-02, escrow accepted, PM for details."""
+
+UNRELATED = """Fresh VPN logins for a German logistics company, user rights only.
+Around 80 employees, Fortinet gateway, MFA not enforced.
+Asking 700 USD, negotiable, 2025-02-10."""
+
+
+def add(broker_id, raw_text, price="3000"):
+    return database.insert_listing(
+        broker_id, "rdp", "US", "domain admin", price, "bank access", "exploit",
+        "2025-01-02", "finance", "250M", "US bank", raw_text, "",
+    )
+
+
+def index_rows(listing_id):
+    conn = database.shared_connection()
+    return [
+        conn.execute(f"SELECT COUNT(*) FROM {table} WHERE listing_id = ?", (listing_id,)).fetchone()[0]
+        for table in ("listing_minhash", "listing_lsh")
+    ]
+
+
+def test_repost_with_new_price_and_date_is_found(db_path):
+    database.create_tables()
+    hydra = database.insert_broker("hydra", "Hydra", "")
+    original = add(hydra, POST)
+    unrelated = add(hydra, UNRELATED, price="700")
+
+    repost = POST.replace("START 3000", "START 2500").replace("2025-01-02", "2025-03-15")
+    matches = database.find_near_duplicates(repost)
+
+    assert [row.id for row in matches] == [original]
+    assert matches[0].similarity >= database.NEAR_DUP_THRESHOLD
+    assert unrelated not in {row.id for row in database.find_near_duplicates(repost, threshold=0.3)}
+    assert database.find_near_duplicates(repost, exclude_id=original) == []
+
+
+def test_deleted_listings_leave_no_signatures(db_path):
+    database.create_tables()
+    hydra = database.insert_broker("hydra", "Hydra", "")
+    other = database.insert_broker("other", "Other", "")
+    deleted = add(hydra, POST)
+    cascaded = database.insert_listings([
+        {"broker_id": other, "access_type": "vpn", "country": "DE", "price": "700",
+         "description": "vpn", "source": "xss", "post_date": "2025-02-10",
+         "sector": "logistics", "revenue": "", "raw_text": UNRELATED},
+    ])[0]
+    assert index_rows(deleted)[0] == 1 and index_rows(cascaded)[0] == 1
+
+    database.delete_listing(deleted)
+    conn = database.shared_connection()
+    conn.execute("DELETE FROM brokers WHERE id = ?", (other,))
+    conn.commit()
+
+    assert index_rows(deleted) == [0, 0]
+    assert index_rows(cascaded) == [0, 0]
+    assert database.find_near_duplicates(POST) == []
+
+
+def test_startup_removes_signatures_orphaned_before_the_trigger(db_path):
+    database.create_tables()
+    hydra = database.insert_broker("hydra", "Hydra", "")
+    kept = add(hydra, UNRELATED)
+    orphan = add(hydra, POST)
+    conn = database.shared_connection()
+    conn.execute("DROP TRIGGER listings_minhash_ad")
+    conn.execute("DELETE FROM listings WHERE id = ?", (orphan,))
+    conn.commit()
+    assert index_rows(orphan)[0] == 1
+
+    database.create_tables()
+
+    assert index_rows(orphan) == [0, 0]
+    assert index_rows(kept)[0] == 1
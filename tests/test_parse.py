@@ -0,0 +1,28 @@
+import pytest
+
+from benchmarks import parse_baseline
+from benchmarks.posts import sample_posts
+from utils.parse import ParsedDocument, suggest_document_fields, suggest_listing_fields
+
+EDGE_POSTS = [
+    ("", "US rdp, revenue 5M"),
+    ("[DE] vpn access", "body with a (FR) tag"),
+    ("Title XX", "\nAB CD [US] 1.5M"),
+    ("İstanbul hospital", "{TR} İİ price 1,500 usd"),
+    ("no admin here", "START 1000, STEP 100\nprice: 2000 (revenue 20M)"),
+]
+
+
+@pytest.mark.parametrize("repeat_body", [1, 4])
+def test_matches_the_pre_document_parser(repeat_body):
+    for title, text in sample_posts(500) + EDGE_POSTS:
+        text = "\n".join([text] * repeat_body)
+        assert suggest_listing_fields(title, text) == parse_baseline.suggest_listing_fields(title, text)
+
+
+def test_views_are_built_on_first_use():
+    doc = ParsedDocument.from_post("[US] RDP", "Price: 1500\n2025-01-02")
+    assert "lower" not in vars(doc)
+    fields = suggest_document_fields(doc)
+    assert (fields["country"], fields["access_type"], fields["price"]) == ("US", "rdp", "1500")
+    assert doc.lower == doc.text.lower()
@@ -0,0 +1,46 @@
+import db.database as database
+from utils.parse import PARSER_VERSION
+from utils.parse_cache import ParseCache
+
+
+def test_prune_drops_other_parser_versions(db_path):
+    database.create_tables()
+    cache = ParseCache()
+    cache.get_or_parse("US RDP access", "Price: 1500")
+    database.insert_parse_cache_entry("old", "0.1.0", "{}")
+    database.insert_parse_cache_entry("newer", PARSER_VERSION + ".1", "{}")
+    assert database.get_parse_cache_count() == 3
+
+    assert cache.prune() == 2
+    assert database.get_parse_cache_count() == 1
+    assert database.get_parse_cache_entry("old") is None
+    assert database.get_parse_cache_entry("newer") is None
+
+    # The current version's result is still served from the table.
+    fresh = ParseCache()
+    fresh.get_or_parse("US RDP access", "Price: 1500")
+    assert fresh.stats()["db_hits"] == 1
+    assert fresh.prune() == 0
+
+
+def test_prune_uses_the_version_index(db_path):
+    database.create_tables()
+    plan = database.shared_connection().execute(
+        "EXPLAIN QUERY PLAN DELETE FROM parse_cache WHERE parser_version < ? OR parser_version > ?",
+        (PARSER_VERSION, PARSER_VERSION),
+    ).fetchall()
+    assert any("idx_parse_cache_parser_version" in row[-1] for row in plan)
+
+
+def test_vacuum_prunes_the_parse_cache(db_path, tmp_path, monkeypatch, capsys):
+    import maintenance
+
+    database.create_tables()
+    database.insert_parse_cache_entry("old", "0.1.0", "{}")
+    database.close_shared_connection()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AXIS_DB_PATH", str(db_path))
+    assert maintenance.main(["vacuum"]) == 0
+    assert "Dropped 1 parse results" in capsys.readouterr().out
+    assert database.get_parse_cache_count() == 0
@@ -0,0 +1,31 @@
+import pytest
+
+import db.database as database
+
+
+# PRAGMA synchronous reports OFF as 0, NORMAL as 1.
+@pytest.mark.parametrize("profile, synchronous", [
+    ("interactive", 1),
+    ("bulk-load", 1),
+    ("bulk-load-unsafe", 0),
+])
+def test_only_the_unsafe_profile_skips_fsync(db_path, profile, synchronous):
+    conn = database.get_connection(profile)
+    try:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_ingest_defaults_to_a_durable_profile(db_path, tmp_path, monkeypatch, capsys):
+    import ingest
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AXIS_DB_PATH", str(db_path))
+    posts = tmp_path / "posts.jsonl"
+    posts.write_text("")
+    assert ingest.main([str(posts)]) == 0
+    assert "[WARN]" not in capsys.readouterr().out
+    assert ingest.main([str(posts), "--profile", "bulk-load-unsafe"]) == 0
+    assert "corrupt the database" in capsys.readouterr().out
@@ -0,0 +1,135 @@
+import builtins
+
+import pytest
+
+import db.database as database
+import main
+from db.database import build_search_match
+
+
+def add(broker_id, description, country="US", sector="finance", raw_text=""):
+    return database.insert_listing(
+        broker_id, "rdp", country, "user", "1500", description, "exploit",
+        "2025-01-02", sector, "10M", "", raw_text or description, "",
+    )
+
+
+@pytest.fixture
+def broker_id(db_path):
+    database.create_tables()
+    return database.insert_broker("hydra", "Hydra", "")
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("rdp bank", '"rdp" AND "bank"'),
+    ('"domain admin" vpn', '"domain admin" AND "vpn"'),
+    ("fortig*", '"fortig"*'),
+    ("country:us sector:health*", 'country : "us" AND sector : "health"*'),
+    ('description:"domain admin"', 'description : "domain admin"'),
+    ("http://example.com", '"http://example.com"'),
+    ("rdp OR vpn", '"rdp" OR "vpn"'),
+    ("vpn NOT citrix", '"vpn" NOT "citrix"'),
+    ("or and not", '"or" AND "and" AND "not"'),
+])
+def test_match_syntax(q, expected):
+    assert build_search_match(q) == expected
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("AND rdp", '"rdp"'),
+    ("rdp OR", '"rdp"'),
+    ("rdp OR NOT vpn", '"rdp" NOT "vpn"'),
+    ('"domain admin', '"domain admin"'),
+    ('rdp"', '"rdp"""'),
+    ('"', ""),
+    ("* ( ) : ^ - + \"\"", ""),
+    ("NEAR(rdp vpn)", '"NEAR(rdp" AND "vpn)"'),
+    ("^rdp -vpn {sector}", '"^rdp" AND "-vpn" AND "{sector}"'),
+    ("nosuchfield:rdp", '"nosuchfield:rdp"'),
+    ("rdp\0vpn", '"rdp" AND "vpn"'),
+])
+def test_malformed_queries_stay_quoted(q, expected):
+    assert build_search_match(q) == expected
+
+
+@pytest.mark.parametrize("q", [
+    '"', '""', '"""', "*", "rdp*vpn*", "(rdp", "rdp)", "NEAR(rdp, vpn, 2)", "^rdp",
+    "-rdp", "+rdp", "country:", ":rdp", "country::us", 'country:"us', "sector:*",
+    "rdp AND", "NOT rdp", "OR", "rdp OR OR vpn", "rdp\0", "{country sector}: us",
+    "rdp's bank; DROP TABLE listings;--", "\x01\x7f", "é*",
+])
+def test_malformed_queries_run(broker_id, q):
+    add(broker_id, "rdp bank access")
+
+    database.search_query(q, limit=5, snippets=True)
+    database.search_query(q)
+    database.count_search_results(q)
+    list(database.iter_search_results(q))
+
+
+def test_field_scoped_prefix_and_operators_match(broker_id):
+    us_bank = add(broker_id, "domain admin bank", sector="finance")
+    de_clinic = add(broker_id, "clinic vpn", country="DE", sector="healthcare")
+
+    def ids(q):
+        return sorted(row.id for row in database.search_query(q))
+
+    assert ids("country:us") == [us_bank]
+    assert ids("sector:health*") == [de_clinic]
+    assert ids('"domain admin"') == [us_bank]
+    assert ids('"admin domain"') == []
+    assert ids("bank OR clinic") == [us_bank, de_clinic]
+    assert ids("rdp NOT clinic") == [us_bank]
+
+
+def test_paging_and_count(broker_id):
+    ids = [add(broker_id, f"rdp listing {i}") for i in range(7)]
+
+    pages = [
+        [row.id for row in database.search_query("rdp", limit=3, offset=offset)]
+        for offset in (0, 3, 6)
+    ]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sorted(sum(pages, [])) == ids
+    assert database.count_search_results("rdp") == 7
+    assert database.count_search_results('"') == 0
+
+
+def test_rank_window_drops_older_matches(broker_id, monkeypatch):
+    best = add(broker_id, "citrix citrix citrix", raw_text="citrix citrix citrix")
+    newer = [add(broker_id, f"citrix {i}", raw_text=f"plain post {i}") for i in range(3)]
+    monkeypatch.setattr(database, "SEARCH_RANK_WINDOW", 2)
+
+    # Documented: the limited search only ranks the newest matches.
+    assert [row.id for row in database.search_query("citrix", limit=10)] == sorted(newer[1:], reverse=True)
+    assert database.search_query("citrix")[0].id == best
+    assert database.count_search_results("citrix") == 4
+
+
+def test_cli_shows_counts_and_pages(broker_id, monkeypatch, capsys):
+    for i in range(5):
+        add(broker_id, f"rdp listing {i}")
+    monkeypatch.setattr(main, "SEARCH_RESULT_LIMIT", 2)
+    monkeypatch.setattr(main, "SEARCH_RANK_WINDOW", 4)
+    monkeypatch.setattr(database, "SEARCH_RANK_WINDOW", 4)
+    answers = iter(["rdp", "n", "n", "p", ""])
+    monkeypatch.setattr(builtins, "input", lambda _prompt="": next(answers))
+
+    main.search_query_flow()
+
+    out = capsys.readouterr().out
+    assert "[INFO] Showing 1-2 of 5 matches." in out
+    assert "[INFO] Showing 3-4 of 5 matches." in out
+    # Paging stops at the rank window.
+    assert out.count("[n] Next") == 2
+    assert "[WARN] Only the 4 most recent matches are ranked" in out
+
+
+def test_cli_survives_fts_syntax(broker_id, monkeypatch, capsys):
+    add(broker_id, "rdp listing")
+    answers = iter(['(rdp* ^ "listing', ""])
+    monkeypatch.setattr(builtins, "input", lambda _prompt="": next(answers))
+
+    main.search_query_flow()
+
+    assert "[INFO] Showing 1-1 of 1 matches." in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import db.database as database
+import maintenance
+from db.database import NameCount, SummaryCounts, SummaryMismatch
+
+
+def add(broker_id, sector, country="US", revenue="10M"):
+    return database.insert_listing(
+        broker_id, "rdp", country, "user", "1500", f"{sector} {country}", "exploit",
+        "2025-01-02", sector, revenue,
+    )
+
+
+def check_stats(tmp_path, monkeypatch, capsys, db_path):
+    """Exit status and output of `maintenance.py rebuild-stats --check`."""
+    database.close_shared_connection()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AXIS_DB_PATH", str(db_path))
+    capsys.readouterr()
+    status = maintenance.main(["rebuild-stats", "--check"])
+    return status, capsys.readouterr().out
+
+
+def test_triggers_keep_summaries_in_step(db_path, tmp_path, monkeypatch, capsys):
+    database.create_tables()
+    hydra = database.insert_broker("hydra", "Hydra", "")
+    other = database.insert_broker("other", "Other", "")
+
+    first = add(hydra, "finance")
+    second = add(hydra, "healthcare", country="DE", revenue="2B")
+    third = add(other, "finance", country="FR")
+    database.insert_listings([
+        {"broker_id": other, "access_type": "vpn", "country": "us", "price": "900",
+         "description": "bulk", "source": "xss", "post_date": "2025-02-01",
+         "sector": "Education", "revenue": ""},
+    ])
+    database.update_listing(
+        first, "vpn", "GB", "admin", "2000", "moved", "xss", "2025-01-03", "education", "500M"
+    )
+    database.delete_listing(second)
+    # Deleting a broker removes its listings through the foreign key.
+    conn = database.shared_connection()
+    conn.execute("DELETE FROM brokers WHERE id = ?", (other,))
+    conn.commit()
+
+    assert database.get_summary_counts() == SummaryCounts(brokers=1, listings=1)
+    assert database.get_sector_counts() == [NameCount("education", 1)]
+    assert database.get_country_counts() == [NameCount("GB", 1)]
+    assert database.get_broker_listing_counts() == [NameCount("hydra", 1)]
+    assert [row.name for row in database.get_revenue_band_counts()] == ["100M-1B"]
+    assert database.get_listing_by_id(third) is None
+
+    status, out = check_stats(tmp_path, monkeypatch, capsys, db_path)
+    assert status == 0
+    assert "[OK] Analytics summaries match the listings." in out
+
+
+def test_check_reports_and_rebuild_repairs_drift(db_path, tmp_path, monkeypatch, capsys):
+    database.create_tables()
+    hydra = database.insert_broker("hydra", "Hydra", "")
+    add(hydra, "finance")
+    conn = database.shared_connection()
+    conn.execute("UPDATE stats_totals SET row_count = 7 WHERE name = 'listings'")
+    conn.commit()
+
+    assert database.check_summary_tables() == [SummaryMismatch("stats_totals", "listings", 7, 1)]
+    status, out = check_stats(tmp_path, monkeypatch, capsys, db_path)
+    assert status == 1
+    assert "[WARN] stats_totals 'listings': stored 7, actual 1" in out
+
+    assert maintenance.main(["rebuild-stats"]) == 0
+    assert database.check_summary_tables() == []
+    assert database.get_summary_counts().listings == 1
@@ -0,0 +1,136 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    try:
+        import tomli as tomllib  # same API, for Python 3.10
+    except ImportError:
+        tomllib = None
+
+# Runtime settings, merged from (lowest to highest precedence):
+#
+#   1. the defaults below
+#   2. a TOML file: axis.toml in the working directory, or AXIS_CONFIG
+#   3. a .env file in the working directory (KEY=VALUE lines)
+#   4. environment variables
+#
+# TOML is read with tomllib (Python 3.11+) or tomli on Python 3.10. Without
+# either, only .env and environment variables are available.
+#
+# Each setting has an environment name (used by .env too) and a
+# [section] key in the TOML file:
+#
+#   AXIS_DB_PATH            [database] path
+#   AXIS_PRAGMA_PROFILE     [database] pragma_profile
+#   AXIS_DB_CACHE_MB        [database] cache_mb        (overrides the profile's page cache)
+#   AXIS_PARSE_CACHE_SIZE   [parser]   cache_size      (in-process parse cache entries)
+#   AXIS_WORKERS            [parser]   workers         (parser process pool size)
+#   AXIS_EXPORT_DIR         [export]   dir
+
+CONFIG_FILE = Path("axis.toml")
+ENV_FILE = Path(".env")
+
+
+class ConfigError(ValueError):
+    """An unreadable config file or an invalid setting."""
+
+
+class Config(NamedTuple):
+    db_path: Path = Path("axis.db")
+    pragma_profile: str = "interactive"
+    db_cache_mb: Optional[int] = None
+    parse_cache_size: int = 4096
+    workers: int = 1
+    export_dir: Path = Path("exports")
+
+
+# field -> (environment name, TOML section, TOML key, parser)
+_SETTINGS = {
+    "db_path": ("AXIS_DB_PATH", "database", "path", Path),
+    "pragma_profile": ("AXIS_PRAGMA_PROFILE", "database", "pragma_profile", str),
+    "db_cache_mb": ("AXIS_DB_CACHE_MB", "database", "cache_mb", int),
+    "parse_cache_size": ("AXIS_PARSE_CACHE_SIZE", "parser", "cache_size", int),
+    "workers": ("AXIS_WORKERS", "parser", "workers", int),
+    "export_dir": ("AXIS_EXPORT_DIR", "export", "dir", Path),
+}
+
+
+def read_env_file(path: Path) -> Dict[str, str]:
+    """
+    KEY=VALUE pairs from a .env file. Blank lines, # comments and an
+    `export ` prefix are ignored; values may be wrapped in matching quotes.
+    """
+    values = {}
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, sep, value = line.removeprefix("export ").partition("=")
+        if not sep:
+            raise ConfigError(f"{path}:{lineno}: expected KEY=VALUE")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        values[key.strip()] = value
+    return values
+
+
+def read_toml_file(path: Path) -> Dict[str, Any]:
+    if tomllib is None:
+        raise ConfigError(
+            f"{path}: reading TOML needs Python 3.11+ or the tomli package "
+            "(pip install tomli); use .env or environment variables instead"
+        )
+    try:
+        with path.open("rb") as f:
+            return tomllib.load(f)
+    except tomllib.TOMLDecodeError as e:
+        raise ConfigError(f"{path}: {e}") from None
+
+
+def load_config(
+    config_file: Optional[Path] = None,
+    env_file: Optional[Path] = ENV_FILE,
+    environ: Optional[Mapping[str, str]] = None,
+) -> Config:
+    """
+    Build the Config from the TOML file, .env file and environment.
+    Call once at startup and pass the result on.
+    """
+    environ = os.environ if environ is None else environ
+
+    raw: Dict[str, Any] = {}
+    toml_path = config_file or Path(environ.get("AXIS_CONFIG", CONFIG_FILE))
+    if config_file or "AXIS_CONFIG" in environ or toml_path.exists():
+        if not toml_path.exists():
+            raise ConfigError(f"config file {toml_path} does not exist")
+        toml = read_toml_file(toml_path)
+        for field, (_env, section, key, _parse) in _SETTINGS.items():
+            if key in toml.get(section, {}):
+                raw[field] = toml[section][key]
+
+    env = read_env_file(env_file) if env_file and env_file.exists() else {}
+    env.update(environ)
+    for field, (name, _section, _key, _parse) in _SETTINGS.items():
+        if env.get(name, "") != "":
+            raw[field] = env[name]
+
+    values = {}
+    for field, value in raw.items():
+        name, _section, _key, parse = _SETTINGS[field]
+        try:
+            values[field] = parse(value)
+        except (TypeError, ValueError):
+            raise ConfigError(f"{name}: invalid value {value!r}") from None
+
+    config = Config(**values)
+    if config.parse_cache_size < 0:
+        raise ConfigError("AXIS_PARSE_CACHE_SIZE must be 0 or more")
+    if config.workers < 1:
+        raise ConfigError("AXIS_WORKERS must be 1 or more")
+    if config.db_cache_mb is not None and config.db_cache_mb < 1:
+        raise ConfigError("AXIS_DB_CACHE_MB must be 1 or more")
+    return config
@@ -0,0 +1,90 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation for `words`, factored into a prefix trie.
+
+    At any position the pattern matches the longest word that starts there,
+    and only a handful of branches are tried per character instead of one
+    per word.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _emit(node: Dict[str, dict]) -> str:
+        alts = [re.escape(ch) + _emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return f"(?:{body})?" if len(alts) == 1 else f"{body}?"
+        return body
+
+    return _emit(trie) or "(?!)"
+
+
+def prefix_min_ranks(ranks: Dict[str, int]) -> Dict[str, int]:
+    """
+    For every word, the best (lowest) rank among the words that are a prefix
+    of it, itself included.
+
+    Paired with `trie_pattern`: when the longest word at a position is `w`,
+    every other word starting there is a prefix of `w`.
+    """
+    return {
+        word: min(r for other, r in ranks.items() if word.startswith(other))
+        for word in ranks
+    }
+
+
+def _top_level_alternatives(pattern: str) -> List[str]:
+    alts: List[str] = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            i = pattern.index("]", i + 2)
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            alts.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    alts.append(pattern[start:])
+    return alts
+
+
+def word_start_guard(patterns: Iterable[str]) -> str:
+    """
+    Prefix for an alternation of `patterns` that lets the regex engine
+    reject most positions before trying any branch: `\\b` plus a lookahead
+    on the possible first characters.
+
+    Only built when every top-level alternative is `\\b` followed by a
+    literal character; otherwise returns "" and the alternation is used as is.
+    """
+    first: Set[str] = set()
+    for pattern in patterns:
+        for alt in _top_level_alternatives(pattern):
+            if not alt.startswith(r"\b") or len(alt) < 3:
+                return ""
+            ch, nxt = alt[2], alt[3:4]
+            if not ch.isalnum() or nxt in ("?", "*", "{"):
+                return ""
+            first.add(ch)
+    if not first:
+        return ""
+    return r"\b(?=[" + "".join(sorted(first)) + "])"
@@ -1,4 +1,8 @@
+import hashlib
 import re
+from typing import Any, Dict, Optional, Tuple
+
+from utils.matching import trie_pattern, prefix_min_ranks
 
 def normalize_broker_name(name: str) -> str:
     
@@ -289,6 +293,37 @@ SECTOR_MAP = {
 }
 
 
+# Sector index, built once at import time. Ranks are SECTOR_MAP dict order;
+# whenever several keys could apply, the lowest rank wins.
+_SECTOR_KEYS = list(SECTOR_MAP)
+_SECTOR_RANKS = {key: i for i, key in enumerate(_SECTOR_KEYS)}
+_SECTOR_PREFIX_RANKS = prefix_min_ranks(_SECTOR_RANKS)
+_SECTOR_KEY_LENGTHS = sorted({len(key) for key in _SECTOR_KEYS})
+_SECTOR_RE = re.compile(trie_pattern(_SECTOR_KEYS))
+
+
+def match_sector_key(text: str) -> str:
+    """
+    Return the first SECTOR_MAP key (in dict order) that occurs anywhere in
+    `text`, or "". `text` is expected to be lowercase already.
+
+    Single pass over `text`; the scan resumes one character after each hit
+    so keys hidden inside a longer match ("oil" in "oil and gas") still count.
+    """
+    best = len(_SECTOR_KEYS)
+    search = _SECTOR_RE.search
+    pos = 0
+    while best:
+        m = search(text, pos)
+        if m is None:
+            break
+        rank = _SECTOR_PREFIX_RANKS[m.group()]
+        if rank < best:
+            best = rank
+        pos = m.start() + 1
+    return _SECTOR_KEYS[best] if best < len(_SECTOR_KEYS) else ""
+
+
 def normalize_sector(sector: str) -> str:
     if not sector:
         return ""
@@ -298,10 +333,20 @@ def normalize_sector(sector: str) -> str:
 
     if sector in SECTOR_MAP:
         return SECTOR_MAP[sector]
-    
-    for key, value in  SECTOR_MAP.items():
-        if sector.startswith(key) or sector.endswith(key):
-            return value
+
+    # First key (dict order) the sector starts or ends with. Only prefixes
+    # and suffixes of a length some key actually has are looked up.
+    best = len(_SECTOR_KEYS)
+    for n in _SECTOR_KEY_LENGTHS:
+        if n > len(sector):
+            break
+        best = min(
+            best,
+            _SECTOR_RANKS.get(sector[:n], best),
+            _SECTOR_RANKS.get(sector[-n:], best),
+        )
+    if best < len(_SECTOR_KEYS):
+        return SECTOR_MAP[_SECTOR_KEYS[best]]
     
     return sector 
 
@@ -326,3 +371,159 @@ def normalize_revenue(revenue: str) -> str:
 
     return revenue
 
+
+def normalize_listing_fields(fields: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Listing field values as the add-listing flows and ingest.py store them:
+    stripped, access type/privilege/source lowercased, country uppercased,
+    sector and revenue normalized. Other keys are only stripped.
+    """
+    values = {key: str(value or "").strip() for key, value in fields.items()}
+    for key in ("access_type", "privilege", "source"):
+        if key in values:
+            values[key] = values[key].lower()
+    if "country" in values:
+        values["country"] = values["country"].upper()
+    if "sector" in values:
+        values["sector"] = normalize_sector(values["sector"])
+    if "revenue" in values:
+        values["revenue"] = normalize_revenue(values["revenue"])
+    return values
+
+
+_REVENUE_UNITS = {"": 1, "K": 10 ** 3, "M": 10 ** 6, "B": 10 ** 9}
+_REVENUE_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_REVENUE_BOUNDS_RE = re.compile(
+    r"(<|>|UP-|UNDER|OVER)?(\d+(?:\.\d+)?)([KMB]?)(?:-(\d+(?:\.\d+)?)([KMB]?))?(\+)?"
+)
+
+
+def parse_revenue_bounds(revenue: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (revenue_min_usd, revenue_max_usd) of a revenue string, via
+    normalize_revenue: "10-25M" -> (10M, 25M), "1.5B" -> (1.5B, 1.5B),
+    "300KK" -> (300M, 300M), "<5M" -> (0, 5M), ">100M" / "100M+" ->
+    (100M, None). Unitless amounts under 1000 are ambiguous and give
+    (None, None), as does anything unparseable.
+    """
+    text = normalize_revenue(revenue).replace("KK", "M")
+    text = _REVENUE_THOUSANDS_RE.sub("", text).replace(",", ".")
+    m = _REVENUE_BOUNDS_RE.search(text)
+    if not m:
+        return None, None
+
+    prefix, low, low_unit, high, high_unit, plus = m.groups()
+    if high is not None:
+        low_unit = low_unit or high_unit
+        high_unit = high_unit or low_unit
+    if not low_unit and float(low) < 1000:
+        return None, None
+
+    low_usd = round(float(low) * _REVENUE_UNITS[low_unit])
+    if high is not None:
+        return low_usd, round(float(high) * _REVENUE_UNITS[high_unit])
+    if prefix in ("<", "UP-", "UNDER"):
+        return 0, low_usd
+    if prefix in (">", "OVER") or plus:
+        return low_usd, None
+    return low_usd, low_usd
+
+
+_PRICE_THOUSANDS_RE = re.compile(r"(?<=\d)[,\s](?=\d{3}(?!\d))")
+_PRICE_K_RE = re.compile(r"(\d+(?:\.\d+)?)\s*k\b")
+_PRICE_JUNK_RE = re.compile(r"usdt|usd|us\$|\$|[^a-z0-9.\-]+")
+
+
+def normalize_price(price: str) -> str:
+    """
+    Canonical form of a price string for comparisons, not for display:
+    "$1,500", "1500 USD" and "1.5k" all become "1500", and
+    "START 1500, STEP 50" becomes "start 1500 step 50".
+    """
+    if not price:
+        return ""
+
+    price = price.strip().lower()
+    price = _PRICE_THOUSANDS_RE.sub("", price)
+    price = _PRICE_K_RE.sub(lambda m: f"{float(m.group(1)) * 1000:.0f}", price)
+    price = _PRICE_JUNK_RE.sub(" ", price)
+
+    return " ".join(price.split())
+
+
+_PRICE_TIER_RE = re.compile(r"\b(start|step|blitz|flash)\s*(\d+(?:\.\d+)?)")
+_PRICE_AMOUNT_RE = re.compile(r"\d+(?:\.\d+)?")
+_NON_USD_RE = re.compile(r"\b(eur|euro|euros|btc|xmr|rub)\b|€")
+
+
+def parse_price_amounts(price: str) -> Dict[str, Optional[int]]:
+    """
+    Integer amounts of a price string (as stored or as suggest_price returns):
+    "START 700, STEP 100, BLITZ 1800" -> start 700, step 100, blitz 1800;
+    "1500" or "$1.5k" -> start 1500. FLASH counts as a blitz price.
+
+    price_min_usd is the lowest price the listing can sell for (start, else
+    the lowest plain amount, else blitz); it stays None when the price is
+    explicitly in another currency.
+    """
+    amounts: Dict[str, Optional[int]] = {
+        "price_start": None,
+        "price_step": None,
+        "price_blitz": None,
+        "price_min_usd": None,
+    }
+    if not price:
+        return amounts
+
+    normalized = normalize_price(price)
+    tiers = {}
+    for label, amount in _PRICE_TIER_RE.findall(normalized):
+        tiers.setdefault("blitz" if label == "flash" else label, round(float(amount)))
+
+    if tiers:
+        amounts["price_start"] = tiers.get("start")
+        amounts["price_step"] = tiers.get("step")
+        amounts["price_blitz"] = tiers.get("blitz")
+        lowest = amounts["price_start"] or amounts["price_blitz"]
+    else:
+        plain = [round(float(a)) for a in _PRICE_AMOUNT_RE.findall(normalized)]
+        lowest = min(plain) if plain else None
+        amounts["price_start"] = lowest
+
+    if lowest is not None and not _NON_USD_RE.search(price.lower()):
+        amounts["price_min_usd"] = lowest
+    return amounts
+
+
+def _fingerprint_text(value) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def listing_fingerprint(
+    broker_id: int,
+    access_type: str,
+    country: str,
+    price: str,
+    description: str,
+    source: str,
+    post_date: str,
+    sector: str,
+    revenue: str,
+) -> str:
+    """
+    Hash of the fields a duplicate check compares, normalized for case,
+    whitespace and price formatting. Two listings are duplicates when their
+    fingerprints are equal.
+    """
+    parts = [
+        str(broker_id),
+        _fingerprint_text(access_type),
+        _fingerprint_text(country),
+        normalize_price(price or ""),
+        _fingerprint_text(description),
+        _fingerprint_text(source),
+        _fingerprint_text(post_date),
+        _fingerprint_text(sector),
+        _fingerprint_text(revenue),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
@@ -1,8 +1,17 @@
+import os
 import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from itertools import chain, islice
+from typing import Callable, Dict, Any, Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from utils.normalize import normalize_sector, normalize_revenue, SECTOR_MAP
+from utils.matching import trie_pattern, prefix_min_ranks, word_start_guard
+from utils.normalize import normalize_sector, normalize_revenue, match_sector_key
+
+# Bump whenever a change here can alter suggest_listing_fields() output for
+# the same post. Cached parse results are keyed on it.
+PARSER_VERSION = "0.4.1"
 
 ACCESS_PATTERNS: Dict[str, str] = {
     "rdp": r"\brdp\b|\b3389\b",
@@ -16,18 +25,101 @@ ACCESS_PATTERNS: Dict[str, str] = {
     "hyperv": r"\bhyper[-\s]?v\b",
 }
 
-def suggest_access_type(text: str, title: str = "") -> str:
-    def _match(scope: str) -> str:
-        low = scope.lower()
-        for access, pattern in ACCESS_PATTERNS.items():
-            if re.search(pattern, low):
-                return access
+PRIVILEGE_PATTERNS: Dict[str, str] = {
+    "no admin": r"\bno\s+(domain\s+admin|da|admin)\b",
+    "domain admin": r"\bdomain\s+admin\b|\bda\b",
+    "local admin": r"\blocal\s+admin\b",
+    "admin": r"\badmin(istrator)?\b",
+    "user": r"\buser\b",
+}
+
+
+class TokenHit(NamedTuple):
+    kind: str    # "access" or "privilege"
+    label: str   # key in ACCESS_PATTERNS / PRIVILEGE_PATTERNS
+    start: int
+
+
+# Every access and privilege pattern folded into one regex of named groups,
+# compiled once at import time. New entries in either table add a branch to
+# this regex, not another pass over the text. At a given position the
+# earliest table entry wins, which is what the dict-order rules below expect.
+# Keep entries anchored as `\b<letter>...` so the word-start guard applies.
+_TOKEN_KINDS = [("access", label) for label in ACCESS_PATTERNS] + [
+    ("privilege", label) for label in PRIVILEGE_PATTERNS
+]
+_TOKEN_PATTERNS = list(ACCESS_PATTERNS.values()) + list(PRIVILEGE_PATTERNS.values())
+_TOKEN_RE = re.compile(
+    word_start_guard(_TOKEN_PATTERNS)
+    + "(?:"
+    + "|".join(f"(?P<t{i}>{pattern})" for i, pattern in enumerate(_TOKEN_PATTERNS))
+    + ")"
+)
+_ACCESS_RANK = {label: i for i, label in enumerate(ACCESS_PATTERNS)}
+
+
+def _scan_tokens(low: str) -> List[TokenHit]:
+    hits: List[TokenHit] = []
+    search = _TOKEN_RE.search
+    pos = 0
+    while True:
+        m = search(low, pos)
+        if m is None:
+            return hits
+        kind, label = _TOKEN_KINDS[int(m.lastgroup[1:])]
+        hits.append(TokenHit(kind, label, m.start()))
+        # Resume right after the hit's start so overlapping tokens
+        # ("no admin" / "admin") are both reported.
+        pos = m.start() + 1
+
+
+def scan_tokens(text: str) -> List[TokenHit]:
+    """
+    Classify access-type and privilege tokens in one scan of `text`.
+
+    Returns every hit, in order of position.
+    """
+    return _scan_tokens(text.lower())
+
+
+def _access_from_hits(hits: List[TokenHit]) -> str:
+    labels = [h.label for h in hits if h.kind == "access"]
+    return min(labels, key=_ACCESS_RANK.__getitem__) if labels else ""
+
+
+def _privilege_from_hits(hits: List[TokenHit]) -> str:
+    found = {h.label for h in hits if h.kind == "privilege"}
+
+    if "no admin" in found:
         return ""
-    if title:
-        hit = _match(title)
+
+    privs: list[str] = []
+
+    if "domain admin" in found:
+        privs.append("domain admin")
+
+    if "local admin" in found:
+        privs.append("local admin")
+
+    if not privs and "admin" in found:
+        privs.append("admin")
+
+    if "user" in found:
+        privs.append("user")
+
+    return ", ".join(privs)
+
+
+def _suggest_access_type(doc: "ParsedDocument") -> str:
+    if doc.title:
+        hit = _access_from_hits(doc.title_tokens)
         if hit:
             return hit
-    return _match(text)
+    return _access_from_hits(doc.tokens)
+
+
+def suggest_access_type(text: str, title: str = "") -> str:
+    return _suggest_access_type(ParsedDocument(text, title))
 
 
 ISO_COUNTRY_CODES = {
@@ -287,6 +379,80 @@ KEYWORD_COUNTRY_MAP = {
 }
 
 
+# Country detection tables, compiled once at import time. Ranks follow the
+# dict order of KEYWORD_COUNTRY_MAP and then COUNTRY_ALIAS, so any keyword
+# beats any alias and earlier entries beat later ones.
+_COUNTRY_RANK_CODES = list(KEYWORD_COUNTRY_MAP) + list(COUNTRY_ALIAS)
+
+_KEYWORD_RANKS: Dict[str, int] = {}
+for _rank, _words in enumerate(KEYWORD_COUNTRY_MAP.values()):
+    for _w in _words:
+        _KEYWORD_RANKS.setdefault(_w, _rank)
+_KEYWORD_PREFIX_RANKS = prefix_min_ranks(_KEYWORD_RANKS)
+
+_ALIAS_WORD_RANKS: Dict[str, int] = {}      # matched on whole words of the lowered text
+_ALIAS_SYMBOL_RANKS: Dict[str, int] = {}    # "u.s.", flag emojis; matched on the raw text
+for _rank, _aliases in enumerate(COUNTRY_ALIAS.values(), start=len(KEYWORD_COUNTRY_MAP)):
+    for _a in _aliases:
+        if re.search(r"\W", _a):
+            _ALIAS_SYMBOL_RANKS.setdefault(_a, _rank)
+        else:
+            _ALIAS_WORD_RANKS.setdefault(_a.lower(), _rank)
+
+_ISO_TOKEN_RE = re.compile(r"\b([A-Z]{2})\b")
+_COUNTRY_WORD_RE = re.compile(
+    rf"(?P<kw>{trie_pattern(_KEYWORD_RANKS)})|\b(?P<alias>{trie_pattern(_ALIAS_WORD_RANKS)})\b"
+)
+_COUNTRY_SYMBOL_RE = re.compile(trie_pattern(_ALIAS_SYMBOL_RANKS))
+
+
+def _scan_country(raw: str, low: str) -> str:
+    # 1) + 2): the first [XX]/(XX)/{XX} tag wins if it is an ISO code,
+    # otherwise the first standalone ISO token. Every tag is also a token,
+    # so one pass over the tokens covers both.
+    first_iso = ""
+    tag_seen = False
+    # Not a cached view: the loop usually stops at the first tag.
+    for m in _ISO_TOKEN_RE.finditer(raw):
+        tok = m.group(1)
+        start, end = m.span()
+        if (
+            not tag_seen
+            and start > 0
+            and raw[start - 1] in "[({"
+            and raw[end:end + 1] in ("]", ")", "}")
+        ):
+            tag_seen = True
+            if tok in ISO_COUNTRY_CODES:
+                return tok
+        if not first_iso and tok in ISO_COUNTRY_CODES:
+            first_iso = tok
+    if first_iso:
+        return first_iso
+
+    # 3) + 4): keywords (substring match) and aliases (whole word) in one
+    # scan of the lowered text. Keywords may overlap, so the scan resumes
+    # one character after each hit rather than after the whole match.
+    best = len(_COUNTRY_RANK_CODES)
+    search = _COUNTRY_WORD_RE.search
+    pos = 0
+    while best:
+        m = search(low, pos)
+        if m is None:
+            break
+        kw = m.group("kw")
+        rank = _KEYWORD_PREFIX_RANKS[kw] if kw is not None else _ALIAS_WORD_RANKS[m.group("alias")]
+        if rank < best:
+            best = rank
+        pos = m.start() + 1
+
+    if best >= len(KEYWORD_COUNTRY_MAP):
+        for m in _COUNTRY_SYMBOL_RE.finditer(raw):
+            best = min(best, _ALIAS_SYMBOL_RANKS[m.group()])
+
+    return _COUNTRY_RANK_CODES[best] if best < len(_COUNTRY_RANK_CODES) else ""
+
+
 def suggest_country(text: str, title: str = "") -> str:
     """
     Detect country as ISO alpha-2.
@@ -297,112 +463,58 @@ def suggest_country(text: str, title: str = "") -> str:
       - KEYWORD_COUNTRY_MAP (full names, demonyms, slang)
       - COUNTRY_ALIAS (slang, emojis, abbreviations)
     """
+    return _suggest_country(ParsedDocument(text, title))
 
-    def _scan_scope(raw: str) -> str:
-        low = raw.lower()
-
-        m = re.search(r"[\[\(\{]([A-Z]{2})[\]\)\}]", raw)
-        if m:
-            code = m.group(1)
-            if code in ISO_COUNTRY_CODES:
-                return code
-
-
-        tokens = re.findall(r"\b([A-Z]{2})\b", raw)
-        for tok in tokens:
-            if tok in ISO_COUNTRY_CODES:
-                return tok
-
-        
-        for code, words in KEYWORD_COUNTRY_MAP.items():
-            for w in words:
-                if w in low:
-                    return code
-                
-        for code, aliases in COUNTRY_ALIAS.items():
-            for a in aliases:
-                if re.search(r"\W", a):
-                    if a in raw:
-                        return code
-                else:
-                    if re.search(rf"\b{re.escape(a.lower())}\b", low):
-                        return code
 
-        return ""
-
-    if title:
-        hit = _scan_scope(title)
+def _suggest_country(doc: "ParsedDocument") -> str:
+    if doc.title:
+        hit = _scan_country(doc.title, doc.title_lower)
         if hit:
             return hit
 
-    return _scan_scope(text)
+    return _scan_country(doc.text, doc.lower)
 
 
 def suggest_privilege(text: str) -> str:
-    low = text.lower()
-
-    if re.search(r"\bno\s+(domain\s+admin|da|admin)\b", low):
-        return ""
-
-    privs: list[str] = []
-
-    if re.search(r"\bdomain\s+admin\b", low) or re.search(r"\bda\b", low):
-        privs.append("domain admin")
-
-    if re.search(r"\blocal\s+admin\b", low):
-        privs.append("local admin")
-
-    if not any(p in ("domain admin", "local admin") for p in privs) and re.search(r"\badmin(istrator)?\b", low):
-        privs.append("admin")
-
-    if re.search(r"\buser\b", low):
-        privs.append("user")
-
-    seen = set()
-    unique = []
-    for p in privs:
-        if p not in seen:
-            seen.add(p)
-            unique.append(p)
-
-    return ", ".join(unique) if unique else ""
+    return _privilege_from_hits(ParsedDocument(text).tokens)
 
 PRICE_NUMBER_RE = re.compile(
     r"\$?\s*([\d][\d.,]*)\s*(usd|eur|usd\.?|eur\.?)?",
     flags=re.IGNORECASE,
 )
 
+TIER_KEYWORDS = ("start", "step", "blitz", "flash")
+
+_TIER_RES = [
+    (label.upper(), re.compile(rf"{label}[:=\s]+\$?\s*([\d,]+)", flags=re.IGNORECASE))
+    for label in TIER_KEYWORDS
+]
+
 def _is_revenueish(num: str, line: str) -> bool:
     return bool(re.search(rf"{re.escape(num)}\s*(m|million|b|billion|k|thousand)", line, flags=re.IGNORECASE))
 
 def suggest_price(text: str) -> str:
-    lines = text.splitlines()
+    return _suggest_price(ParsedDocument(text))
+
+
+def _suggest_price(doc: "ParsedDocument") -> str:
     tiers = []
     loose_prices = []
 
-    TIER_KEYWORDS = ("start", "step", "blitz", "flash")
-
-    for line in lines:
+    # Lines are split here rather than cached on the document: only this
+    # scan reads them, and keeping them alive raised the per-post peak.
+    for line in doc.text.splitlines():
         low = line.lower().strip()
         if not low:
             continue
 
         # 1) START / STEP / BLITZ / FLASH
         if any(k in low for k in TIER_KEYWORDS):
-            def _grab(label: str) -> None:
-                m = re.search(
-                    rf"{label}[:=\s]+\$?\s*([\d,]+)",
-                    low,
-                    flags=re.IGNORECASE,
-                )
+            for label, tier_re in _TIER_RES:
+                m = tier_re.search(low)
                 if m:
                     amount = m.group(1).replace(",", "")
-                    tiers.append(f"{label.upper()} {amount}")
-
-            _grab("start")
-            _grab("step")
-            _grab("blitz")
-            _grab("flash")
+                    tiers.append(f"{label} {amount}")
             continue
 
         # 2) Lines that mention “price”
@@ -428,19 +540,34 @@ def suggest_price(text: str) -> str:
     return ""
 
 
+REVENUE_KK_RE = re.compile(r"\b(\d+)\s*kk\b")
+REVENUE_RANGE_RE = re.compile(
+    r"([\d.,]+)\s*[-–]\s*([\d.,]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)",
+    flags=re.IGNORECASE,
+)
+REVENUE_LABELLED_RE = re.compile(
+    r"(revenue|turnover|income)\s*[:\-]*\s*[<\$\s]*([\d.,]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)",
+    flags=re.IGNORECASE,
+)
+REVENUE_GENERIC_RE = re.compile(
+    r"\b([\d.]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)\b",
+    flags=re.IGNORECASE,
+)
+
+
 def suggest_revenue(text: str) -> str:
-    low = text.lower()
+    return _suggest_revenue(ParsedDocument(text))
 
-    kk_match = re.search(r"\b(\d+)\s*kk\b", low)
+
+def _suggest_revenue(doc: "ParsedDocument") -> str:
+    text = doc.text
+
+    kk_match = REVENUE_KK_RE.search(doc.lower)
     if kk_match:
         num = kk_match.group(1)
         return normalize_revenue(f"{num}M")
 
-    range_match = re.search(
-        r"([\d.,]+)\s*[-–]\s*([\d.,]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)",
-        text,
-        flags=re.IGNORECASE,
-    )
+    range_match = REVENUE_RANGE_RE.search(text)
     if range_match:
         lo, hi, unit = range_match.groups()
         lo_clean = lo.replace(",", "")
@@ -448,21 +575,13 @@ def suggest_revenue(text: str) -> str:
         unit_clean = unit.strip().upper()[0]
         return f"{lo_clean}-{hi_clean}{unit_clean}"
 
-    single = re.search(
-        r"(revenue|turnover|income)\s*[:\-]*\s*[<\$\s]*([\d.,]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)",
-        text,
-        flags=re.IGNORECASE,
-    )
+    single = REVENUE_LABELLED_RE.search(text)
     if single:
         _, num, unit = single.groups()
         num_clean = num.replace(",", "")
         return normalize_revenue(f"{num_clean}{unit}")
 
-    generic = re.search(
-        r"\b([\d.]+)\s*(M|MILLION|K|THOUSAND|B|BILLION)\b",
-        text,
-        flags=re.IGNORECASE,
-    )
+    generic = REVENUE_GENERIC_RE.search(text)
     if generic:
         num, unit = generic.groups()
         num_clean = num.replace(",", "")
@@ -471,37 +590,42 @@ def suggest_revenue(text: str) -> str:
     return ""
 
 
+INDUSTRY_LINE_RE = re.compile(r"(industry|sector)[:\s]+(.+)")
+
 
 def suggest_sector(text: str, title: str = "") -> str:
-    low_title = title.lower()
-    low = text.lower()
+    return _suggest_sector(ParsedDocument(text, title))
 
-    ind = re.search(r"(industry|sector)[:\s]+(.+)", low)
-    if ind:
-        val = ind.group(2)
-        for key in SECTOR_MAP.keys():
-            if key in val:
-                return normalize_sector(key)
 
-    for key in SECTOR_MAP.keys():
-        if key in low_title:
+def _suggest_sector(doc: "ParsedDocument") -> str:
+    ind = INDUSTRY_LINE_RE.search(doc.lower)
+    if ind:
+        key = match_sector_key(ind.group(2))
+        if key:
             return normalize_sector(key)
 
-    for key in SECTOR_MAP.keys():
-        if key in low:
+    for scope in (doc.title_lower, doc.lower):
+        key = match_sector_key(scope)
+        if key:
             return normalize_sector(key)
 
     return ""
 
 
+POST_DATE_PATTERNS = [
+    (re.compile(r"\b(20\d{2}-\d{2}-\d{2})\b"), "%Y-%m-%d"),
+    (re.compile(r"\b(\d{2}\.\d{2}\.20\d{2})\b"), "%d.%m.%Y"),
+    (re.compile(r"\b(20\d{2}/\d{2}/\d{2})\b"), "%Y/%m/%d"),
+]
+
+
 def suggest_post_date(text: str) -> str:
-    patterns = [
-        (r"\b(20\d{2}-\d{2}-\d{2})\b", "%Y-%m-%d"),
-        (r"\b(\d{2}\.\d{2}\.20\d{2})\b", "%d.%m.%Y"),
-        (r"\b(20\d{2}/\d{2}/\d{2})\b", "%Y/%m/%d"),
-    ]
-    for regex, fmt in patterns:
-        m = re.search(regex, text)
+    return _suggest_post_date(ParsedDocument(text))
+
+
+def _suggest_post_date(doc: "ParsedDocument") -> str:
+    for regex, fmt in POST_DATE_PATTERNS:
+        m = regex.search(doc.text)
         if m:
             try:
                 return datetime.strptime(m.group(1), fmt).strftime("%Y-%m-%d")
@@ -510,25 +634,31 @@ def suggest_post_date(text: str) -> str:
     return ""
 
 
-def _build_description(title: str, text: str, max_len: int = 200) -> str:
-    low = text.lower()
+_DESCRIPTION_REVENUE_RE = re.compile(r"([\d.]+)\s*(M|B|K)", flags=re.IGNORECASE)
+
+
+def _build_description(doc: "ParsedDocument", max_len: int = 200) -> str:
+    # Only the body counts here, read through offsets into the cached views
+    # instead of slicing and lowering it again.
+    low = doc.lower
+    low_start = doc.body_lower_start
 
     access = ""
-    if "rdp" in low: access = "RDP"
-    elif "vpn" in low: access = "VPN"
-    elif "ssh" in low: access = "SSH"
+    if low.find("rdp", low_start) != -1: access = "RDP"
+    elif low.find("vpn", low_start) != -1: access = "VPN"
+    elif low.find("ssh", low_start) != -1: access = "SSH"
 
     country = ""
-    m = re.search(r"\b([A-Z]{2})\b", text)
+    m = _ISO_TOKEN_RE.search(doc.text, doc.body_start)
     if m:
         country = m.group(1)
 
     rev = ""
-    m = re.search(r"([\d.]+)\s*(M|B|K)", text, flags=re.IGNORECASE)
+    m = _DESCRIPTION_REVENUE_RE.search(doc.text, doc.body_start)
     if m:
         rev = f"{m.group(1)}{m.group(2).upper()}"
 
-    parts = [title.strip()]
+    parts = [doc.title.strip()]
     if access: parts.append(access)
     if country: parts.append(country)
     if rev: parts.append(rev)
@@ -538,17 +668,145 @@ def _build_description(title: str, text: str, max_len: int = 200) -> str:
     return desc[: max_len - 3] + "..." if len(desc) > max_len else desc
 
 
-def suggest_listing_fields(raw_title: str, raw_text: str) -> Dict[str, Any]:
-    combined = f"{raw_title}\n{raw_text}"
-    country = suggest_country(combined, title=raw_title)
+class _view:
+    """
+    functools.cached_property without the per-instance lock it takes on
+    Python < 3.12. Documents are built and read by one thread, and the lock
+    showed up as a few percent of parse time on short posts.
+    """
+
+    def __init__(self, func: Callable[[Any], Any]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
 
+    def __get__(self, doc: Any, owner: Optional[type] = None) -> Any:
+        if doc is None:
+            return self
+        value = doc.__dict__[self.name] = self.func(doc)
+        return value
+
+
+class ParsedDocument:
+    """
+    A raw post plus the derived views the suggesters work from.
+
+    Views are computed on first use and at most once, so lowering and token
+    scans happen once per post no matter how many suggesters read them, and
+    a view nobody reads is never built.
+
+    `text` is what the suggesters scan and `title` is checked first where a
+    suggester prefers the title. Built with `from_post`, `text` is
+    "title\nbody" and `body_start` is where the body begins.
+    """
+
+    def __init__(self, text: str, title: str = "", body_start: int = 0) -> None:
+        self.text = text
+        self.title = title
+        self.body_start = body_start
+
+    @classmethod
+    def from_post(cls, raw_title: str, raw_text: str) -> "ParsedDocument":
+        return cls(f"{raw_title}\n{raw_text}", raw_title, len(raw_title) + 1)
+
+    @property
+    def body_lower_start(self) -> int:
+        # Lowering can change the length of some characters, so the body
+        # offset in `lower` comes from the lowered title, not the raw one.
+        return len(self.title_lower) + 1 if self.body_start else 0
+
+    @_view
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @_view
+    def title_lower(self) -> str:
+        return self.title.lower()
+
+    @_view
+    def tokens(self) -> List[TokenHit]:
+        return _scan_tokens(self.lower)
+
+    @_view
+    def title_tokens(self) -> List[TokenHit]:
+        return _scan_tokens(self.title_lower)
+
+
+def suggest_document_fields(doc: ParsedDocument) -> Dict[str, Any]:
+    # Price and date only read the raw text, so they run before any other
+    # view of the post is built.
+    price = _suggest_price(doc)
+    post_date = _suggest_post_date(doc)
     return {
-        "access_type": suggest_access_type(combined, title=raw_title),
-        "country": country,
-        "privilege": suggest_privilege(combined),
-        "price": suggest_price(combined),
-        "sector": suggest_sector(combined, title=raw_title),
-        "revenue": suggest_revenue(combined),
-        "post_date": suggest_post_date(combined),
-        "description": _build_description(raw_title, raw_text),
+        "access_type": _suggest_access_type(doc),
+        "country": _suggest_country(doc),
+        "privilege": _privilege_from_hits(doc.tokens),
+        "price": price,
+        "sector": _suggest_sector(doc),
+        "revenue": _suggest_revenue(doc),
+        "post_date": post_date,
+        "description": _build_description(doc),
     }
+
+
+# Listing fields suggest_listing_fields() fills in.
+SUGGESTED_FIELDS = (
+    "access_type",
+    "country",
+    "privilege",
+    "price",
+    "sector",
+    "revenue",
+    "post_date",
+    "description",
+)
+
+
+def suggest_listing_fields(raw_title: str, raw_text: str) -> Dict[str, Any]:
+    return suggest_document_fields(ParsedDocument.from_post(raw_title, raw_text))
+
+
+# Below this many posts a batch is parsed in-process: starting a pool and
+# pickling results costs more than it saves.
+PARALLEL_MIN_POSTS = 2000
+
+
+def _suggest_chunk(chunk: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    return [suggest_listing_fields(title, text) for title, text in chunk]
+
+
+def suggest_listing_fields_many(
+    posts: Iterable[Tuple[str, str]],
+    workers: Optional[int] = 1,
+    chunk_size: int = 500,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parse many (raw_title, raw_text) pairs, yielding results in input order.
+
+    With workers > 1 (None = one per CPU) posts go to a process pool in
+    chunks of `chunk_size`. At most two chunks per worker are in flight, so
+    `posts` can be a stream of any length.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    it = iter(posts)
+    head = list(islice(it, PARALLEL_MIN_POSTS))
+
+    if workers <= 1 or len(head) < PARALLEL_MIN_POSTS:
+        for title, text in chain(head, it):
+            yield suggest_listing_fields(title, text)
+        return
+
+    it = chain(head, it)
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                break
+            pending.append(pool.submit(_suggest_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from db.database import get_parse_cache_entry, insert_parse_cache_entry, prune_parse_cache
+from utils.parse import PARSER_VERSION, suggest_listing_fields
+
+
+def normalize_post(raw_title: str, raw_text: str) -> Tuple[str, str]:
+    """
+    Canonical form of a post for caching: stripped title, LF line endings,
+    no trailing whitespace on any line, no leading/trailing blank lines.
+    """
+    text = raw_text.replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(line.rstrip() for line in text.split("\n")).strip()
+    return raw_title.strip(), text
+
+
+def post_cache_key(raw_title: str, raw_text: str) -> str:
+    """
+    Content address of an already-normalized post under the current parser.
+    """
+    digest = hashlib.sha256()
+    for part in (PARSER_VERSION, raw_title, raw_text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Two-level cache for suggest_listing_fields: an in-process LRU in front of
+    the parse_cache table in the database.
+
+    Posts are normalized before hashing and parsing, so a repost that only
+    differs in line endings or trailing whitespace is a hit, and a hit always
+    returns exactly what parsing the normalized post would.
+    """
+
+    def __init__(self, maxsize: int = 4096, persist: bool = True) -> None:
+        self.maxsize = maxsize
+        self.persist = persist
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get_or_parse(
+        self,
+        raw_title: str,
+        raw_text: str,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Dict[str, Any]:
+        title, text = normalize_post(raw_title, raw_text)
+        key = post_cache_key(title, text)
+
+        fields = self._entries.get(key)
+        if fields is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return dict(fields)
+
+        stored = get_parse_cache_entry(key, conn=conn) if self.persist else None
+        if stored is not None:
+            fields = json.loads(stored)
+            self.db_hits += 1
+        else:
+            fields = suggest_listing_fields(title, text)
+            self.misses += 1
+            if self.persist:
+                insert_parse_cache_entry(key, PARSER_VERSION, json.dumps(fields), conn=conn)
+
+        self._remember(key, fields)
+        return dict(fields)
+
+    def prune(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Drop stored results from other PARSER_VERSIONs. Call once at startup,
+        after create_tables(). Returns the number of rows deleted.
+        """
+        if not self.persist:
+            return 0
+        return prune_parse_cache(PARSER_VERSION, conn=conn)
+
+    def _remember(self, key: str, fields: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = fields
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """Change the in-process capacity, dropping the oldest entries if needed."""
+        self.maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+PARSE_CACHE = ParseCache()
+
+
+def cached_suggest_listing_fields(raw_title: str, raw_text: str) -> Dict[str, Any]:
+    """
+    suggest_listing_fields() through the shared PARSE_CACHE.
+    """
+    return PARSE_CACHE.get_or_parse(raw_title, raw_text)